@@ -0,0 +1,192 @@
+"""
+长截图拼接的准确率与速度评测：生成各类合成页面并按带抖动的滚动距离切成互相重叠的帧，
+对每一种偏移量估计策略统计逐帧偏移误差、完整拼接的像素级还原率（只比较滚动内容，
+参照为各帧按真实位置覆盖的结果，因此固定标题栏和噪声场景也能逐像素比较）和每帧耗时。
+支持二维偏移的策略另外评测上下左右滚动的宽页面（pan 场景）。
+
+用法：python -m Benchmarks.Stitch [--output stitch.json] [--quick]
+"""
+import json
+import time
+
+import numpy as np
+
+from .Synthetic import synthetic_page, jittered_frames, panned_frames
+
+# 名称 -> (synthetic_page 参数, jittered_frames 参数)
+SCENARIOS = {
+    'text': ({'content': ('text',)}, {}),
+    'table': ({'content': ('table',)}, {}),
+    'image': ({'content': ('image',)}, {}),
+    'dark': ({'theme': 'dark'}, {}),
+    'sticky_header': ({'stickyHeader': 48}, {'stickyHeader': 48}),
+    'jitter': ({}, {'jitter': 60}),
+    'noise': ({}, {'noise': 2.0}),
+}
+
+# 二维滚动：先向右，再向下，再向左，最后右下方向斜着滚动
+PAN_MOVES = [(300, 0), (300, 0), (0, 200), (-300, 0), (-300, 0), (150, 120)]
+
+
+def scrolled_truth(frames, tops, stickyHeader=0):
+    """
+    拼接结果的参照：把各帧按真实位置依次覆盖到画布上（即偏移量全部正确时的拼接结果），
+    这样带噪声的帧也能逐像素比较。返回 (参照图像, 参与比较的行)：
+    后续帧顶部的固定标题栏不属于滚动内容，拼接时保留或裁掉都算正确，不参与比较
+    """
+    height = frames[0].shape[0]
+    truth = np.zeros((tops[-1] + height,) + frames[0].shape[1:], np.uint8)
+    content = np.ones(truth.shape[0], bool)
+    for i, (frame, top) in enumerate(zip(frames, tops)):
+        truth[top: top + height] = frame
+        if i and stickyHeader:
+            content[top: top + stickyHeader] = False
+    return truth, content
+
+
+def evaluate(strategy, frames, tops, merge_images, to_gray, stickyHeader=0):
+    """评测一种策略：逐帧偏移误差和完整拼接结果（只比较滚动内容所在的行）"""
+    errors, failures = [], 0
+    start = time.perf_counter()
+    for i in range(1, len(frames)):
+        try:
+            offset = strategy.estimate(to_gray(frames[i - 1]), to_gray(frames[i]))
+            errors.append(abs(offset - (tops[i] - tops[i - 1])))
+        except Exception:
+            failures += 1
+    pairTime = (time.perf_counter() - start) * 1000 / max(1, len(frames) - 1)
+
+    skipped = []
+    start = time.perf_counter()
+    # merge_images 按 RGB 输入处理，这里合成页面本身就是 RGB
+    result = merge_images(frames, strategy=strategy, on_error=lambda index, error: skipped.append(index))
+    mergeTime = (time.perf_counter() - start) * 1000 / max(1, len(frames) - 1)
+    truth, content = scrolled_truth(frames, tops, stickyHeader)
+    result = result[..., ::-1]  # merge_images 输出 BGR
+    if result.shape == truth.shape:
+        exact = bool(np.array_equal(result[content], truth[content]))
+        mae = float(np.abs(result[content].astype(np.int16) - truth[content].astype(np.int16)).mean())
+    else:
+        exact, mae = False, None
+    return {
+        'pairs': len(frames) - 1,
+        'offset_failures': failures,
+        'offset_exact_rate': sum(error == 0 for error in errors) / max(1, len(frames) - 1),
+        'offset_mean_error': float(np.mean(errors)) if errors else None,
+        'offset_max_error': int(max(errors)) if errors else None,
+        'offset_ms_per_frame': pairTime,
+        'merge_ms_per_frame': mergeTime,
+        'merge_skipped_frames': len(skipped),
+        'result_height': int(result.shape[0]),
+        'truth_height': int(truth.shape[0]),
+        'pixel_exact': exact,
+        'mean_abs_error': mae,
+    }
+
+
+def evaluate_pan(strategy, frames, positions, page, Stitcher, MatchError):
+    """评测一种二维策略：逐帧的 (dx, dy) 误差和整个拼接结果（与页面上被覆盖范围比较）"""
+    errors, failures = [], 0
+    start = time.perf_counter()
+    for i in range(1, len(frames)):
+        try:
+            dx, dy = strategy.translation(frames[i - 1][..., 0], frames[i][..., 0])
+            truth = (positions[i][0] - positions[i - 1][0], positions[i][1] - positions[i - 1][1])
+            errors.append(max(abs(dx - truth[0]), abs(dy - truth[1])))
+        except MatchError:
+            failures += 1
+    pairTime = (time.perf_counter() - start) * 1000 / max(1, len(frames) - 1)
+
+    stitcher, skipped = Stitcher(strategy), []
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        try:
+            stitcher.add(frame)
+        except MatchError:
+            skipped.append(i)
+    result = stitcher.result()
+    mergeTime = (time.perf_counter() - start) * 1000 / max(1, len(frames) - 1)
+    height, width = frames[0].shape[:2]
+    left, top = min(x for x, _ in positions), min(y for _, y in positions)
+    right, bottom = max(x for x, _ in positions) + width, max(y for _, y in positions) + height
+    truth = np.full((bottom - top, right - left, 3), 255, np.uint8)  # 未覆盖的部分为画布背景色
+    for frame, (x, y) in zip(frames, positions):
+        truth[y - top: y - top + height, x - left: x - left + width] = frame
+    exact = result.shape == truth.shape and bool(np.array_equal(result, truth))
+    mae = float(np.abs(result.astype(np.int16) - truth.astype(np.int16)).mean()) \
+        if result.shape == truth.shape else None
+    return {
+        'pairs': len(frames) - 1,
+        'offset_failures': failures,
+        'offset_exact_rate': sum(error == 0 for error in errors) / max(1, len(frames) - 1),
+        'offset_mean_error': float(np.mean(errors)) if errors else None,
+        'offset_max_error': int(max(errors)) if errors else None,
+        'offset_ms_per_frame': pairTime,
+        'merge_ms_per_frame': mergeTime,
+        'merge_skipped_frames': len(skipped),
+        'result_height': int(result.shape[0]),
+        'truth_height': int(truth.shape[0]),
+        'pixel_exact': exact,
+        'mean_abs_error': mae,
+        'canvas_tiles': stitcher.canvas.tileCount(),
+    }
+
+
+def run(quick=False, width=1000, viewport=600, step=240, seeds=None):
+    """对所有场景和所有已注册的策略进行评测，返回结果列表"""
+    from Functions.PicMatcher import merge_images, strategies, to_gray, Stitcher, MatchError
+    seeds = seeds or ([0] if quick else [0, 1, 2])
+    frameCount = 5 if quick else 12
+    results = []
+    for scenario, (pageArgs, frameArgs) in SCENARIOS.items():
+        for seed in seeds:
+            page = synthetic_page(width, viewport + (step + frameArgs.get('jitter', 0)) * frameCount,
+                                  seed=seed, **pageArgs)
+            frames, tops = jittered_frames(page, viewport, step, seed=seed, **frameArgs)
+            for name, strategy in strategies().items():
+                stats = evaluate(strategy, frames, tops, merge_images, to_gray, frameArgs.get('stickyHeader', 0))
+                results.append({'scenario': scenario, 'seed': seed, 'strategy': name, **stats})
+    for seed in seeds:
+        page = synthetic_page(width * 2, viewport * 2, content=('table', 'text'), seed=seed)
+        frames, positions = panned_frames(page, width * 4 // 5, viewport, PAN_MOVES)
+        for name, strategy in strategies().items():
+            if strategy.two_dimensional:
+                stats = evaluate_pan(strategy, frames, positions, page, Stitcher, MatchError)
+                results.append({'scenario': 'pan', 'seed': seed, 'strategy': name, **stats})
+    return results
+
+
+def summarize(results):
+    """按 (场景, 策略) 汇总：像素级还原率、偏移误差和耗时"""
+    groups = {}
+    for result in results:
+        groups.setdefault((result['scenario'], result['strategy']), []).append(result)
+    summary = []
+    for (scenario, strategy), items in groups.items():
+        summary.append({
+            'scenario': scenario, 'strategy': strategy,
+            'pixel_exact_rate': sum(item['pixel_exact'] for item in items) / len(items),
+            'offset_exact_rate': float(np.mean([item['offset_exact_rate'] for item in items])),
+            'offset_ms_per_frame': float(np.mean([item['offset_ms_per_frame'] for item in items])),
+            'merge_ms_per_frame': float(np.mean([item['merge_ms_per_frame'] for item in items])),
+        })
+    return summary
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(prog='python -m Benchmarks.Stitch', description='长截图拼接评测')
+    parser.add_argument('--output', '-o', help='结果 JSON 文件，默认输出到标准输出')
+    parser.add_argument('--quick', action='store_true', help='快速模式：更少的页面和帧数')
+    args = parser.parse_args()
+    results = run(args.quick)
+    text = json.dumps({'summary': summarize(results), 'results': results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
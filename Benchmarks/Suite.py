@@ -0,0 +1,202 @@
+import platform
+import statistics
+import time
+
+from PyQt5.QtCore import Qt, QEvent, QPointF, QRectF, QBuffer, QByteArray, QIODevice, QT_VERSION_STR, \
+    PYQT_VERSION_STR
+from PyQt5.QtGui import QImage, QMouseEvent
+from PyQt5.QtWidgets import QApplication
+
+from .Synthetic import RESOLUTIONS, synthetic_desktop, synthetic_actions, scrolling_document, scroll_frames
+
+
+def measure(func, repeat=5, warmup=1):
+    """执行 func 若干次，返回各次耗时（毫秒）的统计"""
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'runs': repeat, 'mean_ms': statistics.fmean(times), 'median_ms': statistics.median(times),
+            'min_ms': min(times), 'max_ms': max(times)}
+
+
+class BenchmarkSuite:
+    """
+    基准测试集合，每项结果为 {'name', 'params', 统计数据...}
+    参数：
+    - resolutions: 参与测试的合成屏幕分辨率（见 RESOLUTIONS）
+    - quick: 快速模式，减少重复次数和数据规模
+    """
+
+    def __init__(self, resolutions=None, quick=False):
+        self.resolutions = resolutions or list(RESOLUTIONS)
+        self.quick = quick
+        self.repeat = 3 if quick else 10
+        self.results = []
+        self._widget = None
+
+    def record(self, name, params, stats):
+        self.results.append({'name': name, 'params': params, **stats})
+
+    def widget(self):
+        """复用同一个截图窗口，不保存截图历史"""
+        if self._widget is None:
+            from Views.ScreenArea import ScreenShotWidget
+            self._widget = ScreenShotWidget()
+            self._widget.settings.set('HistorySettings', 'is_save_history', 'False')
+        return self._widget
+
+    def prepare(self, resolution, annotations=0):
+        widget = self.widget()
+        area = widget.screenArea
+        area.setDesktop(synthetic_desktop(resolution))
+        widget.setGeometry(area.screenGlobalRect())
+        widget.clearScreenShotArea()
+        rectf = area.screenLogicalRectF()
+        selection = QRectF(rectf.width() * 0.1, rectf.height() * 0.1, rectf.width() * 0.8, rectf.height() * 0.8)
+        area.setCenterArea(selection.topLeft(), selection.bottomRight())
+        area.setEditActions(synthetic_actions(annotations, selection))
+        widget.hasScreenShot = True
+        return widget, selection
+
+    def bench_physical_pixmap(self):
+        """截图区域合成（带 N 个编辑行为）"""
+        for resolution in self.resolutions:
+            for annotations in (0, 50, 200):
+                widget, selection = self.prepare(resolution, annotations)
+                stats = measure(lambda: widget.screenArea.physicalPixmap(selection, editAction=True), self.repeat)
+                self.record('physical_pixmap', {'resolution': resolution, 'annotations': annotations}, stats)
+
+    def bench_paint(self):
+        """按脚本移动鼠标（划定截图区域，再绘制矩形），每次移动后完整绘制一帧"""
+        steps = 20 if self.quick else 60
+        for resolution in self.resolutions:
+            widget, selection = self.prepare(resolution, 50)
+            widget.clearScreenShotArea()
+            target = QImage(widget.size(), QImage.Format.Format_ARGB32_Premultiplied)
+            frameTimes = []
+
+            def mouse(kind, pos):
+                button = Qt.MouseButton.LeftButton
+                buttons = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseButtonRelease else button
+                QApplication.sendEvent(widget, QMouseEvent(kind, pos, button, buttons, Qt.KeyboardModifier.NoModifier))
+                if kind == QEvent.Type.MouseMove:
+                    # 移动事件按刷新率合并，这里不运行事件循环，定时器不会触发，需要立即处理，否则测到的是旧状态
+                    widget.flushMouseMove()
+
+            def frame():
+                start = time.perf_counter()
+                widget.render(target)
+                frameTimes.append((time.perf_counter() - start) * 1000)
+
+            # 1.划定截图区域
+            mouse(QEvent.Type.MouseButtonPress, selection.topLeft())
+            for i in range(1, steps + 1):
+                mouse(QEvent.Type.MouseMove, selection.topLeft() + (selection.bottomRight() - selection.topLeft()) * i / steps)
+                frame()
+            mouse(QEvent.Type.MouseButtonRelease, selection.bottomRight())
+            assert widget.screenArea.centerLogicalRectF().bottomRight() == selection.bottomRight(), \
+                '截图区域没有跟随鼠标移动到终点'
+            # 2.在截图区域内绘制矩形
+            widget.toolbar.before_draw_rectangle()
+            start = selection.center()
+            mouse(QEvent.Type.MouseButtonPress, start)
+            for i in range(1, steps + 1):
+                mouse(QEvent.Type.MouseMove, start + QPointF(i * 3, i * 2))
+                frame()
+            mouse(QEvent.Type.MouseButtonRelease, start + QPointF(steps * 3, steps * 2))
+            action = widget.screenArea.getEditActions()[-1]
+            assert action[0] == 'rectangle' and action[4] == start + QPointF(steps * 3, steps * 2), \
+                '矩形没有跟随鼠标移动到终点'
+            widget.exitEditMode()
+            frameTimes.sort()
+            self.record('paint_frame', {'resolution': resolution, 'frames': len(frameTimes)},
+                        {'runs': len(frameTimes), 'mean_ms': statistics.fmean(frameTimes),
+                         'median_ms': statistics.median(frameTimes), 'min_ms': frameTimes[0],
+                         'max_ms': frameTimes[-1], 'p95_ms': frameTimes[int(len(frameTimes) * 0.95) - 1]})
+
+    def bench_merge(self):
+        """长截图拼接：文档越长，需要拼接的帧数越多"""
+        from Functions import merge_images
+        viewport, step = 600, 240
+        for frames in ((2, 4, 8) if self.quick else (2, 4, 8, 16, 32)):
+            document = scrolling_document(1200, viewport + step * (frames - 1))
+            images = scroll_frames(document, viewport, step)
+            result = {}
+
+            def run():
+                result['image'] = merge_images(images)
+
+            stats = measure(run, max(1, self.repeat // 3))
+            self.record('merge_images', {'frames': len(images), 'document_height': document.shape[0],
+                                         'result_height': int(result['image'].shape[0])}, stats)
+
+    def bench_frame_gate(self):
+        """长截图帧筛选：模拟平滑滚动（每次滚动分几帧逐渐移动到位），比较筛选前后的偏移量估计次数和拼接结果"""
+        import numpy as np
+        from Functions import FrameGate, Stitcher
+        viewport, distance = 600, 240
+        easing = (0, 0.35, 0.7, 0.9, 1, 1)  # 每次滚动截取的帧：尚未移动、动画中、已停下
+        for ticks in ((4,) if self.quick else (4, 16)):
+            document = scrolling_document(1000, viewport + distance * ticks)
+            tops = [0] + [int(tick * distance + distance * e) for tick in range(ticks) for e in easing]
+            frames = [document[top: top + viewport] for top in tops]
+            for gated in (False, True):
+                gate, stitcher, calls = FrameGate(), Stitcher('phase'), 0
+                start = time.perf_counter()
+                for frame in frames:
+                    if gated and gate.check(frame) != FrameGate.ACCEPT:
+                        continue
+                    calls += stitcher.frames > 0
+                    stitcher.add(frame)
+                elapsed = (time.perf_counter() - start) * 1000
+                self.record('frame_gate', {'ticks': ticks, 'frames': len(frames), 'gated': gated},
+                            {'matcher_calls': calls, 'total_ms': elapsed,
+                             'exact': bool(np.array_equal(stitcher.result(), document[:tops[-1] + viewport]))})
+
+    def bench_encode(self):
+        """截图区域编码保存（写入内存，不含磁盘 IO）"""
+        for resolution in self.resolutions:
+            widget, selection = self.prepare(resolution, 50)
+            pixmap = widget.screenArea.physicalPixmap(selection, editAction=True)
+            for fmt, quality in (('PNG', -1), ('JPG', 90)):
+                sizes = []
+
+                def run():
+                    data = QByteArray()
+                    buffer = QBuffer(data)
+                    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+                    pixmap.save(buffer, fmt, quality)
+                    sizes.append(data.size())
+
+                stats = measure(run, self.repeat)
+                pixels = pixmap.width() * pixmap.height()
+                stats['megapixels_per_s'] = pixels / 1e6 / (stats['median_ms'] / 1000)
+                self.record('encode', {'resolution': resolution, 'format': fmt, 'bytes': sizes[-1]}, stats)
+
+    def bench_stitch(self):
+        """各偏移量估计策略在各类合成页面上的拼接准确率和速度（详见 Benchmarks.Stitch）"""
+        from . import Stitch
+        for item in Stitch.summarize(Stitch.run(self.quick)):
+            self.record('stitch', {'scenario': item.pop('scenario'), 'strategy': item.pop('strategy')}, item)
+
+    def run(self, names=None):
+        benchmarks = {'physical_pixmap': self.bench_physical_pixmap, 'paint': self.bench_paint,
+                      'merge': self.bench_merge, 'frame_gate': self.bench_frame_gate, 'encode': self.bench_encode,
+                      'stitch': self.bench_stitch}
+        for name, bench in benchmarks.items():
+            if names and name not in names:
+                continue
+            bench()
+        return self.report()
+
+    def report(self):
+        return {
+            'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                     'qt': QT_VERSION_STR, 'pyqt': PYQT_VERSION_STR, 'platform': platform.platform(),
+                     'quick': self.quick},
+            'results': self.results,
+        }
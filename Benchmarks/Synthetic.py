@@ -0,0 +1,171 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QPixmap, QPainter, QColor, QFont, QLinearGradient
+
+from Functions import VirtualDesktop, ScreenBuffer
+
+# 名称 -> (物理宽, 物理高, 设备像素比)
+RESOLUTIONS = {
+    '1080p': (1920, 1080, 1.0),
+    '1440p': (2560, 1440, 1.0),
+    '4K': (3840, 2160, 2.0),
+    '5K': (5120, 2880, 2.0),
+}
+
+
+def synthetic_screen(width, height, pixelRatio=1.0, seed=0):
+    """生成一张类似桌面内容的屏幕截图：渐变背景、若干窗口色块和文字"""
+    rng = np.random.default_rng(seed)
+    pixmap = QPixmap(width, height)
+    painter = QPainter(pixmap)
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, QColor(40, 60, 90))
+    gradient.setColorAt(1, QColor(200, 170, 120))
+    painter.fillRect(0, 0, width, height, gradient)
+    font = QFont()
+    font.setPixelSize(max(12, height // 60))
+    painter.setFont(font)
+    for i in range(12):
+        x, y = rng.integers(0, width * 3 // 4), rng.integers(0, height * 3 // 4)
+        w, h = rng.integers(width // 8, width // 3), rng.integers(height // 8, height // 3)
+        painter.fillRect(int(x), int(y), int(w), int(h), QColor(*rng.integers(0, 256, 3).tolist()))
+        painter.setPen(Qt.GlobalColor.black)
+        for line in range(int(h) // font.pixelSize() - 1):
+            painter.drawText(int(x) + 8, int(y) + (line + 1) * font.pixelSize(), f'window {i} line {line} ' * 3)
+    painter.end()
+    pixmap.setDevicePixelRatio(pixelRatio)
+    return pixmap
+
+
+def synthetic_desktop(resolution='1080p', seed=0):
+    """由一块合成屏幕组成的虚拟桌面"""
+    width, height, pixelRatio = RESOLUTIONS[resolution]
+    pixmap = synthetic_screen(width, height, pixelRatio, seed)
+    return VirtualDesktop([ScreenBuffer(QRectF(0, 0, width / pixelRatio, height / pixelRatio), pixmap, resolution)])
+
+
+def synthetic_actions(count, bounds: QRectF, seed=0):
+    """在 bounds 范围内随机生成 count 个编辑行为（矩形、椭圆、箭头、涂鸦）"""
+    rng = np.random.default_rng(seed)
+    kinds = ['rectangle', 'ellipse', 'arrow', 'graffiti']
+    actions = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        color = QColor(*rng.integers(0, 256, 3).tolist())
+        points = [QPointF(bounds.x() + rng.random() * bounds.width(), bounds.y() + rng.random() * bounds.height())
+                  for _ in range(2 if kind != 'graffiti' else 40)]
+        if kind == 'graffiti':
+            actions.append((kind, color, 3, points))
+        else:
+            actions.append((kind, color, 3, points[0], points[1]))
+    return actions
+
+
+THEMES = {  # 名称 -> (背景色, 文字灰度范围, 分隔线颜色)
+    'light': ((250, 250, 250), (0, 90), (200, 200, 210)),
+    'dark': ((30, 30, 34), (170, 240), (70, 70, 80)),
+}
+
+
+def _text_line(page, y, rng, width, shades, left=20, right=60):
+    x = left
+    while x < width - right:
+        wordWidth = int(rng.integers(10, 60))
+        page[y: y + 12, x: x + wordWidth] = int(rng.integers(*shades))
+        x += wordWidth + int(rng.integers(6, 14))
+
+
+def synthetic_page(width, length, theme='light', content=('text', 'table', 'image'), stickyHeader=0, seed=0):
+    """
+    生成一篇长页面（RGB 数组），用于模拟长截图时不断滚动的页面。任意位置的局部内容都不重复
+    theme: 'light' 或 'dark'
+    content: 页面包含的内容类型（text 文字行、table 表格、image 图片色块）
+    stickyHeader: 固定在视口顶部的标题栏高度（像素），标题栏绘制在页面最上方，截取各帧时始终覆盖在顶部
+    """
+    rng = np.random.default_rng(seed)
+    background, shades, ruleColor = THEMES[theme]
+    page = np.empty((length, width, 3), np.uint8)
+    page[:] = background
+    if stickyHeader:
+        page[:stickyHeader] = (60, 110, 200)
+        _text_line(page, stickyHeader // 2 - 6, rng, width // 2, (230, 255))
+    y = stickyHeader + 10
+    while y < length - 30:
+        kind = content[int(rng.integers(0, len(content)))]
+        roll = rng.random()
+        if kind == 'text' or roll < 0.5:  # 文字行：随机长度的“单词”块，偶尔有分隔线
+            if rng.random() < 0.12:
+                page[y: y + 2, 10: width - 10] = ruleColor
+                y += 12
+            else:
+                _text_line(page, y, rng, width, shades)
+                y += int(rng.integers(18, 26))
+        elif kind == 'table':  # 表格：横竖网格线，单元格内为短文字
+            rows, columns = int(rng.integers(3, 8)), int(rng.integers(3, 6))
+            rowHeight = 24
+            height = min(rows * rowHeight, length - 30 - y)
+            xs = np.linspace(20, width - 20, columns + 1).astype(int)
+            for row in range(height // rowHeight):
+                top = y + row * rowHeight
+                page[top, 20: width - 20] = ruleColor
+                for column in range(columns):
+                    cellWidth = int(rng.integers(10, max(11, xs[column + 1] - xs[column] - 10)))
+                    page[top + 6: top + 16, xs[column] + 5: xs[column] + 5 + cellWidth] = int(rng.integers(*shades))
+            page[y: y + height, xs] = ruleColor
+            y += height + 12
+        else:  # 图片：带渐变和噪点的色块
+            height = min(int(rng.integers(40, 160)), length - 30 - y)
+            color = rng.integers(0, 256, 3)
+            ramp = np.linspace(0.6, 1.0, width - 80)[None, :, None]
+            page[y: y + height, 40: width - 40] = np.clip(color * ramp + rng.integers(-20, 20, (height, 1, 3)),
+                                                          0, 255).astype(np.uint8)
+            y += height + 10
+    return page
+
+
+def scrolling_document(width, length, seed=0):
+    """生成一篇普通的浅色长文档（文字、表格、图片）"""
+    return synthetic_page(width, length, seed=seed)
+
+
+def jittered_frames(page, viewportHeight, step, jitter=0, noise=0, stickyHeader=0, seed=0):
+    """
+    模拟滚动截取：每次滚动 step±jitter 像素，并可叠加高斯噪声（模拟压缩、抗锯齿差异）
+    stickyHeader: 标题栏高度，每帧顶部都覆盖页面最上方的标题栏
+    返回 (帧列表, 每帧顶部在页面中的真实位置)
+    """
+    rng = np.random.default_rng(seed)
+    frames, tops = [], []
+    top = 0
+    while top + viewportHeight <= page.shape[0]:
+        frame = page[top: top + viewportHeight].copy()
+        if stickyHeader:
+            frame[:stickyHeader] = page[:stickyHeader]
+        if noise:
+            frame = np.clip(frame + rng.normal(0, noise, frame.shape), 0, 255).astype(np.uint8)
+        frames.append(frame)
+        tops.append(top)
+        top += max(1, step + int(rng.integers(-jitter, jitter + 1)) if jitter else step)
+    return frames, tops
+
+
+def panned_frames(page, viewportWidth, viewportHeight, moves):
+    """
+    模拟上下左右滚动截取（如宽表格、流程图）：从页面左上角开始，依次按 moves 中的 (dx, dy) 移动视口
+    返回 (帧列表, 每帧左上角在页面中的真实位置 (x, y))
+    """
+    frames, positions = [], []
+    x = y = 0
+    for dx, dy in [(0, 0)] + list(moves):
+        x, y = x + dx, y + dy
+        frames.append(page[y: y + viewportHeight, x: x + viewportWidth].copy())
+        positions.append((x, y))
+    return frames, positions
+
+
+def scroll_frames(document, viewportHeight, step):
+    """按 step 像素逐次滚动，截取每一屏（视口高度 viewportHeight）"""
+    frames = []
+    for top in range(0, document.shape[0] - viewportHeight + 1, step):
+        frames.append(np.ascontiguousarray(document[top: top + viewportHeight]))
+    return frames
@@ -0,0 +1,6 @@
+"""
+无界面的性能基准：在 QT_QPA_PLATFORM=offscreen 下用合成的屏幕截图和滚动文档，
+测量截图合成、标注绘制、长截图拼接和编码保存的耗时，结果输出为 JSON 便于跨版本比较。
+
+用法：python -m Benchmarks --output bench.json [--quick]
+"""
@@ -0,0 +1,43 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 必须在导入 Qt 之前设置，无需显示器即可运行
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m Benchmarks', description='水螅截图性能基准')
+    parser.add_argument('--output', '-o', help='结果 JSON 文件，默认输出到标准输出')
+    parser.add_argument('--quick', action='store_true', help='快速模式：更少的重复次数和更小的数据')
+    parser.add_argument('--resolution', action='append', help='只测试指定分辨率，可重复（1080p/1440p/4K/5K）')
+    parser.add_argument('--only', action='append', help='只运行指定项目，可重复（physical_pixmap/paint/merge/frame_gate/encode/stitch）')
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    # 在临时目录中运行，避免在当前目录生成 settings.ini；图标等资源仍从项目目录读取
+    workdir = tempfile.mkdtemp(prefix='hydra-bench-')
+    try:
+        os.symlink(ROOT / 'src', Path(workdir) / 'src', target_is_directory=True)
+    except OSError:  # 没有创建符号链接的权限时（如 Windows 非管理员），图标为空不影响测试
+        pass
+    os.chdir(workdir)
+
+    from .Suite import BenchmarkSuite
+    report = BenchmarkSuite(args.resolution, args.quick).run(args.only)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf8')
+    else:
+        print(text)
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
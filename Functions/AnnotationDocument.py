@@ -0,0 +1,359 @@
+"""
+带版本号的标注文档：保存一次截图的截图区域和全部编辑行为，使截图可以重新编辑、比较差异或以任意分辨率重新渲染。
+文档有两种形式：
+- JSON：{"format": "hydra-annotations", "version": 2, "rect": [x, y, w, h], "pixelRatio": 1.0, "annotations": [...]}，
+  annotations 为相对截图区域左上角的编辑行为字典（见 AnnotationSpec），便于与其他程序交换
+- 二进制（.hyan）：颜色和字体各自去重成表，坐标量化为 1/16 逻辑像素并以 zigzag 变长整数保存，
+  涂鸦的点序列只保存相邻两点的差值，数千个图形也能在几毫秒内保存和读取。
+  读取时涂鸦的点序列直接构造为 QPolygonF（与 QPointF 列表的用法相同）
+
+二进制格式（所有整数均为 LEB128 变长整数，有符号数先做 zigzag 编码）：
+  b'HYAN' 版本号 | 截图区域 x y w h | 设备像素比×1000 | 颜色数 颜色(ARGB)... | 字体数 字体字符串... | 编辑行为数 编辑行为...
+  编辑行为：类型 颜色序号 线宽（文本为 0），之后按类型：
+  - 矩形/椭圆/箭头/打码（马赛克、模糊、填充）：起点 x y，终点相对起点的差值 dx dy
+  - 涂鸦：点数，首点 x y，之后每个点相对前一点的差值
+  - 序号：圆心 x y，半径，序号
+  - 文本：字体序号，文本框 x y w h，文本
+  字符串保存为 UTF-8 字节数加内容
+版本 2 新增了打码的三种类型，版本 1 的文档可以直接读取
+"""
+import json
+from array import array
+from itertools import accumulate
+from pathlib import Path
+
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QColor, QFont, QPolygonF
+
+from .AnnotationSpec import actions_to_spec, actions_from_spec
+from .CircleNumber import Circle
+
+FORMAT_NAME = 'hydra-annotations'
+FORMAT_VERSION = 2
+MAGIC = b'HYAN'
+BINARY_SUFFIX = '.hyan'
+QUANTUM = 16  # 二进制形式中每个逻辑像素分为多少份
+
+_kinds = ('rectangle', 'ellipse', 'arrow', 'graffiti', 'number', 'text', 'mosaic', 'blur', 'fill')
+_kind_codes = {kind: code for code, kind in enumerate(_kinds)}
+
+
+class AnnotationFormatError(ValueError):
+    """无法识别的标注文档或不支持的版本"""
+
+
+def _write_uint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_int(out, value):
+    _write_uint(out, value << 1 if value >= 0 else ~(value << 1))
+
+
+def _write_ints(out, values):
+    append = out.append
+    for value in values:
+        value = value << 1 if value >= 0 else ~(value << 1)
+        if value < 0x80:
+            append(value)
+        else:
+            _write_uint(out, value)
+
+
+def _write_str(out, text):
+    data = text.encode('utf8')
+    _write_uint(out, len(data))
+    out += data
+
+
+def _point_coords(points):
+    """点序列的坐标 [x0, y0, x1, y1, ...]，QPolygonF 直接读取其内存"""
+    if isinstance(points, QPolygonF):
+        if points.isEmpty():
+            return array('d')
+        data = points.data()
+        data.setsize(16 * points.size())
+        return array('d', bytes(data))
+    coords = []
+    for point in points:
+        coords += (point.x(), point.y())
+    return coords
+
+
+def _polygon(coords):
+    """由坐标 [x0, y0, x1, y1, ...] 直接写入内存构造 QPolygonF，避免逐个创建 QPointF"""
+    polygon = QPolygonF(len(coords) // 2)
+    if coords:
+        data = polygon.data()
+        data.setsize(8 * len(coords))
+        memoryview(data).cast('B')[:] = array('d', coords).tobytes()
+    return polygon
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = bytes(data)
+        self.pos = 0
+
+    def uint(self):
+        data, pos = self.data, self.pos
+        try:
+            byte = data[pos]
+            value = byte & 0x7f
+            shift = 7
+            while byte & 0x80:
+                pos += 1
+                byte = data[pos]
+                value |= (byte & 0x7f) << shift
+                shift += 7
+        except IndexError:
+            raise AnnotationFormatError('标注文档数据不完整') from None
+        self.pos = pos + 1
+        return value
+
+    def int(self):
+        value = self.uint()
+        return ~(value >> 1) if value & 1 else value >> 1
+
+    def ints(self, count):
+        """连续读取 count 个有符号整数，单字节的值直接解码"""
+        data, pos = self.data, self.pos
+        values = []
+        append = values.append
+        try:
+            for _ in range(count):
+                byte = data[pos]
+                if byte & 0x80:
+                    self.pos = pos
+                    value = self.uint()
+                    pos = self.pos
+                else:
+                    value = byte
+                    pos += 1
+                append(~(value >> 1) if value & 1 else value >> 1)
+        except IndexError:
+            raise AnnotationFormatError('标注文档数据不完整') from None
+        self.pos = pos
+        return values
+
+    def str(self):
+        length = self.uint()
+        start, self.pos = self.pos, self.pos + length
+        if self.pos > len(self.data):
+            raise AnnotationFormatError('标注文档数据不完整')
+        return self.data[start: self.pos].decode('utf8')
+
+    def coord(self):
+        return self.int() / QUANTUM
+
+
+class AnnotationDocument:
+    """
+    标注文档
+    参数：
+    - actions: 编辑行为（ScreenArea._actions 中的元组），坐标与 rect 处于同一坐标系
+    - rect: 截图区域（逻辑像素）
+    - pixelRatio: 截图的设备像素比，重新渲染时可按需改变
+    """
+
+    def __init__(self, actions=(), rect=None, pixelRatio=1.0):
+        self.actions = list(actions)
+        self.rect = QRectF(rect) if rect is not None else QRectF()
+        self.pixelRatio = pixelRatio
+
+    def __len__(self):
+        return len(self.actions)
+
+    def toActions(self, topLeft=None):
+        """返回编辑行为，topLeft 不为空时平移到截图区域左上角位于 topLeft 的坐标系"""
+        if topLeft is None or QPointF(topLeft) == self.rect.topLeft():
+            return list(self.actions)
+        return actions_from_spec(actions_to_spec(self.actions, self.rect.topLeft()), QPointF(topLeft))
+
+    # JSON 形式
+    def toDict(self):
+        rect = self.rect
+        return {'format': FORMAT_NAME, 'version': FORMAT_VERSION,
+                'rect': [rect.x(), rect.y(), rect.width(), rect.height()], 'pixelRatio': self.pixelRatio,
+                'annotations': actions_to_spec(self.actions, rect.topLeft())}
+
+    @classmethod
+    def fromDict(cls, data):
+        """读取 JSON 形式的文档，也兼容不带版本号的编辑行为列表或 {"rect", "annotations"} 字典"""
+        if isinstance(data, list):
+            data = {'annotations': data}
+        if data.get('version', 0) > FORMAT_VERSION:
+            raise AnnotationFormatError(f"不支持的标注文档版本：{data['version']}")
+        rect = QRectF(*data['rect']) if data.get('rect') else QRectF()
+        actions = actions_from_spec(data.get('annotations', []), rect.topLeft())
+        return cls(actions, rect, float(data.get('pixelRatio', 1.0)))
+
+    def toJson(self, indent=None):
+        return json.dumps(self.toDict(), ensure_ascii=False, indent=indent)
+
+    @classmethod
+    def fromJson(cls, text):
+        return cls.fromDict(json.loads(text))
+
+    # 二进制形式
+    def toBytes(self):
+        out = bytearray(MAGIC)
+        _write_uint(out, FORMAT_VERSION)
+        rect = self.rect
+        ox, oy = rect.x(), rect.y()
+        for value in (ox, oy, rect.width(), rect.height()):
+            _write_int(out, round(value * QUANTUM))
+        _write_uint(out, round(self.pixelRatio * 1000))
+
+        colors, fonts = {}, {}
+        for action in self.actions:
+            color = action[1].color if action[0] == 'number' else action[1]
+            colors.setdefault(color.rgba(), len(colors))
+            if action[0] == 'text':
+                fonts.setdefault(action[2].toString(), len(fonts))
+        _write_uint(out, len(colors))
+        for rgba in colors:
+            _write_uint(out, rgba)
+        _write_uint(out, len(fonts))
+        for font in fonts:
+            _write_str(out, font)
+
+        _write_uint(out, len(self.actions))
+        for action in self.actions:
+            kind = action[0]
+            _write_uint(out, _kind_codes[kind])
+            if kind == 'number':
+                circle = action[1]
+                _write_uint(out, colors[circle.color.rgba()])
+                _write_uint(out, circle.lineWidth)
+                _write_int(out, round((circle.startPoint.x() - ox) * QUANTUM))
+                _write_int(out, round((circle.startPoint.y() - oy) * QUANTUM))
+                _write_uint(out, round(circle.radius * QUANTUM))
+                _write_uint(out, circle.number)
+                continue
+            _write_uint(out, colors[action[1].rgba()])
+            if kind == 'text':  # (type, color, font, rectf, txt)
+                _write_uint(out, 0)
+                _write_uint(out, fonts[action[2].toString()])
+                rectf = action[3]
+                _write_int(out, round((rectf.x() - ox) * QUANTUM))
+                _write_int(out, round((rectf.y() - oy) * QUANTUM))
+                _write_int(out, round(rectf.width() * QUANTUM))
+                _write_int(out, round(rectf.height() * QUANTUM))
+                _write_str(out, action[4])
+                continue
+            _write_uint(out, action[2])
+            if kind == 'graffiti':  # (type, color, lineWidth, points)
+                points = action[3]
+                _write_uint(out, len(points))
+                coords = _point_coords(points)
+                xs = [round((x - ox) * QUANTUM) for x in coords[0::2]]
+                ys = [round((y - oy) * QUANTUM) for y in coords[1::2]]
+                deltas = [0] * (2 * len(points))  # 相邻两点的差值通常很小，绝大多数只占一个字节
+                deltas[0::2] = [x - last for x, last in zip(xs, [0] + xs)]
+                deltas[1::2] = [y - last for y, last in zip(ys, [0] + ys)]
+                _write_ints(out, deltas)
+            else:  # (type, color, lineWidth, startPoint, endPoint)
+                x = round((action[3].x() - ox) * QUANTUM)
+                y = round((action[3].y() - oy) * QUANTUM)
+                _write_int(out, x)
+                _write_int(out, y)
+                _write_int(out, round((action[4].x() - ox) * QUANTUM) - x)
+                _write_int(out, round((action[4].y() - oy) * QUANTUM) - y)
+        return bytes(out)
+
+    @classmethod
+    def fromBytes(cls, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise AnnotationFormatError('不是标注文档')
+        reader = _Reader(data)
+        reader.pos = len(MAGIC)
+        version = reader.uint()
+        if version > FORMAT_VERSION:
+            raise AnnotationFormatError(f'不支持的标注文档版本：{version}')
+        rect = QRectF(reader.coord(), reader.coord(), reader.coord(), reader.coord())
+        ox, oy = rect.x(), rect.y()
+        pixelRatio = reader.uint() / 1000
+        colors = [QColor.fromRgba(reader.uint()) for _ in range(reader.uint())]
+        fonts = []
+        for _ in range(reader.uint()):
+            font = QFont()
+            font.fromString(reader.str())
+            fonts.append(font)
+
+        actions = []
+        uint, sint = reader.uint, reader.int
+        try:
+            for _ in range(uint()):
+                kind = _kinds[uint()]
+                color = colors[uint()]
+                lineWidth = uint()
+                if kind == 'graffiti':
+                    deltas = reader.ints(2 * uint())
+                    coords = [0.0] * len(deltas)
+                    coords[0::2] = [ox + x / QUANTUM for x in accumulate(deltas[0::2])]
+                    coords[1::2] = [oy + y / QUANTUM for y in accumulate(deltas[1::2])]
+                    actions.append((kind, color, lineWidth, _polygon(coords)))
+                elif kind == 'number':
+                    center = QPointF(ox + sint() / QUANTUM, oy + sint() / QUANTUM)
+                    radius = uint() / QUANTUM
+                    actions.append((kind, Circle(center, color, lineWidth, radius, uint())))
+                elif kind == 'text':
+                    font = fonts[uint()]
+                    rectf = QRectF(ox + sint() / QUANTUM, oy + sint() / QUANTUM, sint() / QUANTUM, sint() / QUANTUM)
+                    actions.append((kind, color, QFont(font), rectf, reader.str()))
+                else:
+                    x, y = sint(), sint()
+                    dx, dy = sint(), sint()
+                    actions.append((kind, color, lineWidth, QPointF(ox + x / QUANTUM, oy + y / QUANTUM),
+                                    QPointF(ox + (x + dx) / QUANTUM, oy + (y + dy) / QUANTUM)))
+        except IndexError:
+            raise AnnotationFormatError('标注文档中的类型、颜色或字体序号无效') from None
+        return cls(actions, rect, pixelRatio)
+
+    # 文件
+    def save(self, path):
+        """按扩展名保存：.hyan 为二进制形式，其余为 JSON 形式"""
+        path = Path(path)
+        if path.suffix.lower() == BINARY_SUFFIX:
+            path.write_bytes(self.toBytes())
+        else:
+            path.write_text(self.toJson(), encoding='utf8')
+
+    @classmethod
+    def load(cls, path):
+        """读取文件，按内容自动识别二进制或 JSON 形式"""
+        data = Path(path).read_bytes()
+        if data.startswith(MAGIC):
+            return cls.fromBytes(data)
+        return cls.fromJson(data.decode('utf8'))
+
+    def diff(self, other):
+        """
+        与另一个文档比较编辑行为（按相对截图区域左上角、量化后的坐标），
+        返回 (仅在 other 中的编辑行为字典, 仅在本文档中的编辑行为字典)
+        """
+        def keys(document):
+            result = {}
+            for data in actions_to_spec(document.actions, document.rect.topLeft()):
+                key = json.dumps(_quantized(data), sort_keys=True, ensure_ascii=False)
+                result.setdefault(key, []).append(data)
+            return result
+
+        mine, theirs = keys(self), keys(other)
+        added = [data for key, items in theirs.items() for data in items[len(mine.get(key, ())):]]
+        removed = [data for key, items in mine.items() for data in items[len(theirs.get(key, ())):]]
+        return added, removed
+
+
+def _quantized(value):
+    if isinstance(value, float):
+        return round(value * QUANTUM) / QUANTUM
+    if isinstance(value, list):
+        return [_quantized(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _quantized(item) for key, item in value.items()}
+    return value
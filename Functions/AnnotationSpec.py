@@ -0,0 +1,76 @@
+"""
+编辑行为（ScreenArea._actions 中的元组）与纯数据字典之间的相互转换，便于保存到磁盘或以 JSON 形式传递。
+坐标可整体平移 offset，通常用于把坐标换算为相对截图区域左上角的坐标。
+"""
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QColor, QFont
+
+from .CircleNumber import Circle
+
+
+def color_to_str(color):
+    return QColor(color).name(QColor.NameFormat.HexArgb)
+
+
+def color_from_str(text):
+    return QColor(text)
+
+
+def point_to_list(point, offset=QPointF()):
+    return [point.x() - offset.x(), point.y() - offset.y()]
+
+
+def point_from_list(values, offset=QPointF()):
+    return QPointF(values[0] + offset.x(), values[1] + offset.y())
+
+
+def action_to_dict(action, offset=QPointF()):
+    """将一个编辑行为转换为字典"""
+    kind = action[0]
+    if kind in ('rectangle', 'ellipse', 'arrow', 'mosaic', 'blur', 'fill'):  # (type, color, lineWidth, start, end)
+        return {'type': kind, 'color': color_to_str(action[1]), 'width': action[2],
+                'start': point_to_list(action[3], offset), 'end': point_to_list(action[4], offset)}
+    elif kind == 'graffiti':  # (type, color, lineWidth, points)
+        return {'type': kind, 'color': color_to_str(action[1]), 'width': action[2],
+                'points': [point_to_list(point, offset) for point in action[3]]}
+    elif kind == 'number':  # (type, circle)
+        circle = action[1]
+        return {'type': kind, 'color': color_to_str(circle.color), 'width': circle.lineWidth,
+                'center': point_to_list(circle.startPoint, offset), 'radius': circle.radius,
+                'number': circle.number}
+    elif kind == 'text':  # (type, color, font, rectf, txt)
+        rectf = action[3]
+        return {'type': kind, 'color': color_to_str(action[1]), 'font': action[2].toString(),
+                'rect': point_to_list(rectf.topLeft(), offset) + [rectf.width(), rectf.height()],
+                'text': action[4]}
+    raise ValueError(f'未知的编辑行为类型：{kind}')
+
+
+def action_from_dict(data, offset=QPointF()):
+    """将字典还原为编辑行为"""
+    kind = data['type']
+    if kind in ('rectangle', 'ellipse', 'arrow', 'mosaic', 'blur', 'fill'):
+        return (kind, color_from_str(data['color']), int(data['width']),
+                point_from_list(data['start'], offset), point_from_list(data['end'], offset))
+    elif kind == 'graffiti':
+        return (kind, color_from_str(data['color']), int(data['width']),
+                [point_from_list(point, offset) for point in data['points']])
+    elif kind == 'number':
+        circle = Circle(point_from_list(data['center'], offset), color_from_str(data['color']),
+                        int(data['width']), data['radius'], int(data['number']))
+        return (kind, circle)
+    elif kind == 'text':
+        font = QFont()
+        font.fromString(data['font'])
+        x, y, w, h = data['rect']
+        rectf = QRectF(x + offset.x(), y + offset.y(), w, h)
+        return (kind, color_from_str(data['color']), font, rectf, data['text'])
+    raise ValueError(f'未知的编辑行为类型：{kind}')
+
+
+def actions_to_spec(actions, offset=QPointF()):
+    return [action_to_dict(action, offset) for action in actions]
+
+
+def actions_from_spec(spec, offset=QPointF()):
+    return [action_from_dict(data, offset) for data in spec]
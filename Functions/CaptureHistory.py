@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage
+
+from .AnnotationDocument import AnnotationDocument, BINARY_SUFFIX
+from .ThumbnailAtlas import ThumbnailAtlas
+
+
+class CaptureRecord:
+    """
+    一条截图历史记录
+    - id: 记录编号
+    - timestamp: 截图时间（秒）
+    - width、height: 截图的像素大小
+    - pixelRatio: 截图的设备像素比
+    - rect: 截图区域的全局逻辑矩形 [x, y, w, h]
+    - screen: 截图区域所在的屏幕名称
+    - chunks: 按行优先排列的图块哈希
+    - tileOrigin: 图块网格在截图中的起点 [x, y]，使网格与整个桌面的物理像素网格对齐
+    - annotations: 相对截图区域左上角的编辑行为（见 AnnotationSpec），旧版本的记录使用
+    - document: 编辑行为保存为二进制标注文档（见 AnnotationDocument）时的文件名
+    """
+
+    def __init__(self, id, timestamp, width, height, pixelRatio, rect, screen='', chunks=None,
+                 annotations=None, lastAccess=None, document='', tileOrigin=None):
+        self.id = id
+        self.timestamp = timestamp
+        self.width = width
+        self.height = height
+        self.pixelRatio = pixelRatio
+        self.rect = rect
+        self.screen = screen
+        self.chunks = chunks or []
+        self.annotations = annotations or []
+        self.lastAccess = lastAccess or timestamp
+        self.document = document
+        self.tileOrigin = tileOrigin or [0, 0]  # 旧版本的记录从截图左上角切分
+
+    def rectF(self):
+        return QRectF(*self.rect)
+
+    def toDict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def fromDict(cls, data):
+        return cls(**data)
+
+
+class CaptureHistory:
+    """
+    截图历史存储：按内容寻址，把截图按与桌面对齐的固定网格切成图块分别压缩保存。
+    不同截图中相同的屏幕区域（任务栏、窗口标题栏等）即使截图区域不同也落在相同的图块上，只保存一次；
+    总大小超出上限时按最近访问时间淘汰最旧的记录，并回收不再被引用的图块。
+    最近的若干张截图同时缓存在内存中，重新打开时无需解码。
+    参数：
+    - root: 存储目录
+    - maxBytes: 图块压缩后的总大小上限
+    - cacheCount: 内存中缓存的截图数量
+    """
+
+    tile_size = 128  # 图块边长（像素）
+    compress_level = 1  # zlib 压缩级别，优先速度
+    image_format = QImage.Format.Format_ARGB32
+
+    def __init__(self, root, maxBytes=512 * 1024 * 1024, cacheCount=8):
+        self.root = Path(root)
+        self.chunk_dir = self.root / 'chunks'
+        self.document_dir = self.root / 'annotations'
+        self.index_path = self.root / 'index.json'
+        self.maxBytes = maxBytes
+        self.cacheCount = cacheCount
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()  # id -> QImage
+        self._records = {}  # id -> CaptureRecord
+        self._chunks = {}  # hash -> [引用计数, 压缩后字节数]
+        self._storedBytes = 0  # 图块压缩后的总大小
+        self._dirty = False  # 索引中有尚未写入文件的改动（如最近访问时间）
+        self.atlas = ThumbnailAtlas(self.root)  # 缩略图图集，供历史截图选择器使用
+        self._loadIndex()
+
+    @classmethod
+    def fromSettings(cls, settings):
+        root = settings.get('HistorySettings', 'history_path',
+                            fallback=str(settings.home / '.hydra-screenshot' / 'history'))
+        maxBytes = int(settings.get('HistorySettings', 'max_size_mb', fallback='512')) * 1024 * 1024
+        cacheCount = int(settings.get('HistorySettings', 'cache_count', fallback='8'))
+        return cls(root, maxBytes, cacheCount)
+
+    def _loadIndex(self):
+        if self.index_path.exists():
+            with open(self.index_path, encoding='utf8') as f:
+                data = json.load(f)
+            self._records = {item['id']: CaptureRecord.fromDict(item) for item in data.get('captures', [])}
+            self._chunks = data.get('chunks', {})
+            self._storedBytes = sum(size for _, size in self._chunks.values())
+
+    def _saveIndex(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {'captures': [record.toDict() for record in self._records.values()], 'chunks': self._chunks}
+        temp_path = self.index_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)  # 先写临时文件再替换，避免写入中断损坏索引
+        self._dirty = False
+
+    def flush(self):
+        """写入尚未保存的最近访问时间，退出前调用"""
+        with self._lock:
+            if self._dirty:
+                self._saveIndex()
+
+    def _chunkPath(self, digest):
+        return self.chunk_dir / digest[:2] / digest
+
+    def tileOrigin(self, rect, pixelRatio):
+        """截图区域左上角在桌面物理像素网格中的偏移，同一块屏幕内容无论从哪里开始截取都切出相同的图块"""
+        return [round(rect.x() * pixelRatio) % self.tile_size, round(rect.y() * pixelRatio) % self.tile_size]
+
+    def _spans(self, length, origin):
+        """[0, length) 按网格切分，第一段截至下一条网格线"""
+        start = 0
+        end = (self.tile_size - origin) % self.tile_size or self.tile_size
+        while start < length:
+            yield start, min(end, length) - start
+            start, end = end, end + self.tile_size
+
+    def _tileRects(self, width, height, origin=(0, 0)):
+        for y, h in self._spans(height, origin[1]):
+            for x, w in self._spans(width, origin[0]):
+                yield x, y, w, h
+
+    def storedBytes(self):
+        """图块压缩后的总大小，随添加和删除图块增减，无需每次重新统计"""
+        return self._storedBytes
+
+    def records(self):
+        """所有记录，最新的在前"""
+        with self._lock:
+            return sorted(self._records.values(), key=lambda record: record.timestamp, reverse=True)
+
+    def record(self, captureId):
+        return self._records.get(captureId)
+
+    def add(self, image: QImage, rect, annotations=None, screen=''):
+        """
+        保存一张截图，返回记录编号
+        image: 截图区域的原始图像（不含编辑结果）
+        rect: 截图区域的全局逻辑矩形
+        annotations: 编辑行为（AnnotationDocument），以二进制标注文档单独保存，不写入索引
+        """
+        image = image.convertToFormat(self.image_format)
+        width, height = image.width(), image.height()
+        bytesPerLine = image.bytesPerLine()
+        ptr = image.constBits()
+        ptr.setsize(image.sizeInBytes())
+        buffer = memoryview(ptr)
+        digests = []
+        origin = self.tileOrigin(rect, image.devicePixelRatio())
+        with self._lock:
+            for x, y, w, h in self._tileRects(width, height, origin):
+                tile = b''.join(buffer[row * bytesPerLine + x * 4: row * bytesPerLine + (x + w) * 4]
+                                for row in range(y, y + h))
+                digest = hashlib.blake2b(tile, digest_size=16,
+                                         person=w.to_bytes(4, 'little') + h.to_bytes(4, 'little')).hexdigest()
+                if digest in self._chunks:  # 相同的图块只保存一次
+                    self._chunks[digest][0] += 1
+                else:
+                    data = zlib.compress(tile, self.compress_level)
+                    path = self._chunkPath(digest)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(data)
+                    self._chunks[digest] = [1, len(data)]
+                    self._storedBytes += len(data)
+                digests.append(digest)
+            now = time.time()
+            record = CaptureRecord(uuid.uuid4().hex, now, width, height, image.devicePixelRatio(),
+                                   [rect.x(), rect.y(), rect.width(), rect.height()], screen, digests,
+                                   tileOrigin=origin)
+            if annotations:
+                record.document = record.id + BINARY_SUFFIX
+                self.document_dir.mkdir(parents=True, exist_ok=True)
+                (self.document_dir / record.document).write_bytes(annotations.toBytes())
+            self._records[record.id] = record
+            self._remember(record.id, image)
+            self.atlas.add(record.id, image, now, screen)
+            self.evict()
+            self._saveIndex()
+        return record.id
+
+    def load(self, captureId):
+        """
+        读取截图，返回 (QImage, CaptureRecord)。最近使用过的截图直接从内存缓存返回。
+        更新的最近访问时间随下一次写入索引（或 flush）一起保存，读取本身不写文件
+        """
+        with self._lock:
+            record = self._records[captureId]
+            record.lastAccess = time.time()
+            image = self._cache.get(captureId)
+            if image is None:
+                image = self._decode(record)
+                image.setDevicePixelRatio(record.pixelRatio)
+            self._remember(captureId, image)
+            self._dirty = True
+            return image, record
+
+    def annotations(self, captureId):
+        """读取截图的编辑行为，返回 AnnotationDocument，使用时以 toActions 平移到截图区域所在的位置"""
+        record = self._records[captureId]
+        if record.document:
+            path = self.document_dir / record.document
+            if path.exists():
+                return AnnotationDocument.fromBytes(path.read_bytes())
+        return AnnotationDocument.fromDict({'rect': record.rect, 'annotations': record.annotations,
+                                            'pixelRatio': record.pixelRatio})
+
+    def _decode(self, record):
+        bytesPerLine = record.width * 4
+        buffer = bytearray(bytesPerLine * record.height)
+        tiles = self._tileRects(record.width, record.height, record.tileOrigin)
+        for (x, y, w, h), digest in zip(tiles, record.chunks):
+            tile = zlib.decompress(self._chunkPath(digest).read_bytes())
+            for i in range(h):
+                start = (y + i) * bytesPerLine + x * 4
+                buffer[start: start + w * 4] = tile[i * w * 4: (i + 1) * w * 4]
+        return QImage(bytes(buffer), record.width, record.height, bytesPerLine, self.image_format).copy()
+
+    def _remember(self, captureId, image):
+        self._cache[captureId] = image
+        self._cache.move_to_end(captureId)
+        while len(self._cache) > self.cacheCount:
+            self._cache.popitem(last=False)
+
+    def remove(self, captureId):
+        with self._lock:
+            record = self._records.pop(captureId, None)
+            self._cache.pop(captureId, None)
+            if record is None:
+                return
+            self.atlas.remove(captureId)
+            if record.document:
+                (self.document_dir / record.document).unlink(missing_ok=True)
+            for digest in record.chunks:
+                entry = self._chunks.get(digest)
+                if entry is None:
+                    continue
+                entry[0] -= 1
+                if entry[0] <= 0:  # 没有任何截图再引用该图块时删除
+                    del self._chunks[digest]
+                    self._storedBytes -= entry[1]
+                    self._chunkPath(digest).unlink(missing_ok=True)
+
+    def evict(self):
+        """总大小超出上限时，按最近访问时间从旧到新淘汰记录（至少保留一条）"""
+        with self._lock:
+            records = sorted(self._records.values(), key=lambda record: record.lastAccess)
+            while self._storedBytes > self.maxBytes and len(records) > 1:
+                self.remove(records.pop(0).id)
@@ -1,45 +1,68 @@
-from PyQt5.QtCore import QRectF, Qt
-from PyQt5.QtGui import QPen, QFont, QPainter
+from collections import OrderedDict
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QPen, QFont, QPainter, QPixmap
+
+from .VectorExport import is_vector_painter
+
+_glyph_cache = OrderedDict()  # (颜色, 线宽, 半径, 序号, 设备像素比) -> 预先绘制好的序号图片
+_glyph_cache_size = 256
+
+
+def paint_circle(painter, center, color, lineWidth, radius, number):
+    """直接绘制序号圆圈"""
+    painter.setPen(QPen(color, lineWidth))
+    painter.setBrush(color)
+    rect = QRectF(center.x() - radius, center.y() - radius, 2 * radius, 2 * radius)
+    painter.drawEllipse(rect)
+    font = QFont()
+    font.setPointSize(lineWidth * 3)
+    painter.setFont(font)
+    painter.setPen(Qt.white)
+    painter.drawText(rect, Qt.AlignCenter, str(number))
+
+
+def circle_glyph(color, lineWidth, radius, number, pixelRatio=1.0):
+    """预先绘制的序号圆圈，相同外观的序号只绘制一次，之后每帧直接贴图"""
+    key = (color.rgba(), lineWidth, radius, number, pixelRatio)
+    glyph = _glyph_cache.get(key)
+    if glyph is None:
+        extent = radius + lineWidth / 2 + 1  # 圆心到图片边缘的距离（包含画笔宽度）
+        glyph = QPixmap(round(2 * extent * pixelRatio), round(2 * extent * pixelRatio))
+        glyph.setDevicePixelRatio(pixelRatio)
+        glyph.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(glyph)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)  # 反走样
+        paint_circle(painter, QPointF(extent, extent), color, lineWidth, radius, number)
+        painter.end()
+        _glyph_cache[key] = glyph
+        while len(_glyph_cache) > _glyph_cache_size:
+            _glyph_cache.popitem(last=False)
+    else:
+        _glyph_cache.move_to_end(key)
+    return glyph
 
 
 class Circle:
-    number = 0
-    __all_circles = []
+    """
+    序号标记，序号由所在截图的编辑行为决定（见 ScreenArea.nextCircleNumber），不再使用全局计数
+    """
 
-    def __init__(self, startPoint, color=None, lineWidth=None, radius=None):
-        Circle.number += 1
-        self.number = Circle.number
+    def __init__(self, startPoint, color=None, lineWidth=None, radius=None, number=1):
+        self.number = number
         self.startPoint = startPoint
         self.color = color
         self.lineWidth = lineWidth
         self.radius = radius
-        Circle.__all_circles.append(self)
 
     def paint(self, painter):
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)  # 反走样
-        painter.setPen(QPen(self.color, self.lineWidth))
-        painter.setBrush(self.color)
-
-        x, y = self.startPoint.x() - self.radius, self.startPoint.y() - self.radius
-        rect = QRectF(x, y, 2 * self.radius, 2 * self.radius)
-        painter.drawEllipse(rect)
-
-        font = QFont()
-        font.setPointSize(self.lineWidth * 3)
-        painter.setFont(font)
-        painter.setPen(Qt.white)
-        textRect = QRectF(x, y, 2 * self.radius, 2 * self.radius)
-        painter.drawText(textRect, Qt.AlignCenter, str(self.number))
-
-    @classmethod
-    def destroyAll(cls):
-        cls.number = 0
-        cls.__all_circles.clear()
-
-    @classmethod
-    def getAll(cls):
-        return cls.__all_circles
-
-    @classmethod
-    def pop(cls):
-        return cls.__all_circles.pop()
+        if is_vector_painter(painter):  # 导出 SVG/PDF 时绘制矢量图形
+            painter.save()
+            paint_circle(painter, self.startPoint, self.color, self.lineWidth, self.radius, self.number)
+            painter.restore()
+            return
+        pixelRatio = painter.device().devicePixelRatioF() if painter.device() else 1.0
+        glyph = circle_glyph(self.color, self.lineWidth, self.radius, self.number, pixelRatio)
+        extent = glyph.width() / pixelRatio / 2
+        painter.drawPixmap(QRectF(self.startPoint.x() - extent, self.startPoint.y() - extent, 2 * extent, 2 * extent),
+                           glyph, QRectF(glyph.rect()))
@@ -30,6 +30,7 @@ class ColorAction(QAction):
         self.parent().thin_line.refresh(color)  # 刷新小尺寸行动条颜色
         self.parent().medium_line.refresh(color)  # 刷新中等尺寸行动条颜色
         self.parent().thick_line.refresh(color)  # 刷新大尺寸行动条颜色
+        self.parent().fill_action.refresh(color)  # 刷新纯色填充打码工具的图标
 
     def onTriggered(self):
         """
@@ -1,5 +1,5 @@
 from PyQt5.QtCore import QRectF, QPointF, Qt
-from PyQt5.QtGui import QIcon
+from PyQt5.QtGui import QIcon, QPainter, QColor, QBrush, QRadialGradient, QPixmap, QFont, QPen
 from PyQt5.QtWidgets import QAction
 
 
@@ -41,3 +41,71 @@ class LineWidthAction(QAction):
         触发事件处理函数
         """
         self.parent().set_current_line_width(self.lineWidth)
+
+
+class RedactionAction(QAction):
+    """
+    打码工具，图标直接绘制而不依赖图片文件
+    参数：
+    - text: 工具名称
+    - parent: 父部件（工具条）
+    - mode: 打码方式，'mosaic'（马赛克）、'blur'（模糊）或 'fill'（纯色填充）
+    """
+
+    def __init__(self, text, parent, mode):
+        super().__init__(text, parent)
+        self.mode = mode
+        self.refresh(Qt.GlobalColor.black)
+
+    def refresh(self, color):
+        """
+        刷新图标，纯色填充的图标使用当前画笔颜色
+        参数：
+        - color: 画笔颜色
+        """
+        painter = self.parent().screenshot_area.screenArea._painter
+        pixmap = self.parent().icon_pixmap_copy()
+        rectf = QRectF(pixmap.rect()).adjusted(4, 6, -4, -6)
+        painter.begin(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        painter.setPen(Qt.PenStyle.NoPen)
+        if self.mode == 'mosaic':  # 深浅交错的方格
+            cell = rectf.width() / 4
+            for row in range(round(rectf.height() / cell)):
+                for column in range(4):
+                    painter.setBrush(QColor(90, 90, 90) if (row + column) % 2 else QColor(190, 190, 190))
+                    painter.drawRect(QRectF(rectf.left() + column * cell, rectf.top() + row * cell, cell, cell))
+        elif self.mode == 'blur':  # 由中心向外渐隐的圆
+            gradient = QRadialGradient(rectf.center(), rectf.height() / 2 + 2)
+            gradient.setColorAt(0, QColor(60, 60, 60))
+            gradient.setColorAt(1, QColor(60, 60, 60, 0))
+            painter.setBrush(QBrush(gradient))
+            painter.drawEllipse(rectf.center(), rectf.width() / 2, rectf.height() / 2 + 2)
+        else:  # 当前颜色的实心矩形
+            painter.setBrush(QColor(color))
+            painter.drawRoundedRect(rectf, 2, 2)
+        painter.end()
+        self.setIcon(QIcon(pixmap))
+
+
+def glyph_icon(text, size=32):
+    """
+    绘制带方框的文字图标，用于没有图片文件的工具
+    参数：
+    - text: 图标中的文字，一两个字为宜
+    - size: 图标边长
+    """
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+    painter.setPen(QPen(QColor(60, 60, 60), 2))
+    rectf = QRectF(pixmap.rect()).adjusted(3, 3, -3, -3)
+    painter.drawRoundedRect(rectf, 4, 4)
+    font = QFont('微软雅黑')
+    font.setBold(True)
+    font.setPixelSize(int(rectf.height() * (0.6 if len(text) == 1 else 0.4)))
+    painter.setFont(font)
+    painter.drawText(rectf, Qt.AlignmentFlag.AlignCenter, text)
+    painter.end()
+    return QIcon(pixmap)
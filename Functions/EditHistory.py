@@ -0,0 +1,153 @@
+from abc import ABC, abstractmethod
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QPolygonF
+
+
+def action_bounds(action):
+    """编辑行为在截图窗口上影响的矩形范围（包含线宽、箭头和文本边框），用于局部重绘"""
+    kind = action[0]
+    if kind in ('rectangle', 'ellipse', 'arrow'):  # (type, color, lineWidth, startPoint, endPoint)
+        margin = action[2] * (4 if kind == 'arrow' else 1) + 2
+        rectf = QRectF(action[3], action[4]).normalized()
+    elif kind == 'graffiti':  # (type, color, lineWidth, points)
+        margin = action[2] + 2
+        rectf = QPolygonF(action[3]).boundingRect()
+    elif kind == 'number':  # (type, circle)
+        circle = action[1]
+        margin = circle.lineWidth + 2
+        rectf = QRectF(circle.startPoint.x() - circle.radius, circle.startPoint.y() - circle.radius,
+                       2 * circle.radius, 2 * circle.radius)
+    elif kind == 'text':  # (type, color, font, rectf, txt)
+        margin = 2
+        rectf = QRectF(action[3])
+    elif kind in ('mosaic', 'blur', 'fill'):  # (type, color, lineWidth, startPoint, endPoint)
+        margin = 1
+        rectf = QRectF(action[3], action[4]).normalized()
+    else:
+        return QRectF()
+    return rectf.adjusted(-margin, -margin, margin, margin)
+
+
+def index_of(actions, action):
+    """按对象查找编辑行为的位置（编辑行为是元组，相同内容的两次绘制也要区分开）"""
+    return next(i for i, item in enumerate(actions) if item is action)
+
+
+class EditCommand(ABC):
+    """编辑命令的基类，只保存本次修改的差异，在编辑行为列表上执行和撤销"""
+
+    @abstractmethod
+    def redo(self, actions):
+        ...
+
+    @abstractmethod
+    def undo(self, actions):
+        ...
+
+    @abstractmethod
+    def bounds(self):
+        """执行或撤销该命令时需要重绘的区域"""
+
+
+class AddCommand(EditCommand):
+    """新增一个编辑行为（矩形、涂鸦、序号等）。
+    撤销时按对象而不是下标删除：重新编辑文本时旧文本被暂时取出，之后放回会改变其他编辑行为的下标"""
+
+    def __init__(self, action, index=None):
+        self.action = action
+        self.index = index
+
+    def redo(self, actions):
+        if self.index is None:
+            actions.append(self.action)
+        else:
+            actions.insert(min(self.index, len(actions)), self.action)
+
+    def undo(self, actions):
+        self.index = index_of(actions, self.action)  # 重做时放回撤销前的位置
+        actions.pop(self.index)
+
+    def bounds(self):
+        return action_bounds(self.action)
+
+
+class ReplaceCommand(EditCommand):
+    """替换列表中的一个编辑行为，例如修改已输入的文本"""
+
+    def __init__(self, index, old, new):
+        self.index = index
+        self.old = old
+        self.new = new
+
+    def redo(self, actions):
+        actions[self.index] = self.new
+
+    def undo(self, actions):
+        actions[self.index] = self.old
+
+    def bounds(self):
+        return action_bounds(self.old).united(action_bounds(self.new))
+
+
+class RemoveCommand(EditCommand):
+    """删除列表中的一个编辑行为，例如把已输入的文本清空"""
+
+    def __init__(self, index, action):
+        self.index = index
+        self.action = action
+
+    def redo(self, actions):
+        actions.pop(self.index)
+
+    def undo(self, actions):
+        actions.insert(self.index, self.action)
+
+    def bounds(self):
+        return action_bounds(self.action)
+
+
+class EditHistory:
+    """
+    编辑行为的撤销/重做历史
+    参数：
+    - actions: 被修改的编辑行为列表
+    """
+
+    def __init__(self, actions):
+        self.actions = actions
+        self._undo = []
+        self._redo = []
+
+    def push(self, command: EditCommand):
+        """执行新命令，之前被撤销的命令不再能重做"""
+        command.redo(self.actions)
+        self._undo.append(command)
+        self._redo.clear()
+        return command
+
+    def undo(self):
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        command.undo(self.actions)
+        self._redo.append(command)
+        return command
+
+    def redo(self):
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        command.redo(self.actions)
+        self._undo.append(command)
+        return command
+
+    def canUndo(self):
+        return bool(self._undo)
+
+    def canRedo(self):
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage
+
+from .SmartSelection import ElementProvider
+
+
+class ContourElementProvider(ElementProvider):
+    """
+    基于边缘和轮廓检测的候选区域：Canny 边缘经膨胀连接断开的边框后查找轮廓，取各轮廓的外接矩形。
+    窗口、按钮、输入框、卡片等界面元素通常有清晰的边框或与背景的色差，外接矩形即为其范围
+    参数：
+    - low、high: Canny 的两个阈值
+    - maxSide: 截图较大时先缩小到长边不超过该值再检测，检测结果按比例换算回原图
+    """
+    name = 'contours'
+
+    def __init__(self, low=40, high=120, maxSide=1920):
+        self.low = low
+        self.high = high
+        self.maxSide = maxSide
+
+    def detect(self, image: QImage):
+        if image.isNull():  # 例如截屏失败时
+            return []
+        gray = image.convertToFormat(QImage.Format.Format_Grayscale8)
+        ptr = gray.constBits()
+        ptr.setsize(gray.sizeInBytes())
+        array = np.frombuffer(ptr, np.uint8).reshape(gray.height(), gray.bytesPerLine())[:, :gray.width()]
+        scale = min(1.0, self.maxSide / max(array.shape))
+        if scale < 1.0:
+            array = cv2.resize(array, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        edges = cv2.Canny(array, self.low, self.high)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+        contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        rects = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            # 膨胀使外接矩形向外扩大了 1 像素
+            rects.append(((x + 1) / scale, (y + 1) / scale, max(0, w - 2) / scale, max(0, h - 2) / scale))
+        return rects
@@ -0,0 +1,61 @@
+"""
+长截图拼接前的帧筛选：每次滚动都截取一帧，但页面可能还没有移动（平滑滚动刚开始、内容正在加载），
+也可能正处在滚动动画中途。先按固定间隔抽样成小的灰度图，与上一次交给拼接的帧比较：
+- 几乎相同：页面没有移动，直接跳过；
+- 与上一次抽样也不同：页面仍在变化，暂缓拼接，等下一次抽样与它一致（画面稳定）后再拼接；
+只有稳定的新画面才会进行偏移量估计，减少无效的匹配。
+"""
+import numpy as np
+
+
+class FrameGate:
+    """
+    参数：
+    - step: 抽样间隔（像素）
+    - threshold: 两次抽样平均每像素差异（灰度级）不超过该值时视为相同
+    - max_defer: 最多连续暂缓的帧数，持续滚动时也要及时拼接，以免相邻两次拼接的帧之间没有重叠
+    """
+    ACCEPT, SKIP, DEFER = 'accept', 'skip', 'defer'
+
+    def __init__(self, step=4, threshold=0.5, max_defer=4):
+        self.step = step
+        self.threshold = threshold
+        self.max_defer = max_defer
+        self.reset()
+
+    def reset(self):
+        self._accepted = None  # 上一次交给拼接的帧的抽样
+        self._pending = None  # 暂缓的帧的抽样
+        self._deferred = 0  # 连续暂缓的帧数
+        self.counts = {self.ACCEPT: 0, self.SKIP: 0, self.DEFER: 0}
+
+    def sample(self, frame: np.ndarray):
+        """按间隔抽样并转为灰度（通道均值），只读取约 1/step² 的像素"""
+        sampled = frame[::self.step, ::self.step]
+        return sampled[..., :3].mean(axis=2, dtype=np.float32) if sampled.ndim == 3 else sampled.astype(np.float32)
+
+    def same(self, a, b):
+        return a is not None and a.shape == b.shape and float(np.abs(a - b).mean()) <= self.threshold
+
+    def check(self, frame: np.ndarray, force=False):
+        """
+        判断这一帧是否需要拼接，返回 ACCEPT、SKIP 或 DEFER
+        force: 不再暂缓（如保存前的最后一帧），与上一次拼接的帧相同时仍然跳过
+        """
+        sample = self.sample(frame)
+        if self.same(self._accepted, sample):
+            verdict = self.SKIP
+            self._pending, self._deferred = None, 0
+        elif self._accepted is None or force or self._deferred >= self.max_defer or self.same(self._pending, sample):
+            verdict = self.ACCEPT
+            self._accepted, self._pending, self._deferred = sample, None, 0
+        else:
+            verdict = self.DEFER
+            self._pending = sample
+            self._deferred += 1
+        self.counts[verdict] += 1
+        return verdict
+
+    def saved(self):
+        """省去的偏移量估计次数（跳过和暂缓的帧）"""
+        return self.counts[self.SKIP] + self.counts[self.DEFER]
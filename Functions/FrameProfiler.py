@@ -0,0 +1,161 @@
+import json
+import os
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QColor, QFont
+
+_null_phase = nullcontext()
+
+
+class FrameProfiler:
+    """
+    截图窗口的帧耗时分析（默认关闭）：记录每帧各绘制阶段的耗时、输入事件到绘制完成的延迟和掉帧数，
+    可在窗口左上角显示统计浮层，并在每次截图结束时导出 Chrome Trace 格式的 JSON（chrome://tracing 或 Perfetto 打开）。
+    参数：
+    - enabled: 是否启用
+    - traceDir: 导出目录，为空时不导出
+    - refreshRate: 显示器刷新率，用于计算每帧预算和掉帧数
+    """
+
+    env_name = 'HYDRA_PROFILE'  # 设置该环境变量为 1 也可启用
+    max_events = 100000  # 每次截图最多保留的 trace 事件数
+    hud_frames = 60  # 浮层统计最近多少帧
+
+    def __init__(self, enabled=False, traceDir=None, refreshRate=60.0):
+        self.enabled = enabled
+        self.traceDir = Path(traceDir) if traceDir else None
+        self.frameBudget = 1000.0 / (refreshRate or 60.0)  # 毫秒
+        self.reset()
+
+    @classmethod
+    def fromSettings(cls, settings, refreshRate=60.0):
+        enabled = os.environ.get(cls.env_name) == '1' or \
+            settings.get('DebugSettings', 'is_profile', fallback='False') == 'True'
+        traceDir = settings.get('DebugSettings', 'trace_path',
+                                fallback=str(settings.home / '.hydra-screenshot' / 'traces'))
+        return cls(enabled, traceDir, refreshRate)
+
+    def reset(self):
+        """开始新的一次截图（会话）"""
+        self._origin = time.perf_counter_ns()
+        self._events = deque(maxlen=self.max_events)
+        self._frames = deque(maxlen=self.hud_frames)  # (帧耗时, {阶段: 耗时}, 延迟)，单位毫秒
+        self._pendingEvent = None  # 最早一个尚未被绘制的输入事件 (名称, 时间)
+        self._frameStart = None
+        self._phases = {}
+        self.frameCount = 0
+        self.droppedFrames = 0
+
+    def _now(self):
+        return time.perf_counter_ns()
+
+    def _us(self, ns):
+        return (ns - self._origin) / 1000
+
+    def markEvent(self, name):
+        """记录一个会引起重绘的输入事件，只保留最早一个未绘制的事件用于计算延迟"""
+        if not self.enabled:
+            return
+        now = self._now()
+        self._events.append({'name': name, 'ph': 'i', 's': 't', 'ts': self._us(now), 'pid': 1, 'tid': 1})
+        if self._pendingEvent is None:
+            self._pendingEvent = (name, now)
+
+    def beginFrame(self):
+        if self.enabled:
+            self._frameStart = self._now()
+            self._phases = {}
+
+    def phase(self, name):
+        """计时一个绘制阶段，未启用时返回空的上下文管理器，几乎没有开销"""
+        if not self.enabled or self._frameStart is None:
+            return _null_phase
+        return self._phase(name)
+
+    @contextmanager
+    def _phase(self, name):
+        start = self._now()
+        try:
+            yield
+        finally:
+            end = self._now()
+            self._phases[name] = self._phases.get(name, 0) + (end - start) / 1e6
+            self._events.append({'name': name, 'cat': 'paint', 'ph': 'X', 'ts': self._us(start),
+                                 'dur': (end - start) / 1000, 'pid': 1, 'tid': 1})
+
+    def endFrame(self):
+        if not self.enabled or self._frameStart is None:
+            return
+        end = self._now()
+        frameTime = (end - self._frameStart) / 1e6
+        latency = None
+        if self._pendingEvent is not None:
+            name, eventTime = self._pendingEvent
+            latency = (end - eventTime) / 1e6
+            # 事件到绘制完成跨越了多少个刷新周期，超出一个周期的部分计为掉帧
+            self.droppedFrames += max(0, int(latency // self.frameBudget))
+            self._events.append({'name': f'{name} → paint', 'cat': 'latency', 'ph': 'X',
+                                 'ts': self._us(eventTime), 'dur': (end - eventTime) / 1000, 'pid': 1, 'tid': 2})
+            self._pendingEvent = None
+        self._events.append({'name': 'frame', 'cat': 'frame', 'ph': 'X', 'ts': self._us(self._frameStart),
+                             'dur': frameTime * 1000, 'pid': 1, 'tid': 0, 'args': dict(self._phases)})
+        self._frames.append((frameTime, dict(self._phases), latency))
+        self.frameCount += 1
+        self._frameStart = None
+
+    def summary(self):
+        """最近若干帧的平均值：{'frame': 毫秒, 'latency': 毫秒, 'phases': {阶段: 毫秒}}"""
+        if not self._frames:
+            return {'frame': 0.0, 'latency': 0.0, 'phases': {}}
+        phases = defaultdict(float)
+        for _, framePhases, _ in self._frames:
+            for name, value in framePhases.items():
+                phases[name] += value / len(self._frames)
+        latencies = [latency for _, _, latency in self._frames if latency is not None]
+        return {'frame': sum(frame for frame, _, _ in self._frames) / len(self._frames),
+                'latency': sum(latencies) / len(latencies) if latencies else 0.0,
+                'phases': dict(phases)}
+
+    def paintHud(self, painter, pos, font=None):
+        """在 pos 处绘制统计浮层"""
+        if not self.enabled:
+            return
+        font = font or QFont('Consolas', 9)
+        summary = self.summary()
+        lines = [f"frame {summary['frame']:.2f} ms  latency {summary['latency']:.1f} ms",
+                 f"frames {self.frameCount}  dropped {self.droppedFrames}"]
+        lines += [f"{name:<10} {value:.2f} ms" for name, value in summary['phases'].items()]
+        rectf = QRectF(pos, pos).adjusted(0, 0, 240, 16 * len(lines) + 10)
+        painter.save()
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 170))
+        painter.drawRoundedRect(rectf, 6, 6)
+        painter.setPen(QColor(0, 255, 128))
+        painter.setFont(font)
+        painter.drawText(rectf.adjusted(8, 5, -8, -5), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+                         '\n'.join(lines))
+        painter.restore()
+
+    def traceEvents(self):
+        return list(self._events)
+
+    def exportTrace(self, path=None):
+        """导出本次截图的 Chrome Trace JSON，返回文件路径（未启用或没有数据时返回 None）"""
+        if not self.enabled or not self._events:
+            return None
+        if path is None:
+            if self.traceDir is None:
+                return None
+            path = self.traceDir / time.strftime('trace_%Y%m%d_%H%M%S.json')
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'traceEvents': self.traceEvents(), 'displayTimeUnit': 'ms',
+                'otherData': {'frames': self.frameCount, 'droppedFrames': self.droppedFrames,
+                              'frameBudgetMs': self.frameBudget}}
+        with open(path, 'w', encoding='utf8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        return path
@@ -0,0 +1,27 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+
+def dhash(image: QImage, hash_size=8):
+    """
+    差值感知哈希（dHash）：把图像缩小为 (hash_size+1) x hash_size 的灰度图，
+    比较每行相邻像素的亮度得到 hash_size*hash_size 位的整数。相似图像的哈希汉明距离很小。
+    """
+    small = image.scaled(hash_size + 1, hash_size, Qt.AspectRatioMode.IgnoreAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+    small = small.convertToFormat(QImage.Format.Format_Grayscale8)
+    ptr = small.constBits()
+    ptr.setsize(small.sizeInBytes())
+    data = bytes(ptr)
+    bytesPerLine = small.bytesPerLine()
+    value = 0
+    for y in range(hash_size):
+        row = data[y * bytesPerLine: y * bytesPerLine + hash_size + 1]
+        for x in range(hash_size):
+            value = (value << 1) | (row[x] > row[x + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int):
+    """两个哈希之间不同的位数"""
+    return bin(a ^ b).count('1')
@@ -1,45 +1,285 @@
+import logging
+from abc import ABC, abstractmethod
+
 import cv2
 import numpy as np
 
+from .TiledCanvas import TiledCanvas
+
+logger = logging.getLogger(__name__)
+
+
+class MatchError(Exception):
+    """找不到两帧图像之间的重叠位置"""
+
+
+class OffsetStrategy(ABC):
+    """
+    长截图拼接时估计相邻两帧偏移量的策略
+    estimate 返回 target 的第一行在 original 中对应的行号，找不到时抛出 MatchError
+    """
+    name = ''
+    two_dimensional = False  # 是否能估计水平方向的偏移
+
+    @abstractmethod
+    def estimate(self, original_gray: np.ndarray, target_gray: np.ndarray) -> int:
+        ...
+
+    def translation(self, original_gray: np.ndarray, target_gray: np.ndarray):
+        """
+        估计相邻两帧的二维偏移 (dx, dy)：target 的左上角在 original 中的位置，找不到时抛出 MatchError
+        只支持竖直滚动的策略 dx 恒为 0
+        """
+        return 0, self.estimate(original_gray, target_gray)
+
+
+class TemplateMatchStrategy(OffsetStrategy):
+    """
+    模板匹配法：取 target 顶部 5%~20%、左右各去除 10% 的区域作为模板，在 original 中查找
+    !!! target 至少前 20% 部分必须包含在 original 中
+    """
+    name = 'template'
+
+    def __init__(self, threshold=0.01):
+        self.threshold = threshold
 
-def merge_image_with_match_template(original_image: np.ndarray, target_image: np.ndarray, only_offset: bool = False):
+    def estimate(self, original_gray, target_gray):
+        gray_b = target_gray[:original_gray.shape[0], :]
+        # 去除边界非目标因素的影响  头部去除5%  两边各去除10%
+        top = int(gray_b.shape[0] * 0.05)
+        template = gray_b[top: int(gray_b.shape[0] * 0.2), int(gray_b.shape[1] * 0.1):int(gray_b.shape[1] * 0.9)]
+        res = cv2.matchTemplate(template, original_gray, cv2.TM_SQDIFF_NORMED)
+        min_val, _, min_loc, _ = cv2.minMaxLoc(res)
+        if min_val >= self.threshold:
+            raise MatchError(f'找不到匹配目标（最小差异 {min_val:.4f}）')
+        return min_loc[1] - top
+
+
+class RowProfileStrategy(OffsetStrategy):
     """
-    通过模板匹配法 合并两张图像
+    行特征法：把每一行按列分块求均值得到一个短向量，在 original 末尾一屏范围内逐个偏移比较重叠部分，
+    只做向量运算，比模板匹配快得多，适合纯竖直滚动
+    """
+    name = 'row_profile'
+
+    def __init__(self, blocks=32, threshold=1.0, min_overlap=0.2):
+        self.blocks = blocks
+        self.threshold = threshold  # 重叠部分平均每个特征的最大差异（灰度级）
+        self.min_overlap = min_overlap  # 最小重叠比例（相对 target 高度）
+
+    def profile(self, gray):
+        edges = np.linspace(0, gray.shape[1], self.blocks + 1).astype(int)
+        return np.add.reduceat(gray.astype(np.float32), edges[:-1], axis=1) / np.diff(edges)
+
+    def estimate(self, original_gray, target_gray):
+        original = self.profile(original_gray)
+        target = self.profile(target_gray)
+        height = target.shape[0]
+        minOverlap = max(1, int(height * self.min_overlap))
+        start = max(0, original.shape[0] - height)
+        best, bestError = None, None
+        for y in range(start, original.shape[0] - minOverlap + 1):
+            overlap = min(original.shape[0] - y, height)
+            error = float(np.abs(original[y: y + overlap] - target[:overlap]).mean())
+            if bestError is None or error < bestError - 1e-6:
+                best, bestError = y, error
+        if best is None or bestError > self.threshold:
+            raise MatchError(f'找不到匹配目标（最小差异 {bestError}）')
+        return best
+
+
+class PhaseCorrelationStrategy(OffsetStrategy):
+    """
+    相位相关法：把两帧缩小到长边不超过 max_side，用 FFT 求归一化互功率谱，其反变换的峰值即为二维平移量，
+    计算量与偏移范围无关；再逐级放大，在上一级结果的 ±1 像素内比较重叠部分修正，得到原图上的精确偏移。
+    可同时处理水平和竖直滚动
+    """
+    name = 'phase'
+    two_dimensional = True
+
+    def __init__(self, max_side=256, peaks=4, threshold=6.0, min_overlap=0.2, trim=0.75):
+        self.max_side = max_side
+        self.peaks = peaks  # 依次验证的相关峰数量
+        self.threshold = threshold  # 重叠部分的最大差异（灰度级）
+        self.min_overlap = min_overlap  # 最小重叠比例（相对 target 面积）
+        self.trim = trim  # 只统计差异最小的这部分行，容忍固定的标题栏、光标等局部变化
+
+    def pyramid(self, gray, levels):
+        """逐级 2×2 缩小（奇数的最后一行、一列舍去，使各级之间恰好为 2 倍）"""
+        result = [gray]
+        for _ in range(levels):
+            image = result[-1]
+            height, width = image.shape[0] // 2 * 2, image.shape[1] // 2 * 2
+            result.append(cv2.resize(image[:height, :width], (width // 2, height // 2), interpolation=cv2.INTER_AREA))
+        return result
+
+    def overlap_error(self, original, target, dx, dy):
+        """
+        target 放在 original 的 (dx, dy) 处时重叠部分的差异 (去掉差异最大的行后的均值, 全部均值)，重叠不足时返回 None
+        前者用于判断是否匹配，后者用于在相邻的偏移中选出精确位置（错开一两行时，差异只集中在少数行上）
+        """
+        top, left = max(0, dy), max(0, dx)
+        bottom, right = min(original.shape[0], dy + target.shape[0]), min(original.shape[1], dx + target.shape[1])
+        if bottom <= top or right <= left or \
+                (bottom - top) * (right - left) < self.min_overlap * target.shape[0] * target.shape[1]:
+            return None
+        diff = cv2.absdiff(original[top: bottom, left: right], target[top - dy: bottom - dy, left - dx: right - dx])
+        rows = diff.mean(axis=1)
+        keep = max(1, int(len(rows) * self.trim))
+        return float(np.partition(rows, keep - 1)[:keep].mean()), float(rows.mean())
+
+    def correlation_peaks(self, original, target):
+        """相位相关的候选偏移，按峰值从高到低；每个峰按周期性对应两种偏移方向"""
+        height, width = max(original.shape[0], target.shape[0]), max(original.shape[1], target.shape[1])
+        spectra = []
+        for image in (original, target):
+            image = image.astype(np.float32)
+            image -= image.mean()  # 滚动时两帧大部分内容不同，不加窗函数，以免削弱重叠部分的权重
+            spectra.append(np.fft.rfft2(image, s=(height, width)))
+        cross = spectra[0] * np.conj(spectra[1])
+        correlation = np.fft.irfft2(cross / (np.abs(cross) + 1e-9), s=(height, width))
+        for _ in range(self.peaks):
+            py, px = np.unravel_index(int(np.argmax(correlation)), correlation.shape)
+            correlation[max(0, py - 1): py + 2, max(0, px - 1): px + 2] = -np.inf  # 去掉该峰再找下一个
+            dy, dx = int(py), int(px)
+            yield [(x, y) for y in (dy, dy - height) for x in (dx, dx - width)]
+
+    def translation(self, original_gray, target_gray):
+        longSide = max(original_gray.shape + target_gray.shape)
+        levels = max(0, int(np.ceil(np.log2(longSide / self.max_side))))
+        while levels and min(original_gray.shape + target_gray.shape) >> levels < 16:
+            levels -= 1
+        originals, targets = self.pyramid(original_gray, levels), self.pyramid(target_gray, levels)
+        best, bestError = None, None
+        for candidates in self.correlation_peaks(originals[-1], targets[-1]):
+            for offset in candidates:
+                error = self.overlap_error(originals[-1], targets[-1], *offset)
+                if error is not None and (bestError is None or error[0] < bestError):
+                    best, bestError = offset, error[0]
+            if bestError is not None and bestError <= self.threshold:
+                break
+        if best is None:
+            raise MatchError('找不到匹配目标（重叠不足）')
+        for level in range(levels - 1, -1, -1):  # 逐级放大修正
+            errors = [(error, (x, y)) for y in range(best[1] * 2 - 1, best[1] * 2 + 2)
+                      for x in range(best[0] * 2 - 1, best[0] * 2 + 2)
+                      if (error := self.overlap_error(originals[level], targets[level], x, y)) is not None]
+            if not errors:
+                raise MatchError('找不到匹配目标（重叠不足）')
+            (bestError, _), best = min(errors, key=lambda item: item[0][1])
+        if bestError > self.threshold:
+            raise MatchError(f'找不到匹配目标（最小差异 {bestError:.2f}）')
+        return best
+
+    def estimate(self, original_gray, target_gray):
+        # original 可能是已拼接的长图，只需与其末尾一屏比较
+        tail = max(0, original_gray.shape[0] - target_gray.shape[0])
+        dx, dy = self.translation(original_gray[tail:], target_gray)
+        if dx:
+            raise MatchError(f'存在水平偏移 {dx} 像素，无法按竖直方向拼接')
+        return tail + dy
+
+
+_strategies = {}
+default_strategy = 'template'
+
+
+def register_strategy(strategy: OffsetStrategy):
+    """注册偏移量估计策略，之后可按名称在 merge_images 中使用"""
+    _strategies[strategy.name] = strategy
+    return strategy
+
+
+def get_strategy(name=None) -> OffsetStrategy:
+    return _strategies[name or default_strategy]
+
+
+def strategies():
+    return dict(_strategies)
+
+
+register_strategy(TemplateMatchStrategy())
+register_strategy(RowProfileStrategy())
+register_strategy(PhaseCorrelationStrategy())
+
+
+def to_gray(image: np.ndarray):
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+
+
+def merge_image_with_match_template(original_image: np.ndarray, target_image: np.ndarray, only_offset: bool = False,
+                                    strategy=None):
+    """
+    合并两张图像（默认使用模板匹配法）
     !!! 输入图像必须是rgb通道图像
     !!! target_image至少前10%部分必须包含在original_image中
     !!! 输出也是rbg三通道图像
     """
-    # 图像灰度
-    gray_a = cv2.cvtColor(original_image, cv2.COLOR_RGB2GRAY)
-    gray_b = cv2.cvtColor(target_image, cv2.COLOR_RGB2GRAY)[:gray_a.shape[0], :]
-    # 去除边界非目标因素的影响  头部去除5%  两边各去除10%
-    gray_b_resize = gray_b[int(gray_b.shape[0] * 0.05): int(gray_b.shape[0] * 0.2),
-                    int(gray_b.shape[1] * 0.1):int(gray_b.shape[1] * 0.9)]
-    res = cv2.matchTemplate(gray_b_resize, gray_a, cv2.TM_SQDIFF_NORMED)
-    min_val, _, min_loc, _ = cv2.minMaxLoc(res)
-    if min_val < 0.01:
-        if only_offset:
-            return min_loc[1] - int(target_image.shape[0] * 0.05)
-        stack_image = np.vstack((original_image[:min_loc[1], :], target_image[int(gray_b.shape[0] * 0.05):, :]))
-        return stack_image
-    else:
-        raise Exception('找不到匹配目标')
-
-
-def merge_images(images: list | tuple):
+    strategy = strategy if isinstance(strategy, OffsetStrategy) else get_strategy(strategy)
+    offset = strategy.estimate(to_gray(original_image), to_gray(target_image))
+    if only_offset:
+        return offset
+    return np.vstack((original_image[:max(offset, 0)], target_image[max(-offset, 0):]))
+
+
+class Stitcher:
+    """
+    增量拼接：每一帧只与上一帧估计偏移，按累计位置写到稀疏分块画布上，后一帧覆盖重叠部分。
+    策略支持二维偏移（如相位相关法）时可以向任意方向滚动
+    参数：
+    - strategy: 偏移量估计策略或其名称，默认模板匹配法
+    - tileSize: 画布图块边长
+    - background: 画布上未截取到的部分的填充值
+    """
+
+    def __init__(self, strategy=None, tileSize=256, background=255):
+        self.strategy = strategy if isinstance(strategy, OffsetStrategy) else get_strategy(strategy)
+        self.canvas = TiledCanvas(tileSize=tileSize, background=background)
+        self.position = (0, 0)  # 上一帧左上角在画布中的位置
+        self.frames = 0  # 已拼接的帧数
+        self._last = None  # 上一帧的灰度图
+        self._result = None
+
+    def add(self, image: np.ndarray):
+        """加入一帧，返回相对上一帧的偏移 (dx, dy)；找不到匹配位置时抛出 MatchError，画布不变"""
+        gray = to_gray(image)
+        dx, dy = (0, 0) if self._last is None else self.strategy.translation(self._last, gray)
+        self.position = (self.position[0] + dx, self.position[1] + dy)
+        self.canvas.paste(image, *self.position)
+        self.frames += 1
+        self._last = gray
+        self._result = None
+        return dx, dy
+
+    def result(self):
+        """拼接结果，两次加入新帧之间重复调用时直接返回同一个数组"""
+        if self._result is None:
+            self._result = self.canvas.toArray()
+        return self._result
+
+
+def merge_images(images: list | tuple, strategy=None, on_error=None):
+    """
+    依次拼接多帧图像
+    !!! 输入为 rgb 图像，输出为 bgr 图像
+    strategy: 偏移量估计策略或其名称，默认模板匹配法
+    on_error: 某一帧找不到匹配位置时的回调 (帧序号, 异常)，默认记录警告日志并跳过该帧
+    """
     if images:
-        result = cv2.cvtColor(images[0], cv2.COLOR_RGB2BGR)
-        for i in range(1, len(images)):
+        stitcher = Stitcher(strategy)
+        for i, image in enumerate(images):
             try:
-                result = merge_image_with_match_template(result, cv2.cvtColor(images[i], cv2.COLOR_RGB2BGR))
-            except Exception as e:
-                print(e)
-        return result
+                stitcher.add(cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+            except MatchError as e:
+                if on_error is not None:
+                    on_error(i, e)
+                else:
+                    logger.warning('长截图第 %d 帧拼接失败，已跳过：%s', i, e)
+        return stitcher.result()
     return None
 
 
 def save_merge_result(path: str, result):
-    # print(f"保存 -- {path}")
     cv2.imencode(f'.{path.split(".")[-1]}', result)[1].tofile(path)
 
 
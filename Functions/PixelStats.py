@@ -0,0 +1,150 @@
+"""
+像素分析：把每个屏幕的截图转换一次为 QImage 后，以 NumPy 数组直接引用其像素内存（不复制），
+在此基础上计算单个像素的颜色和任意区域的颜色统计（均值、中位数、主色、直方图），
+以及两个颜色之间的对比度。区域统计按矩形缓存，鼠标在同一区域上悬停时无需重复计算。
+"""
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtCore import QRect, QRectF
+from PyQt5.QtGui import QImage
+
+
+def qimage_view(image: QImage):
+    """
+    不复制地以 (高, 宽, 4) 的 uint8 数组访问 Format_RGB32/ARGB32 的 QImage，通道顺序为内存中的 B、G、R、A（小端）
+    返回的数组引用 image 的内存，使用期间 image 必须保持存活
+    """
+    if image.isNull():  # 例如截屏失败时
+        return np.zeros((0, 0, 4), np.uint8)
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    array = np.frombuffer(ptr, np.uint8).reshape(image.height(), image.bytesPerLine() // 4, 4)
+    return array[:, :image.width()]
+
+
+def relative_luminance(rgb):
+    """sRGB 颜色的相对亮度（WCAG 2.x 定义），rgb 的最后一维为 0~255 的 R、G、B"""
+    channel = np.asarray(rgb, np.float64) / 255
+    linear = np.where(channel <= 0.04045, channel / 12.92, ((channel + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratio(rgb1, rgb2):
+    """两个颜色的对比度（1~21），WCAG 要求正文文字至少为 4.5"""
+    lighter, darker = sorted((float(relative_luminance(rgb1)), float(relative_luminance(rgb2))), reverse=True)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def rgb_to_hex(rgb):
+    return '#{:02X}{:02X}{:02X}'.format(*(int(round(value)) for value in rgb))
+
+
+class RegionStats:
+    """
+    一个区域的颜色统计
+    - count: 参与统计的像素数（区域过大时为均匀抽样后的像素数）
+    - mean、median: 各通道的均值和中位数 (R, G, B)
+    - dominant: 出现最多的若干颜色 [((R, G, B), 占比), ...]，按占比从高到低排列
+    - histogram: 各通道的直方图，形状为 (3, 256)
+    - luminance: 亮度直方图，形状为 (256,)
+    """
+
+    quantize_bits = 4  # 统计主色时每个通道保留的位数，相近的颜色归为一类
+    max_samples = 1 << 16  # 区域像素多于该值时按行列均匀抽样
+
+    def __init__(self, rgb: np.ndarray, dominantCount=3):
+        """rgb: 形状为 (N, 3) 的 uint8 数组"""
+        self.count = len(rgb)
+        if not self.count:
+            self.mean = self.median = (0, 0, 0)
+            self.dominant = []
+            self.histogram = np.zeros((3, 256), np.int64)
+            self.luminance = np.zeros(256, np.int64)
+            return
+        self.mean = tuple(float(value) for value in rgb.mean(axis=0))
+        self.median = tuple(int(value) for value in np.median(rgb, axis=0))
+        self.histogram = np.stack([np.bincount(rgb[:, channel], minlength=256) for channel in range(3)])
+        gray = (rgb @ np.array([77, 150, 29], np.uint32)) >> 8  # 与 Qt 的 qGray 相同的整数近似
+        self.luminance = np.bincount(gray, minlength=256)
+        self.dominant = self._dominant(rgb, dominantCount)
+
+    def _dominant(self, rgb, dominantCount):
+        bits = self.quantize_bits
+        quantized = (rgb >> (8 - bits)).astype(np.int64)
+        keys = (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+        counts = np.bincount(keys)
+        top = np.argsort(counts)[::-1][:dominantCount]
+        top = top[counts[top] > 0]
+        # 每一类的代表色取该类所有像素的均值，而不是量化格子的中心
+        sums = np.stack([np.bincount(keys, weights=rgb[:, channel], minlength=len(counts))[top]
+                         for channel in range(3)], axis=1)
+        return [(tuple(int(round(value)) for value in total / counts[key]), float(counts[key] / self.count))
+                for key, total in zip(top, sums)]
+
+    def meanHex(self):
+        return rgb_to_hex(self.mean)
+
+
+class DesktopPixels:
+    """
+    虚拟桌面的像素访问：每个屏幕的截图只转换一次为 QImage，之后所有查询都直接读取其内存。
+    坐标均为虚拟桌面中的逻辑坐标；跨屏的区域把各屏幕内的像素合并后统计。
+    参数：
+    - desktop: VirtualDesktop
+    - cacheCount: 缓存的区域统计数量
+    - images: 与 desktop.buffers 一一对应、事先在主线程中取出的 QImage，给出时可以在工作线程中创建
+    """
+
+    def __init__(self, desktop, cacheCount=64, images=None):
+        self.desktop = desktop
+        if images is None:  # QPixmap 只能在主线程中使用，QImage 可供工作线程读取
+            images = [buffer.pixmap.toImage() for buffer in desktop.buffers]
+        self.images = [image.convertToFormat(QImage.Format.Format_RGB32) for image in images]
+        self._views = [qimage_view(image) for image in self.images]
+        self.cacheCount = cacheCount
+        self._cache = OrderedDict()  # (left, top, right, bottom) -> RegionStats
+
+    def view(self, index):
+        """第 index 个屏幕截图的像素数组，形状为 (高, 宽, 4)，通道顺序为 B、G、R、A，不复制"""
+        return self._views[index]
+
+    def pixel(self, x, y):
+        """逻辑坐标 (x, y) 处的像素颜色 (R, G, B)，不在任何屏幕上时返回 None"""
+        for buffer, view in zip(self.desktop.buffers, self._views):
+            geometry = buffer.geometry
+            if geometry.left() <= x < geometry.left() + geometry.width() and \
+                    geometry.top() <= y < geometry.top() + geometry.height():
+                column = min(int((x - geometry.left()) * buffer.pixelRatio), view.shape[1] - 1)
+                row = min(int((y - geometry.top()) * buffer.pixelRatio), view.shape[0] - 1)
+                blue, green, red = view[row, column, :3]
+                return int(red), int(green), int(blue)
+        return None
+
+    def regionPixels(self, rectf):
+        """区域内的所有像素，形状为 (N, 3) 的 RGB 数组；像素过多时按行列均匀抽样"""
+        parts = []
+        for buffer, view in zip(self.desktop.buffers, self._views):
+            rect = buffer.physicalRect(buffer.geometry.intersected(QRectF(rectf)))
+            rect = rect.intersected(QRect(0, 0, view.shape[1], view.shape[0]))
+            if rect.isEmpty():
+                continue
+            step = max(1, int(np.ceil(np.sqrt(rect.width() * rect.height() / RegionStats.max_samples))))
+            region = view[rect.top(): rect.bottom() + 1: step, rect.left(): rect.right() + 1: step, 2::-1]
+            parts.append(region.reshape(-1, 3))
+        if not parts:
+            return np.zeros((0, 3), np.uint8)
+        return np.concatenate(parts) if len(parts) > 1 else np.ascontiguousarray(parts[0])
+
+    def regionStats(self, rectf):
+        """区域的颜色统计，按像素取整后的矩形缓存"""
+        rect = QRectF(rectf).toAlignedRect()
+        key = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        stats = self._cache.get(key)
+        if stats is None:
+            stats = self._cache[key] = RegionStats(self.regionPixels(rect))
+            while len(self._cache) > self.cacheCount:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return stats
@@ -0,0 +1,213 @@
+import hashlib
+import math
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QRect, QRectF, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QPixmap, QPainter, QColor, QImage
+
+
+class SharedPixmap:
+    """
+    多个贴图窗口共享的原图，按量化后的缩放级别缓存缩放结果（类似 mipmap）。
+    暂时用不到时可以压缩为内存中的 PNG 并释放原图，下次访问 pixmap 时自动解码恢复
+    参数：
+    - store: 所属的 PixmapStore
+    - key: 原图内容的哈希（pixmap_key）
+    - pixmap: 原图
+    """
+
+    zoom_step = 2 ** 0.25  # 相邻缩放级别之间的倍率
+    max_renditions = 4  # 每张原图最多缓存的缩放结果数量
+
+    def __init__(self, store, key, pixmap: QPixmap):
+        self.store = store
+        self.key = key
+        self._pixmap = pixmap
+        self._png = None  # 压缩后的 PNG 数据
+        self.width, self.height = pixmap.width(), pixmap.height()
+        self.refCount = 0
+        self._renditions = OrderedDict()  # 缩放级别 -> QPixmap
+        self._image = None  # 原图的 QImage 副本，供工作线程缩放
+
+    @property
+    def pixmap(self):
+        if self._pixmap is None:
+            self._pixmap = QPixmap.fromImage(QImage.fromData(self._png, 'PNG'))
+        return self._pixmap
+
+    def isResident(self):
+        return self._pixmap is not None
+
+    def isCompressed(self):
+        return self._png is not None
+
+    def setCompressed(self, png: bytes):
+        self._png = png
+
+    def offload(self):
+        """释放原图及所有缓存，只保留压缩数据；尚未压缩时不做任何事"""
+        if self._png is None:
+            return False
+        self._pixmap = None
+        self.clearRenditions()
+        return True
+
+    def level(self, scale):
+        """不小于 scale 的最近缩放级别，绘制时只需再略微缩小"""
+        return math.ceil(math.log(scale, self.zoom_step) - 1e-6)
+
+    def image(self):
+        """原图的 QImage 副本（首次调用时转换），可在工作线程中用于高质量缩放"""
+        if self._image is None:
+            self._image = self.pixmap.toImage()
+        return self._image
+
+    def levelSize(self, level):
+        levelScale = self.zoom_step ** level
+        return max(1, round(self.width * levelScale)), max(1, round(self.height * levelScale))
+
+    def hasRendition(self, scale):
+        level = self.level(scale)
+        return level >= 0 or level in self._renditions
+
+    def cachedRendition(self, scale):
+        """已缓存的缩放结果中不小于 scale 的最近一级，没有时返回原图。不会触发任何缩放计算，用于快速预览"""
+        level = self.level(scale)
+        candidates = [cached for cached in self._renditions if cached >= level]
+        if level >= 0 or not candidates:
+            return self.pixmap
+        best = min(candidates)
+        self._renditions.move_to_end(best)
+        return self._renditions[best]
+
+    def addRendition(self, level, pixmap: QPixmap):
+        """缓存在其他线程中缩放好的结果"""
+        self._renditions[level] = pixmap
+        self._renditions.move_to_end(level)
+        while len(self._renditions) > self.max_renditions:
+            self._renditions.popitem(last=False)
+
+    def rendition(self, scale):
+        """获取 scale 对应缩放级别的图像，级别 0 即原图"""
+        level = self.level(scale)
+        if level >= 0:
+            return self.pixmap
+        if level not in self._renditions:
+            self.addRendition(level, self.pixmap.scaled(*self.levelSize(level), Qt.AspectRatioMode.KeepAspectRatio,
+                                                        Qt.TransformationMode.SmoothTransformation))
+        self._renditions.move_to_end(level)
+        return self._renditions[level]
+
+    def byteSize(self):
+        """解码后的原图、缓存的缩放结果及 QImage 副本占用的内存（字节），即 offload 可以释放的部分"""
+        pixmaps = [*([self._pixmap] if self._pixmap is not None else []), *self._renditions.values()]
+        imageBytes = self._image.sizeInBytes() if self._image is not None else 0
+        return sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8 for pixmap in pixmaps) + imageBytes
+
+    def compressedSize(self):
+        """压缩数据占用的内存（字节），在释放整个 SharedPixmap 之前一直保留"""
+        return len(self._png or b'')
+
+    def clearRenditions(self):
+        self._renditions.clear()
+        self._image = None
+
+
+def pixmap_key(pixmap: QPixmap):
+    """按图片内容计算的键：同一张截图重新贴图（如从截图历史中打开）时得到相同的键，而 cacheKey 每次都不同"""
+    image = pixmap.toImage()
+    if image.isNull():
+        return ''
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    digest = hashlib.blake2b(ptr.asstring(), digest_size=16)
+    digest.update(f'{image.width()}x{image.height()}:{image.format()}:{pixmap.devicePixelRatio()}'.encode())
+    return digest.hexdigest()
+
+
+def encode_png(image: QImage):
+    """将 QImage 编码为 PNG 数据，可在工作线程中调用"""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, 'PNG')
+    buffer.close()
+    return bytes(data)
+
+
+class PixmapStore:
+    """贴图原图的共享存储：相同的图片只保存一份，引用计数归零时释放"""
+
+    def __init__(self):
+        self._items = {}  # 内容哈希 -> SharedPixmap
+
+    def find(self, key):
+        return self._items.get(key)
+
+    def acquire(self, pixmap: QPixmap, key=None):
+        key = key if key is not None else pixmap_key(pixmap)
+        shared = self._items.get(key)
+        if shared is None:
+            shared = self._items[key] = SharedPixmap(self, key, pixmap)
+        shared.refCount += 1
+        return shared
+
+    def release(self, shared: SharedPixmap):
+        shared.refCount -= 1
+        if shared.refCount <= 0:
+            self._items.pop(shared.key, None)
+            shared.clearRenditions()
+
+    def items(self):
+        return list(self._items.values())
+
+    def residentBytes(self):
+        """解码后的图像占用的内存，用于内存预算"""
+        return sum(shared.byteSize() for shared in self._items.values())
+
+    def compressedBytes(self):
+        return sum(shared.compressedSize() for shared in self._items.values())
+
+
+_shadow_cache = {}
+
+
+def shadow_border(margin, color: QColor):
+    """
+    预先绘制的阴影边框，大小为 (2*margin+2) x (2*margin+2)，中间 2x2 为内容区域，
+    绘制时按九宫格拉伸四条边，代替每帧都要离屏重绘整个窗口的 QGraphicsDropShadowEffect
+    """
+    key = (margin, color.rgba())
+    if key not in _shadow_cache:
+        size = 2 * margin + 2
+        image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        for distance in range(margin):  # 越靠近内容区域阴影越浓
+            shade = QColor(color)
+            shade.setAlphaF(color.alphaF() * (1 - distance / margin) ** 2 * 0.8)
+            painter.setPen(shade)
+            painter.drawRect(margin - distance - 1, margin - distance - 1, 2 * distance + 3, 2 * distance + 3)
+        painter.end()
+        _shadow_cache[key] = QPixmap.fromImage(image)
+    return _shadow_cache[key]
+
+
+def paint_nine_slice(painter, rect: QRect, border: QPixmap, margin):
+    """以九宫格方式把阴影边框绘制在 rect（内容区域）四周，中间区域不绘制"""
+    size = border.width()
+    left, top, right, bottom = rect.left(), rect.top(), rect.right() + 1, rect.bottom() + 1
+    width, height = rect.width(), rect.height()
+    inner = size - 2 * margin
+    parts = [  # (目标矩形, 源矩形)
+        (QRectF(left - margin, top - margin, margin, margin), QRectF(0, 0, margin, margin)),
+        (QRectF(right, top - margin, margin, margin), QRectF(size - margin, 0, margin, margin)),
+        (QRectF(left - margin, bottom, margin, margin), QRectF(0, size - margin, margin, margin)),
+        (QRectF(right, bottom, margin, margin), QRectF(size - margin, size - margin, margin, margin)),
+        (QRectF(left, top - margin, width, margin), QRectF(margin, 0, inner, margin)),
+        (QRectF(left, bottom, width, margin), QRectF(margin, size - margin, inner, margin)),
+        (QRectF(left - margin, top, margin, height), QRectF(0, margin, margin, inner)),
+        (QRectF(right, top, margin, height), QRectF(size - margin, margin, margin, inner)),
+    ]
+    for target, source in parts:
+        painter.drawPixmap(target, border, source)
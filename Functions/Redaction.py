@@ -0,0 +1,148 @@
+"""
+打码（马赛克、模糊、纯色填充）：效果直接由截图计算，而不是每次绘制时对大片区域重新模糊。
+每个屏幕的截图按 2×2 均值逐级缩小为图像金字塔（只在首次用到某一级时计算），
+马赛克即为在对应一级上按块查表，模糊为对该级做小核高斯后双线性放大。
+效果按屏幕像素网格切成固定大小的图块缓存，与打码区域的位置无关：
+拖动或调整打码区域时只计算新覆盖到的图块，保存、复制和导出时直接复用已缓存的图块。
+"""
+import math
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtCore import Qt, QRect, QRectF
+from PyQt5.QtGui import QImage
+
+REDACT_MODES = ('mosaic', 'blur', 'fill')
+
+_gaussian = np.array([1, 4, 6, 4, 1], np.float32) / 16  # 5 阶二项式核，近似高斯
+
+
+def _downsample(level):
+    """2×2 均值缩小一级（奇数的最后一行、一列舍去）"""
+    height, width = level.shape[0] // 2 * 2, level.shape[1] // 2 * 2
+    quads = level[:height, :width].astype(np.uint16)
+    total = quads[0::2, 0::2] + quads[0::2, 1::2] + quads[1::2, 0::2] + quads[1::2, 1::2]
+    return ((total + 2) >> 2).astype(np.uint8)
+
+
+def _blur(level):
+    """在缩小后的图像上做可分离的高斯模糊（边缘复制）"""
+    image = level.astype(np.float32)
+    for axis in (0, 1):
+        padded = np.pad(image, [(2, 2) if i == axis else (0, 0) for i in range(3)], mode='edge')
+        length = image.shape[axis]
+        image = sum(weight * padded.take(np.arange(i, i + length), axis=axis) for i, weight in enumerate(_gaussian))
+    return image
+
+
+def _sample_axis(start, length, scale, size):
+    """双线性放大时一个方向上的两个源序号和权重"""
+    position = (np.arange(start, start + length, dtype=np.float32) + 0.5) / scale - 0.5
+    low = np.floor(position)
+    weight = (position - low)[:, None]
+    low = low.astype(np.intp)
+    return np.clip(low, 0, size - 1), np.clip(low + 1, 0, size - 1), weight
+
+
+class Redactor:
+    """
+    打码效果的计算和绘制
+    参数：
+    - pixels: 截图的像素访问（DesktopPixels），截图改变时应重新创建
+    - cacheCount: 缓存的图块数量
+    """
+
+    tile_size = 128  # 图块边长（物理像素）
+    min_level, max_level = 2, 6  # 马赛克块、模糊半径约为 4~64 物理像素
+
+    def __init__(self, pixels, cacheCount=512):
+        self.pixels = pixels
+        self.cacheCount = cacheCount
+        self._levels = {}  # (屏幕序号, 级别) -> 缩小后的 BGR 图像
+        self._blurred = {}  # (屏幕序号, 级别) -> 模糊后的缩小图像
+        self._tiles = OrderedDict()  # (模式, 屏幕序号, 级别, 图块列, 图块行) -> QImage
+
+    def levelFor(self, lineWidth, pixelRatio):
+        """由画笔粗细选择金字塔级别：马赛克块边长约为 4 倍线宽（逻辑像素），取最接近的 2 的幂"""
+        blockSize = max(1.0, lineWidth * 4 * pixelRatio)
+        return min(self.max_level, max(self.min_level, round(math.log2(blockSize))))
+
+    def level(self, index, level):
+        """第 index 个屏幕的截图缩小 2^level 倍后的图像，逐级计算并缓存"""
+        key = (index, level)
+        if key not in self._levels:
+            if level == 0:
+                self._levels[key] = self.pixels.view(index)[..., :3]  # 直接引用截图内存
+            else:
+                self._levels[key] = _downsample(self.level(index, level - 1))
+        return self._levels[key]
+
+    def blurred(self, index, level):
+        key = (index, level)
+        if key not in self._blurred:
+            self._blurred[key] = _blur(self.level(index, level))
+        return self._blurred[key]
+
+    def tile(self, mode, index, level, column, row):
+        """一个图块的打码效果（QImage，物理像素），已计算过的直接返回"""
+        key = (mode, index, level, column, row)
+        image = self._tiles.get(key)
+        if image is not None:
+            self._tiles.move_to_end(key)
+            return image
+        view = self.pixels.view(index)
+        size = self.tile_size
+        left, top = column * size, row * size
+        width, height = min(size, view.shape[1] - left), min(size, view.shape[0] - top)
+        if mode == 'mosaic':  # 每个马赛克块即为缩小后图像中的一个像素
+            small = self.level(index, level)
+            rows = np.minimum(np.arange(top, top + height) >> level, small.shape[0] - 1)
+            columns = np.minimum(np.arange(left, left + width) >> level, small.shape[1] - 1)
+            bgr = small[rows][:, columns]
+        else:
+            small = self.blurred(index, level)
+            scale = 1 << level
+            top0, top1, fy = _sample_axis(top, height, scale, small.shape[0])
+            left0, left1, fx = _sample_axis(left, width, scale, small.shape[1])
+            upper, lower = small[top0], small[top1]
+            fx = fx[None]
+            bgr = ((upper[:, left0] * (1 - fx) + upper[:, left1] * fx) * (1 - fy[:, None])
+                   + (lower[:, left0] * (1 - fx) + lower[:, left1] * fx) * fy[:, None])
+            bgr = np.clip(bgr + 0.5, 0, 255).astype(np.uint8)
+        bgra = np.empty((height, width, 4), np.uint8)
+        bgra[..., :3] = bgr
+        bgra[..., 3] = 255
+        image = QImage(bgra.data, width, height, width * 4, QImage.Format.Format_RGB32).copy()
+        self._tiles[key] = image
+        while len(self._tiles) > self.cacheCount:
+            self._tiles.popitem(last=False)
+        return image
+
+    def paint(self, painter, mode, color, lineWidth, rectf):
+        """在 painter（逻辑坐标）上绘制 rectf 区域的打码效果"""
+        rectf = QRectF(rectf).normalized()
+        if rectf.isEmpty():
+            return
+        if mode == 'fill':
+            painter.fillRect(rectf, color)
+            return
+        painter.save()
+        painter.setClipRect(rectf, Qt.ClipOperation.IntersectClip)
+        size = self.tile_size
+        for index, buffer in enumerate(self.pixels.desktop.buffers):
+            target = buffer.geometry.intersected(rectf)
+            if target.isEmpty():
+                continue
+            ratio = buffer.pixelRatio
+            level = self.levelFor(lineWidth, ratio)
+            view = self.pixels.view(index)
+            physical = buffer.physicalRect(target).adjusted(-1, -1, 1, 1).intersected(
+                QRect(0, 0, view.shape[1], view.shape[0]))
+            for row in range(physical.top() // size, physical.bottom() // size + 1):
+                for column in range(physical.left() // size, physical.right() // size + 1):
+                    image = self.tile(mode, index, level, column, row)
+                    tileRectF = QRectF(buffer.geometry.left() + column * size / ratio,
+                                       buffer.geometry.top() + row * size / ratio,
+                                       image.width() / ratio, image.height() / ratio)
+                    painter.drawImage(tileRectF, image)
+        painter.restore()
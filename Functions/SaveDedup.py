@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+
+def qimage_to_gray(image: QImage):
+    """将QImage转换为灰度的numpy数组"""
+    gray = image.convertToFormat(QImage.Format.Format_Grayscale8)
+    ptr = gray.constBits()
+    ptr.setsize(gray.sizeInBytes())
+    return np.frombuffer(ptr, np.uint8).reshape(gray.height(), gray.bytesPerLine())[:, :gray.width()].copy()
+
+
+def bgr_to_gray(image: np.ndarray):
+    """将OpenCV的BGR图像转换为灰度数组"""
+    return image[..., :3] @ np.array([0.114, 0.587, 0.299])
+
+
+def qimage_to_rgb(image: QImage):
+    """将QImage转换为 RGB 三通道的numpy数组"""
+    rgb = image.convertToFormat(QImage.Format.Format_RGB888)
+    ptr = rgb.constBits()
+    ptr.setsize(rgb.sizeInBytes())
+    return np.frombuffer(ptr, np.uint8).reshape(rgb.height(), rgb.bytesPerLine())[:, :rgb.width() * 3] \
+        .reshape(rgb.height(), rgb.width(), 3).copy()
+
+
+def pixel_digest(rgb: np.ndarray):
+    """RGB 像素的精确哈希，只有像素完全相同的截图才视为重复"""
+    rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+    digest = hashlib.blake2b(rgb.data, digest_size=16)
+    digest.update(repr(rgb.shape).encode())
+    return digest.hexdigest()
+
+
+def same_format(a: Path, b: Path):
+    aliases = {'.jpeg': '.jpg', '.tif': '.tiff'}
+    suffix = a.suffix.lower(), b.suffix.lower()
+    return aliases.get(suffix[0], suffix[0]) == aliases.get(suffix[1], suffix[1])
+
+
+class FolderDedupIndex:
+    """
+    保存目录中的截图像素哈希索引，保存在目录下的隐藏文件中。
+    按像素哈希查找，每次保存只需一次字典查询；已删除或被修改过的文件在命中时才检查并清理
+    参数：
+    - folder: 保存目录
+    """
+
+    index_name = '.hydra-index.json'
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.path = self.folder / self.index_name
+        self.entries = {}  # 像素哈希 -> [[文件名, 文件大小, 修改时间(ns)], ...]
+        self._names = {}  # 文件名 -> 像素哈希
+        if self.path.exists():
+            with open(self.path, encoding='utf8') as f:
+                data = json.load(f)
+            # 旧版本的索引以文件名为键、没有记录文件大小和修改时间，无法确认文件未被修改，直接丢弃
+            if isinstance(data, dict) and data.get('version') == 2:
+                self.entries = data['entries']
+                self._names = {item[0]: digest for digest, items in self.entries.items() for item in items}
+
+    def _unchanged(self, item):
+        """文件仍然存在且大小、修改时间与写入索引时一致（硬链接共用同一个文件，修改时间相同）"""
+        try:
+            stat = (self.folder / item[0]).stat()
+        except OSError:
+            return False
+        return [stat.st_size, stat.st_mtime_ns] == item[1:]
+
+    def find(self, digest, suffix_of: Path):
+        """查找像素哈希相同、格式与 suffix_of 一致且未被修改的文件，顺便清理命中的失效记录"""
+        items = self.entries.get(digest)
+        if not items:
+            return None
+        for item in list(items):
+            if not self._unchanged(item):
+                items.remove(item)
+                self._names.pop(item[0], None)
+            elif same_format(self.folder / item[0], suffix_of):
+                return self.folder / item[0]
+        if not items:
+            del self.entries[digest]
+        return None
+
+    def add(self, path, digest):
+        path = Path(path)
+        old = self._names.pop(path.name, None)
+        if old is not None:  # 覆盖了已有的文件，原来的记录失效
+            self.entries[old] = [item for item in self.entries.get(old, []) if item[0] != path.name]
+            if not self.entries[old]:
+                del self.entries[old]
+        stat = path.stat()
+        self.entries.setdefault(digest, []).append([path.name, stat.st_size, stat.st_mtime_ns])
+        self._names[path.name] = digest
+
+    def save(self):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf8') as f:
+            json.dump({'version': 2, 'entries': self.entries}, f, ensure_ascii=False)
+
+
+def dedup_save(filePath, rgb: np.ndarray, write):
+    """
+    保存前先在目标目录的索引中查找相同的截图：找到像素完全相同、格式一致的文件时建立硬链接，不再重新编码写入。
+    目标文件已存在（用户确认覆盖）或无法建立硬链接时照常写入
+    filePath: 目标文件路径
+    rgb: 待保存图像的 RGB 数组
+    write: 实际写入文件的函数，参数为文件路径
+    返回 (实际文件路径, 链接到的已有文件或 None, 节省的字节数)
+    """
+    filePath = Path(filePath)
+    index = FolderDedupIndex(filePath.parent)
+    digest = pixel_digest(rgb)
+    existing = index.find(digest, filePath) if not filePath.exists() else None
+    if existing is not None:
+        try:
+            os.link(existing, filePath)
+            index.add(filePath, digest)
+            index.save()
+            return filePath, existing, existing.stat().st_size
+        except OSError:
+            pass
+    write(str(filePath))
+    index.add(filePath, digest)
+    index.save()
+    return filePath, None, 0
@@ -0,0 +1,91 @@
+from PyQt5.QtCore import Qt, QPointF, QRectF
+
+# 调整大小的控制点（截图区域四角和四条边的中点）对应的鼠标样式
+HANDLE_CURSORS = {
+    'TL': Qt.CursorShape.SizeFDiagCursor, 'BR': Qt.CursorShape.SizeFDiagCursor,  # ↖↘
+    'T': Qt.CursorShape.SizeVerCursor, 'B': Qt.CursorShape.SizeVerCursor,  # ↑↓
+    'TR': Qt.CursorShape.SizeBDiagCursor, 'BL': Qt.CursorShape.SizeBDiagCursor,  # ↙↗
+    'L': Qt.CursorShape.SizeHorCursor, 'R': Qt.CursorShape.SizeHorCursor,  # ←→
+}
+
+_handles = (('TL', 'T', 'TR'),
+            ('L', None, 'R'),
+            ('BL', 'B', 'BR'))
+# 拖动各控制点时移动哪条竖边、哪条横边（0 为左/上，1 为右/下，None 为不移动）
+_handle_edges = {'TL': (0, 0), 'T': (None, 0), 'TR': (1, 0), 'L': (0, None),
+                 'R': (1, None), 'BL': (0, 1), 'B': (None, 1), 'BR': (1, 1)}
+
+
+class SelectionGeometry:
+    """
+    截图区域的几何信息：只保存四条边的坐标，控制点和区域判定都由坐标直接算出，
+    拖动或调整大小时不再重建各个控制点的正方形。
+    判定规则：截图区域内（含边框）为 'CENTER'；否则落在某个以控制点为中心、边长 handleSize 的正方形内时
+    返回该控制点（重叠时上边优先于下边、左边优先于右边）；都不是时返回 None
+    参数：
+    - handleSize: 控制点正方形的边长
+    """
+
+    def __init__(self, handleSize=15):
+        self.half = handleSize / 2
+        self.left = self.top = self.right = self.bottom = 0.0
+
+    def setRect(self, rectf: QRectF):
+        """rectf 需为宽高非负的矩形"""
+        self.left, self.top = rectf.left(), rectf.top()
+        self.right, self.bottom = rectf.right(), rectf.bottom()
+
+    def rect(self):
+        return QRectF(QPointF(self.left, self.top), QPointF(self.right, self.bottom))
+
+    def midX(self):
+        return (self.left + self.right) / 2
+
+    def midY(self):
+        return (self.top + self.bottom) / 2
+
+    def handlePoints(self):
+        """8 个控制点：左上、右上、左下、右下、左中、右中、上中、下中"""
+        left, top, right, bottom = self.left, self.top, self.right, self.bottom
+        midX, midY = self.midX(), self.midY()
+        return [QPointF(left, top), QPointF(right, top), QPointF(left, bottom), QPointF(right, bottom),
+                QPointF(left, midY), QPointF(right, midY), QPointF(midX, top), QPointF(midX, bottom)]
+
+    def contains(self, x, y):
+        return self.left <= x <= self.right and self.top <= y <= self.bottom
+
+    def _bands(self, value, low, high):
+        """value 落在 low、中点、high 中哪些控制点的范围内（0、1、2）"""
+        half = self.half
+        return [band for band, center in enumerate((low, (low + high) / 2, high)) if abs(value - center) <= half]
+
+    def regionAt(self, pointf):
+        """鼠标位置所在的区域：'CENTER'、控制点名称（'TL'、'T'、'TR'、'L'、'R'、'BL'、'B'、'BR'）或 None"""
+        x, y = pointf.x(), pointf.y()
+        if self.left <= x <= self.right and self.top <= y <= self.bottom:
+            return 'CENTER'
+        half = self.half
+        if not (self.top - half <= y <= self.bottom + half and self.left - half <= x <= self.right + half):
+            return None  # 离截图区域较远，不可能在任何控制点上
+        for row in self._bands(y, self.top, self.bottom):
+            for column in self._bands(x, self.left, self.right):
+                if _handles[row][column] is not None:
+                    return _handles[row][column]
+        return None
+
+    def adjustedRect(self, handle, pointf):
+        """拖动控制点 handle 到 pointf 后的新截图区域（已规范化为宽高非负），handle 无效时返回 None"""
+        edges = _handle_edges.get(handle)
+        if edges is None:
+            return None
+        xEdge, yEdge = edges
+        left, top, right, bottom = self.left, self.top, self.right, self.bottom
+        if xEdge == 0:
+            left = pointf.x()
+        elif xEdge == 1:
+            right = pointf.x()
+        if yEdge == 0:
+            top = pointf.y()
+        elif yEdge == 1:
+            bottom = pointf.y()
+        return QRectF(QPointF(min(left, right), min(top, bottom)), QPointF(max(left, right), max(top, bottom)))
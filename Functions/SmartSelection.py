@@ -0,0 +1,135 @@
+"""
+智能选区：截图后在后台检测窗口和界面元素的矩形，存入空间索引，
+鼠标悬停时高亮光标下最内层的矩形，单击即可直接选中。
+矩形来自若干候选区域提供者（ElementProvider），默认使用基于 OpenCV 边缘和轮廓检测的提供者，
+也可以注册其他来源（例如系统的窗口列表）。
+"""
+import importlib
+import math
+from abc import ABC, abstractmethod
+
+from PyQt5.QtCore import QRectF
+
+
+class ElementProvider(ABC):
+    """
+    候选区域提供者
+    detect 在工作线程中调用：image 为一个屏幕截图的 QImage（物理像素），
+    返回该截图内的候选矩形列表 [(x, y, w, h), ...]，单位为物理像素
+    """
+    name = ''
+
+    @abstractmethod
+    def detect(self, image):
+        ...
+
+
+_providers = {}  # 名称 -> 提供者或返回提供者的工厂函数（用于按需导入 OpenCV）
+
+
+def register_element_provider(name, provider):
+    """注册候选区域提供者，provider 可以是 ElementProvider 实例，也可以是首次使用时才调用的工厂函数"""
+    _providers[name] = provider
+
+
+def get_element_provider(name):
+    provider = _providers[name]
+    if not isinstance(provider, ElementProvider):
+        provider = _providers[name] = provider()
+    return provider
+
+
+def element_providers():
+    return list(_providers)
+
+
+register_element_provider('contours', lambda: importlib.import_module('.ElementDetector', __package__)
+                          .ContourElementProvider())
+
+
+class RectIndex:
+    """
+    静态的矩形空间索引（按 Sort-Tile-Recursive 方式一次性打包的 R 树），
+    点查询只访问包围盒包含该点的节点，复杂度约为 O(log n + k)
+    参数：
+    - rects: [(left, top, right, bottom), ...]，right/bottom 不包含在矩形内（即 left + width、top + height）
+    - capacity: 每个节点最多的子节点数
+    """
+
+    def __init__(self, rects, capacity=16):
+        self.rects = [tuple(rect) for rect in rects]
+        self.capacity = capacity
+        # 节点为 (left, top, right, bottom, 子节点列表或矩形序号)，叶子层的子节点为矩形序号
+        level = [(*rect, index) for index, rect in enumerate(self.rects)]
+        while len(level) > capacity:
+            level = self._pack(level)
+        self.root = level
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _pack(self, entries):
+        """把一层节点按 x 再按 y 分片排序后，每 capacity 个打包为上一层的一个节点"""
+        capacity = self.capacity
+        pageCount = math.ceil(len(entries) / capacity)
+        sliceSize = capacity * math.ceil(math.sqrt(pageCount))
+        entries = sorted(entries, key=lambda entry: entry[0] + entry[2])
+        parents = []
+        for start in range(0, len(entries), sliceSize):
+            column = sorted(entries[start: start + sliceSize], key=lambda entry: entry[1] + entry[3])
+            for i in range(0, len(column), capacity):
+                children = column[i: i + capacity]
+                parents.append((min(child[0] for child in children), min(child[1] for child in children),
+                                max(child[2] for child in children), max(child[3] for child in children), children))
+        return parents
+
+    def containing(self, x, y):
+        """所有包含点 (x, y) 的矩形序号（右边和下边不算在矩形内，相邻的矩形不会同时命中）"""
+        result = []
+        stack = [self.root]
+        while stack:
+            for left, top, right, bottom, child in stack.pop():
+                if left <= x < right and top <= y < bottom:
+                    if isinstance(child, list):
+                        stack.append(child)
+                    else:
+                        result.append(child)
+        return result
+
+    def innermost(self, x, y):
+        """包含点 (x, y) 的面积最小的矩形，没有时返回 None"""
+        best, bestArea = None, None
+        for index in self.containing(x, y):
+            left, top, right, bottom = self.rects[index]
+            area = (right - left) * (bottom - top)
+            if bestArea is None or area < bestArea:
+                best, bestArea = index, area
+        return None if best is None else self.rects[best]
+
+
+def detect_elements(desktop, images, providers=('contours',), minSize=24, maxCount=4000):
+    """
+    检测虚拟桌面上的候选矩形并建立索引（在工作线程中调用）
+    images: 与 desktop.buffers 一一对应的 QImage（QPixmap 只能在主线程中使用，需事先转换）
+    minSize: 候选矩形的最小逻辑边长
+    返回 RectIndex，矩形为虚拟桌面中的逻辑坐标；每个屏幕本身也作为最外层的候选矩形
+    """
+    rects, screens = set(), []
+    for buffer, image in zip(desktop.buffers, images):
+        geometry, ratio = buffer.geometry, buffer.pixelRatio
+        originX, originY = round(geometry.left()), round(geometry.top())
+        # 与检测到的矩形一样用 left + width 作为右边，全屏的轮廓才能与屏幕本身去重
+        screens.append((originX, originY, originX + round(geometry.width()), originY + round(geometry.height())))
+        for name in providers:
+            for x, y, w, h in get_element_provider(name).detect(image):
+                if w < minSize * ratio or h < minSize * ratio:
+                    continue
+                left, top = originX + round(x / ratio), originY + round(y / ratio)
+                rects.add((left, top, left + round(w / ratio), top + round(h / ratio)))
+    rects = sorted(rects.difference(screens), key=lambda rect: (rect[2] - rect[0]) * (rect[3] - rect[1]))
+    return RectIndex(rects[:maxCount] + screens)  # 太多时保留面积较小的（更可能是具体的界面元素）
+
+
+def rect_to_qrectf(rect):
+    left, top, right, bottom = rect
+    return QRectF(left, top, right - left, bottom - top)
@@ -30,10 +30,12 @@ class TextInputWidget(QTextEdit):
         根据文本内容调整高度，限制宽度不超出截图区域，不会出现滚动条
         """
         text_width = self.viewport().width()
-        self.document().setTextWidth(text_width)  # 设置文本宽度
+        if self.document().textWidth() != text_width:  # 设置文本宽度会触发整篇文档重新排版，宽度不变时跳过
+            self.document().setTextWidth(text_width)
         margins = self.contentsMargins()
         height = int(self.document().size().height() + margins.top() + margins.bottom())
-        self.setFixedHeight(height)
+        if height != self.height():
+            self.setFixedHeight(height)
 
     def beginNewInput(self, pos, end_pos):
         """
@@ -59,5 +61,5 @@ class TextInputWidget(QTextEdit):
         self.setCurrentFont(action[2])  # 设置字体
         self.max_rect = action[3]  # 设置文本框位置和大小
         self.append(action[4])  # 添加文本内容
-        self.main_window.is_drawing = True
+        self.main_window.isDrawing = True
         self.waitForInput()
@@ -0,0 +1,278 @@
+"""
+文字识别（OCR）：
+1. 预处理：大津法二值化（按直方图向量化计算阈值，统一为白底黑字），再按投影方差估计倾斜角度并校正；
+2. 按行投影把选区切成若干文字行，各行在进程池中并行识别；
+3. 识别结果按内容哈希缓存：整个选区未变化时直接返回，长截图等只新增了部分行时只识别新增的行。
+识别引擎为插件（OcrEngine），内置确定性的占位引擎 'stub'（用于测试）和可选的本地引擎 'tesseract'
+（需要安装 pytesseract 和 Tesseract，未安装时不可用）。
+"""
+import hashlib
+import importlib
+import os
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+class OcrError(Exception):
+    """识别引擎不可用或识别失败"""
+
+
+class OcrEngine(ABC):
+    """
+    识别引擎
+    recognize 可能在子进程中调用：band 为一行文字的 uint8 灰度图像（白底黑字），返回该行的文本
+    引擎对象需要能被 pickle（只保存简单的参数）
+    """
+    name = ''
+    parallel = True  # 是否值得把各行分发到进程池中识别
+
+    def available(self):
+        return True
+
+    @abstractmethod
+    def recognize(self, band: np.ndarray) -> str:
+        ...
+
+
+class StubOcrEngine(OcrEngine):
+    """占位引擎：不做真正的识别，返回由图像内容决定的描述文本，相同的输入总是得到相同的输出"""
+    name = 'stub'
+    parallel = False
+
+    def recognize(self, band):
+        ink = float((band < 128).mean()) if band.size else 0.0
+        checksum = zlib.crc32(np.ascontiguousarray(band).tobytes())
+        return f'[{band.shape[1]}x{band.shape[0]} ink={ink:.3f} crc={checksum:08x}]'
+
+
+class TesseractOcrEngine(OcrEngine):
+    """
+    Tesseract 引擎（pytesseract）
+    参数：
+    - lang: 语言，如 'chi_sim+eng'
+    - scale: 识别前放大的倍数，屏幕文字较小，放大后识别率更高
+    """
+    name = 'tesseract'
+
+    def __init__(self, lang='chi_sim+eng', scale=2):
+        self.lang = lang
+        self.scale = scale
+
+    def available(self):
+        try:
+            importlib.import_module('pytesseract').get_tesseract_version()
+        except Exception:
+            return False
+        return True
+
+    def recognize(self, band):
+        import pytesseract
+        if self.scale > 1:
+            band = np.repeat(np.repeat(band, self.scale, axis=0), self.scale, axis=1)
+        # --psm 7：把图像当作单独一行文字
+        text = pytesseract.image_to_string(band, lang=self.lang, config='--psm 7')
+        return text.strip()
+
+
+_engines = {}  # 名称 -> 引擎或返回引擎的工厂函数 factory(**options)
+
+
+def register_ocr_engine(name, engine):
+    """注册识别引擎，engine 可以是 OcrEngine 实例，也可以是接收引擎参数的工厂函数"""
+    _engines[name] = engine
+
+
+def get_ocr_engine(name, **options):
+    engine = _engines.get(name)
+    if engine is None:
+        raise OcrError(f'未知的识别引擎：{name}')
+    return engine if isinstance(engine, OcrEngine) else engine(**options)
+
+
+def ocr_engines():
+    return list(_engines)
+
+
+register_ocr_engine('stub', StubOcrEngine())
+register_ocr_engine('tesseract', TesseractOcrEngine)
+
+
+def binarize(gray: np.ndarray):
+    """大津法二值化，返回 uint8 图像：文字（像素较少的一类）为 0，背景为 255"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist)
+    total = weight[-1]
+    if total == 0:
+        return np.full(gray.shape, 255, np.uint8)
+    weightedSum = np.cumsum(hist * np.arange(256))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (weightedSum[-1] * weight / total - weightedSum) ** 2 / (weight * (total - weight))
+    threshold = int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+    ink = gray <= threshold
+    if ink.mean() > 0.5:  # 深色背景浅色文字
+        ink = ~ink
+    return np.where(ink, 0, 255).astype(np.uint8)
+
+
+def estimate_skew(binary: np.ndarray, maxAngle=5.0, step=0.25, maxSamples=200000):
+    """
+    估计文字的倾斜角度（度，顺时针为正）：按候选角度把文字像素投影到纵轴，
+    文字行对齐时投影最集中（方差最大）
+    """
+    ys, xs = np.nonzero(binary == 0)
+    if len(ys) < 2:
+        return 0.0
+    if len(ys) > maxSamples:  # 均匀抽样，避免大选区时计算量过大
+        pick = np.linspace(0, len(ys) - 1, maxSamples).astype(np.intp)
+        ys, xs = ys[pick], xs[pick]
+    angles = np.arange(-maxAngle, maxAngle + step / 2, step)
+    best, bestScore = 0.0, -1.0
+    for angle in angles:
+        projected = np.round(ys - xs * np.tan(np.radians(angle))).astype(np.intp)
+        projected -= projected.min()
+        counts = np.bincount(projected)
+        score = float((counts.astype(np.float64) ** 2).sum())
+        if score > bestScore + 1e-9 or (abs(score - bestScore) <= 1e-9 and abs(angle) < abs(best)):
+            best, bestScore = float(angle), score
+    return best
+
+
+def deskew(binary: np.ndarray, angle):
+    """按角度校正倾斜：小角度下用按列的竖直错切近似旋转，超出图像的部分补背景"""
+    if abs(angle) < 1e-6:
+        return binary
+    height, width = binary.shape
+    shifts = np.round(np.arange(width) * np.tan(np.radians(angle))).astype(np.intp)
+    shifts -= shifts.min()
+    result = np.full((height + int(shifts.max()), width), 255, np.uint8)
+    rows = np.arange(height)[:, None] + (shifts.max() - shifts)[None, :]
+    result[rows, np.arange(width)[None, :]] = binary
+    return result
+
+
+def line_bands(binary: np.ndarray, minGap=2, pad=2, minHeight=4):
+    """按行投影切分文字行，返回 [(top, bottom), ...]（bottom 不含），相距不足 minGap 行的合并"""
+    rows = np.flatnonzero((binary == 0).any(axis=1))
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero(np.diff(rows) > minGap)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+    height = binary.shape[0]
+    return [(max(0, int(top) - pad), min(height, int(bottom) + pad))
+            for top, bottom in zip(starts, ends) if bottom - top >= minHeight]
+
+
+def content_key(array: np.ndarray, salt=''):
+    """图像内容的哈希，作为缓存的键"""
+    array = np.ascontiguousarray(array)
+    digest = hashlib.blake2b(array.tobytes(), digest_size=16, person=f'{array.shape}'.encode()[:16])
+    digest.update(salt.encode())
+    return digest.hexdigest()
+
+
+class OcrResult:
+    """
+    识别结果
+    - text: 全部文本，各行以换行分隔
+    - lines: [(top, bottom, 文本), ...]，坐标为校正倾斜后的图像中的行号
+    - angle: 估计的倾斜角度
+    - recognized: 本次实际交给引擎识别的行数（其余来自缓存）
+    """
+
+    def __init__(self, lines, angle=0.0, recognized=0):
+        self.lines = lines
+        self.angle = angle
+        self.recognized = recognized
+        self.text = '\n'.join(text for _, _, text in lines if text)
+
+
+class TextRecognizer:
+    """
+    文字识别流水线
+    参数：
+    - engine: 识别引擎（OcrEngine）
+    - workers: 进程池的进程数，0 为 CPU 核数
+    - cacheCount: 缓存的识别结果数量（选区和文字行分别计数）
+    """
+
+    def __init__(self, engine: OcrEngine, workers=0, cacheCount=1024):
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.cacheCount = cacheCount
+        self._cache = OrderedDict()  # 内容哈希 -> OcrResult（整个选区）或 str（一行）
+        self._executor = None
+        self._available = None  # 引擎是否可用，只检查一次（Tesseract 需要启动子进程查询版本）
+
+    @classmethod
+    def fromSettings(cls, settings):
+        name = settings.get('OcrSettings', 'engine', fallback='tesseract')
+        options = {'lang': settings.get('OcrSettings', 'lang', fallback='chi_sim+eng')} if name == 'tesseract' else {}
+        workers = int(settings.get('OcrSettings', 'workers', fallback='0'))
+        return cls(get_ocr_engine(name, **options), workers)
+
+    def _cached(self, key):
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+        return value
+
+    def _remember(self, key, value):
+        self._cache[key] = value
+        while len(self._cache) > self.cacheCount:
+            self._cache.popitem(last=False)
+
+    def available(self):
+        if self._available is None:
+            self._available = self.engine.available()
+        return self._available
+
+    def executor(self):
+        """进程池在第一次需要并行识别时创建，之后一直复用"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def recognize(self, gray: np.ndarray):
+        """识别 uint8 灰度图像中的文字，返回 OcrResult；内容未变化的选区或文字行不会重新识别"""
+        salt = f'{self.engine.name}:{getattr(self.engine, "lang", "")}'
+        regionKey = content_key(gray, salt)
+        result = self._cached(regionKey)
+        if result is not None:
+            return OcrResult(result.lines, result.angle, 0)
+        binary = binarize(gray)
+        angle = estimate_skew(binary)
+        binary = deskew(binary, angle)
+        bands = line_bands(binary)
+        keys = [content_key(binary[top: bottom], salt) for top, bottom in bands]
+        texts, pending = {}, {}
+        for key, (top, bottom) in zip(keys, bands):
+            text = self._cached(key)
+            if text is None:
+                pending[key] = binary[top: bottom]
+            else:
+                texts[key] = text
+        if pending:
+            if not self.available():
+                raise OcrError(f'识别引擎 {self.engine.name} 不可用')
+            if self.engine.parallel and len(pending) > 1 and self.workers > 1:
+                futures = {key: self.executor().submit(self.engine.recognize, band) for key, band in pending.items()}
+                recognized = {key: future.result() for key, future in futures.items()}
+            else:
+                recognized = {key: self.engine.recognize(band) for key, band in pending.items()}
+            for key, text in recognized.items():
+                self._remember(key, text)
+            texts.update(recognized)
+        lines = [(top, bottom, texts[key]) for key, (top, bottom) in zip(keys, bands)]
+        result = OcrResult(lines, angle, len(pending))
+        self._remember(regionKey, result)
+        return result
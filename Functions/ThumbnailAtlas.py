@@ -0,0 +1,166 @@
+import mmap
+import struct
+import threading
+from pathlib import Path
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from .ImageHash import dhash
+
+
+class ThumbnailEntry:
+    """
+    缩略图索引中的一条记录
+    - slot: 在索引和图集中的位置
+    - captureId: 对应的截图历史记录编号
+    - timestamp、width、height、screen: 截图时间、像素大小和所在屏幕
+    - phash: 感知哈希
+    - thumbWidth、thumbHeight: 缩略图的实际大小
+    """
+
+    def __init__(self, slot, captureId, timestamp, width, height, screen, phash, thumbWidth, thumbHeight,
+                 removed=False):
+        self.slot = slot
+        self.captureId = captureId
+        self.timestamp = timestamp
+        self.width = width
+        self.height = height
+        self.screen = screen
+        self.phash = phash
+        self.thumbWidth = thumbWidth
+        self.thumbHeight = thumbHeight
+        self.removed = removed
+
+
+class ThumbnailAtlas:
+    """
+    截图历史的缩略图图集：所有缩略图按固定大小的格子写入同一个文件，读取时通过内存映射直接定位，
+    配合定长记录的紧凑索引（时间、大小、屏幕、感知哈希），打开上千张截图的列表也无需解码任何原图。
+    删除的记录空出的格子和索引位置留给之后的缩略图复用，两个文件的大小不超过历史中同时存在的截图数量。
+    参数：
+    - root: 存储目录
+    """
+
+    cell_size = 96  # 缩略图格子边长（像素）
+    cell_bytes = cell_size * cell_size * 4  # ARGB32
+    record_struct = struct.Struct('<16sdII32sQHHB3x')
+    image_format = QImage.Format.Format_ARGB32
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.atlas_path = self.root / 'thumbs.atlas'
+        self.index_path = self.root / 'thumbs.idx'
+        self._lock = threading.RLock()
+        self._mmap = None
+        self._entries = []
+        self._slots = {}  # captureId -> slot
+        self._free = []  # 已删除、可以复用的位置
+        self._loadIndex()
+
+    def _loadIndex(self):
+        if not self.index_path.exists():
+            return
+        data = self.index_path.read_bytes()
+        size = self.record_struct.size
+        count = len(data) // size
+        if len(data) != count * size:  # 上次异常退出时可能残留不完整的记录，截断到完整记录为止
+            with open(self.index_path, 'r+b') as f:
+                f.truncate(count * size)
+        for slot in range(count):
+            entry = self._unpack(slot, data[slot * size: (slot + 1) * size])
+            self._entries.append(entry)
+            if entry.removed:
+                self._free.append(slot)
+            else:
+                self._slots[entry.captureId] = slot
+
+    def _unpack(self, slot, data):
+        rawId, timestamp, width, height, screen, phash, thumbWidth, thumbHeight, removed = \
+            self.record_struct.unpack(data)
+        screen = screen.rstrip(b'\0').decode('utf8', 'ignore')
+        return ThumbnailEntry(slot, rawId.hex(), timestamp, width, height, screen, phash, thumbWidth, thumbHeight,
+                              bool(removed))
+
+    def _pack(self, entry):
+        return self.record_struct.pack(bytes.fromhex(entry.captureId), entry.timestamp, entry.width, entry.height,
+                                       entry.screen.encode('utf8')[:32], entry.phash, entry.thumbWidth,
+                                       entry.thumbHeight, int(entry.removed))
+
+    def add(self, captureId, image: QImage, timestamp, screen=''):
+        """生成缩略图，写入删除记录空出的位置，没有时追加到图集和索引的末尾"""
+        thumb = image.scaled(self.cell_size, self.cell_size, Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation).convertToFormat(self.image_format)
+        cell = bytearray(self.cell_bytes)
+        ptr = thumb.constBits()
+        ptr.setsize(thumb.sizeInBytes())
+        buffer = memoryview(ptr)
+        rowBytes = thumb.width() * 4
+        for y in range(thumb.height()):  # 每个格子的行宽固定为 cell_size
+            cell[y * self.cell_size * 4: y * self.cell_size * 4 + rowBytes] = \
+                buffer[y * thumb.bytesPerLine(): y * thumb.bytesPerLine() + rowBytes]
+        with self._lock:
+            self._closeMap()
+            slot = min(self._free) if self._free else len(self._entries)
+            entry = ThumbnailEntry(slot, captureId, timestamp, image.width(), image.height(), screen,
+                                   dhash(image), thumb.width(), thumb.height())
+            self.root.mkdir(parents=True, exist_ok=True)
+            if slot < len(self._entries):  # 先写格子再写索引，中途退出时该位置仍是已删除的记录
+                self._free.remove(slot)
+                self._write(self.atlas_path, slot * self.cell_bytes, cell)
+                self._write(self.index_path, slot * self.record_struct.size, self._pack(entry))
+                self._entries[slot] = entry
+            else:
+                with open(self.atlas_path, 'ab') as f:
+                    f.seek(entry.slot * self.cell_bytes)
+                    f.truncate(entry.slot * self.cell_bytes)  # 丢弃上次异常退出时可能残留的不完整格子
+                    f.write(cell)
+                with open(self.index_path, 'ab') as f:
+                    f.write(self._pack(entry))
+                self._entries.append(entry)
+            self._slots[captureId] = entry.slot
+        return entry
+
+    def _write(self, path, offset, data):
+        with open(path, 'r+b') as f:
+            f.seek(offset)
+            f.write(data)
+
+    def remove(self, captureId):
+        """在索引中标记为已删除（原地改写该条记录），空出的位置留给之后添加的缩略图"""
+        with self._lock:
+            slot = self._slots.pop(captureId, None)
+            if slot is None:
+                return
+            entry = self._entries[slot]
+            entry.removed = True
+            self._write(self.index_path, slot * self.record_struct.size, self._pack(entry))
+            self._free.append(slot)
+
+    def entries(self):
+        """所有未删除的记录，最新的在前"""
+        with self._lock:
+            return sorted((entry for entry in self._entries if not entry.removed),
+                          key=lambda entry: entry.timestamp, reverse=True)
+
+    def entry(self, captureId):
+        slot = self._slots.get(captureId)
+        return None if slot is None else self._entries[slot]
+
+    def _closeMap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _map(self):
+        if self._mmap is None:
+            with open(self.atlas_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def thumbnail(self, entry: ThumbnailEntry):
+        """从内存映射的图集中取出缩略图，只读取该格子所在的页面"""
+        with self._lock:
+            offset = entry.slot * self.cell_bytes
+            data = self._map()[offset: offset + self.cell_bytes]
+        return QImage(data, entry.thumbWidth, entry.thumbHeight, self.cell_size * 4, self.image_format).copy()
@@ -0,0 +1,83 @@
+"""
+稀疏分块画布：长截图可以向上下左右任意方向延伸，画布按固定大小的图块存储，
+只为写入过的图块分配内存，坐标可以为负。读取时未写入的部分填充背景色。
+"""
+import numpy as np
+
+
+class TiledCanvas:
+    """
+    参数：
+    - channels: 通道数，0 表示单通道的二维数组
+    - tileSize: 图块边长（像素）
+    - background: 未写入部分的填充值
+    - dtype: 像素类型
+    """
+
+    def __init__(self, channels=3, tileSize=256, background=0, dtype=np.uint8):
+        self.channels = channels
+        self.tileSize = tileSize
+        self.background = background
+        self.dtype = dtype
+        self._tiles = {}  # (图块列, 图块行) -> 图块数组
+        self.bounds = None  # 写入过的范围 (left, top, right, bottom)，right、bottom 不含
+
+    def _tileShape(self):
+        shape = (self.tileSize, self.tileSize)
+        return shape + (self.channels,) if self.channels else shape
+
+    def _spans(self, start, length):
+        """把 [start, start+length) 按图块切分，返回 (图块序号, 图块内起点, 源起点, 长度)"""
+        size = self.tileSize
+        position, end = start, start + length
+        while position < end:
+            index = position // size  # 负数坐标向下取整，落在左侧/上方的图块中
+            offset = position - index * size
+            span = min(size - offset, end - position)
+            yield index, offset, position - start, span
+            position += span
+
+    def paste(self, image: np.ndarray, x, y):
+        """把图像写到 (x, y) 处，覆盖已有内容"""
+        height, width = image.shape[:2]
+        if not height or not width:
+            return
+        for row, tileTop, sourceTop, rowSpan in self._spans(y, height):
+            for column, tileLeft, sourceLeft, columnSpan in self._spans(x, width):
+                tile = self._tiles.get((column, row))
+                if tile is None:
+                    tile = self._tiles[(column, row)] = np.full(self._tileShape(), self.background, self.dtype)
+                tile[tileTop: tileTop + rowSpan, tileLeft: tileLeft + columnSpan] = \
+                    image[sourceTop: sourceTop + rowSpan, sourceLeft: sourceLeft + columnSpan]
+        right, bottom = x + width, y + height
+        if self.bounds is None:
+            self.bounds = (x, y, right, bottom)
+        else:
+            left0, top0, right0, bottom0 = self.bounds
+            self.bounds = (min(left0, x), min(top0, y), max(right0, right), max(bottom0, bottom))
+
+    def region(self, x, y, width, height):
+        """读取 (x, y) 处 width×height 的区域（新数组），未写入的部分为背景色"""
+        shape = (height, width) + ((self.channels,) if self.channels else ())
+        result = np.full(shape, self.background, self.dtype)
+        for row, tileTop, targetTop, rowSpan in self._spans(y, height):
+            for column, tileLeft, targetLeft, columnSpan in self._spans(x, width):
+                tile = self._tiles.get((column, row))
+                if tile is not None:
+                    result[targetTop: targetTop + rowSpan, targetLeft: targetLeft + columnSpan] = \
+                        tile[tileTop: tileTop + rowSpan, tileLeft: tileLeft + columnSpan]
+        return result
+
+    def toArray(self):
+        """整个写入范围的图像，画布为空时返回 None"""
+        if self.bounds is None:
+            return None
+        left, top, right, bottom = self.bounds
+        return self.region(left, top, right - left, bottom - top)
+
+    def tileCount(self):
+        return len(self._tiles)
+
+    def nbytes(self):
+        """已分配图块占用的内存"""
+        return sum(tile.nbytes for tile in self._tiles.values())
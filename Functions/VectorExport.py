@@ -0,0 +1,68 @@
+"""
+矢量格式导出：截图作为一张内嵌图片，编辑行为作为矢量图形写入 SVG 或 PDF。
+编辑行为较多时文件比位图小得多，放大查看时线条和文字也保持清晰。
+"""
+import base64
+from pathlib import Path
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QMarginsF, QRectF, QSize, QSizeF
+from PyQt5.QtGui import QPainter, QPageSize, QPageLayout, QPdfWriter, QPaintEngine
+from PyQt5.QtSvg import QSvgGenerator
+
+VECTOR_SUFFIXES = ('.svg', '.pdf')
+vector_engines = (QPaintEngine.Type.SVG, QPaintEngine.Type.Pdf)  # 这些绘制引擎下应直接绘制图形而不是贴预先绘制的图片
+
+
+def is_vector_path(path):
+    return Path(path).suffix.lower() in VECTOR_SUFFIXES
+
+
+def is_vector_painter(painter):
+    engine = painter.paintEngine()
+    return engine is not None and engine.type() in vector_engines
+
+
+def write_svg(path, size: QSizeF, png: bytes, paint, title=''):
+    """
+    写入 SVG
+    size: 逻辑大小
+    png: 背景截图的 PNG 数据，直接以 base64 内嵌，重复导出时无需重新编码
+    paint: 绘制函数 paint(painter)，在以左上角为原点的逻辑坐标系中绘制矢量内容
+    """
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    generator = QSvgGenerator()
+    generator.setOutputDevice(buffer)
+    generator.setSize(QSize(round(size.width()), round(size.height())))
+    generator.setViewBox(QRectF(0, 0, size.width(), size.height()))
+    generator.setResolution(96)
+    generator.setTitle(title)
+    painter = QPainter(generator)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+    paint(painter)
+    painter.end()
+    buffer.close()
+    svg = bytes(data).decode('utf8')
+    image = (f'<image x="0" y="0" width="{size.width():g}" height="{size.height():g}" '
+             f'preserveAspectRatio="none" xlink:href="data:image/png;base64,{base64.b64encode(png).decode()}"/>\n')
+    index = svg.index('</defs>') + len('</defs>\n')  # 截图放在所有矢量图形之前
+    Path(path).write_text(svg[:index] + image + svg[index:], encoding='utf8')
+
+
+def write_pdf(path, size: QSizeF, pixmap, paint, title=''):
+    """
+    写入单页 PDF，页面大小与截图的逻辑大小相同（1 逻辑像素 = 1 点）
+    pixmap: 背景截图，按原始分辨率嵌入
+    paint: 同 write_svg
+    """
+    writer = QPdfWriter(str(path))
+    writer.setTitle(title)
+    writer.setResolution(72)
+    writer.setPageLayout(QPageLayout(QPageSize(size, QPageSize.Unit.Point), QPageLayout.Orientation.Portrait,
+                                     QMarginsF()))
+    painter = QPainter(writer)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+    painter.drawPixmap(QRectF(0, 0, size.width(), size.height()), pixmap, QRectF(pixmap.rect()))
+    paint(painter)
+    painter.end()
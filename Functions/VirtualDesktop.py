@@ -0,0 +1,138 @@
+from PyQt5.QtCore import Qt, QRectF, QPointF, QPoint, QSizeF
+from PyQt5.QtGui import QPixmap, QPainter, QGuiApplication
+
+
+class ScreenBuffer:
+    """
+    单个显示器的截图缓冲区
+    参数：
+    - geometry: 屏幕在虚拟桌面中的逻辑矩形（以虚拟桌面左上角为原点）
+    - pixmap: 该屏幕的截图，自带设备像素比
+    - name: 屏幕名称
+    """
+
+    def __init__(self, geometry: QRectF, pixmap: QPixmap, name=''):
+        self.geometry = QRectF(geometry)
+        self.pixmap = pixmap
+        self.pixelRatio = pixmap.devicePixelRatio()
+        self.name = name
+
+    def physicalRect(self, rectf):
+        """将虚拟桌面中的逻辑矩形换算为本屏幕截图内的像素矩形"""
+        local = QRectF(rectf).translated(-self.geometry.topLeft())
+        return QRectF(local.x() * self.pixelRatio, local.y() * self.pixelRatio,
+                      local.width() * self.pixelRatio, local.height() * self.pixelRatio).toRect()
+
+
+class VirtualDesktop:
+    """
+    虚拟桌面：由每个显示器各自的截图缓冲区组成，不拼接成一张完整的大图。
+    坐标均为逻辑坐标，原点为所有屏幕外接矩形的左上角；
+    只有选区涉及到的屏幕才会参与绘制、合成和导出。
+    """
+
+    def __init__(self, buffers, origin=QPoint(0, 0)):
+        self.buffers = buffers
+        self.origin = QPoint(origin)  # 虚拟桌面左上角的全局坐标
+        rectf = QRectF()
+        for buffer in buffers:
+            rectf = rectf.united(buffer.geometry)
+        self._rectf = QRectF(QPointF(0, 0), rectf.bottomRight())
+
+    @classmethod
+    def capture(cls):
+        """逐个抓取所有显示器的截图"""
+        screens = QGuiApplication.screens()
+        origin = QPoint(min(screen.geometry().x() for screen in screens),
+                        min(screen.geometry().y() for screen in screens))
+        buffers = []
+        for screen in screens:
+            geometry = QRectF(screen.geometry().translated(-origin))
+            buffers.append(ScreenBuffer(geometry, screen.grabWindow(0), screen.name()))
+        return cls(buffers, origin)
+
+    @classmethod
+    def fromPixmap(cls, pixmap: QPixmap, origin=QPoint(0, 0)):
+        """用一张已有的图片构造单屏虚拟桌面（用于无界面渲染、基准测试等）"""
+        pixelRatio = pixmap.devicePixelRatio()
+        geometry = QRectF(0, 0, pixmap.width() / pixelRatio, pixmap.height() / pixelRatio)
+        return cls([ScreenBuffer(geometry, pixmap)], origin)
+
+    def rectF(self):
+        return QRectF(self._rectf)
+
+    def sizeF(self):
+        return QSizeF(self._rectf.size())
+
+    def globalGeometry(self):
+        """虚拟桌面的全局逻辑矩形，用于设置截图窗口的位置和大小"""
+        return self._rectf.toRect().translated(self.origin)
+
+    def pixelRatio(self):
+        """所有屏幕中最大的设备像素比"""
+        return max(buffer.pixelRatio for buffer in self.buffers)
+
+    def buffersIntersecting(self, rectf):
+        rectf = QRectF(rectf)
+        if rectf.isEmpty():  # 宽或高为0时只判断左上角所在的屏幕
+            return [buffer for buffer in self.buffers if buffer.geometry.contains(rectf.topLeft())]
+        return [buffer for buffer in self.buffers if buffer.geometry.intersects(rectf)]
+
+    def pixelRatioFor(self, rectf):
+        """指定区域涉及到的屏幕中最大的设备像素比，保证导出时不丢失清晰度"""
+        buffers = self.buffersIntersecting(rectf)
+        if not buffers:
+            return self.buffers[0].pixelRatio
+        return max(buffer.pixelRatio for buffer in buffers)
+
+    def pixelRatioForPhysical(self, physicalRectF):
+        """
+        physicalRectF 由 pixelRatioFor 得到的倍率放大而来，找出该倍率：
+        按该倍率缩小后的区域所涉及屏幕的最大设备像素比恰好是它本身
+        """
+        physicalRectF = QRectF(physicalRectF)
+        for pixelRatio in sorted({buffer.pixelRatio for buffer in self.buffers}, reverse=True):
+            rectf = QRectF(physicalRectF.topLeft() / pixelRatio, physicalRectF.size() / pixelRatio)
+            if self.pixelRatioFor(rectf) == pixelRatio:
+                return pixelRatio
+        return self.pixelRatio()
+
+    def paint(self, painter, rectf):
+        """只绘制指定区域内涉及到的屏幕截图"""
+        rectf = QRectF(rectf)
+        for buffer in self.buffersIntersecting(rectf):
+            target = buffer.geometry.intersected(rectf)
+            painter.drawPixmap(target, buffer.pixmap, QRectF(buffer.physicalRect(target)))
+
+    def paste(self, rectf, pixmap):
+        """把一张图片覆盖到虚拟桌面的指定区域上（只修改涉及到的屏幕），用于重新打开历史截图"""
+        rectf = QRectF(rectf)
+        sourceRatio = pixmap.devicePixelRatio()
+        for buffer in self.buffersIntersecting(rectf):
+            target = buffer.geometry.intersected(rectf)
+            source = target.translated(-rectf.topLeft())
+            painter = QPainter(buffer.pixmap)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
+            painter.drawPixmap(target.translated(-buffer.geometry.topLeft()), pixmap,
+                               QRectF(source.x() * sourceRatio, source.y() * sourceRatio,
+                                      source.width() * sourceRatio, source.height() * sourceRatio))
+            painter.end()
+
+    def grab(self, rectf):
+        """获取指定区域的截图，仅合成涉及到的屏幕。返回的QPixmap带有设备像素比"""
+        rectf = QRectF(rectf)
+        buffers = self.buffersIntersecting(rectf)
+        if len(buffers) == 1 and buffers[0].geometry.contains(rectf):  # 只涉及一个屏幕时直接复制
+            return buffers[0].pixmap.copy(buffers[0].physicalRect(rectf))
+        pixelRatio = self.pixelRatioFor(rectf)
+        pixmap = QPixmap((rectf.size() * pixelRatio).toSize())
+        pixmap.setDevicePixelRatio(pixelRatio)
+        pixmap.fill(Qt.GlobalColor.black)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
+        painter.translate(-rectf.topLeft())
+        for buffer in buffers:
+            target = buffer.geometry.intersected(rectf)
+            painter.drawPixmap(target, buffer.pixmap, QRectF(buffer.physicalRect(target)))
+        painter.end()
+        return pixmap
@@ -1,6 +1,58 @@
+import importlib
+
 from .TextInput import TextInputWidget
-from .CustomBrush import LineWidthAction
+from .CustomBrush import LineWidthAction, RedactionAction, glyph_icon
 from .FontSelector import FontAction
 from .ColorSelector import ColorAction
 from .CircleNumber import Circle
-from .PicMatcher import merge_images, save_merge_result, get_rgb_image
+from .VirtualDesktop import VirtualDesktop, ScreenBuffer
+from .CaptureHistory import CaptureHistory, CaptureRecord
+from .ThumbnailAtlas import ThumbnailAtlas, ThumbnailEntry
+from .ImageHash import dhash, hamming_distance
+from .PixmapStore import PixmapStore, SharedPixmap, shadow_border, paint_nine_slice, encode_png, pixmap_key
+from .AnnotationSpec import actions_to_spec, actions_from_spec
+from .AnnotationDocument import AnnotationDocument, AnnotationFormatError
+from .EditHistory import EditHistory, EditCommand, AddCommand, ReplaceCommand, RemoveCommand, action_bounds
+from .FrameProfiler import FrameProfiler
+from .SelectionGeometry import SelectionGeometry, HANDLE_CURSORS
+from .SmartSelection import ElementProvider, RectIndex, register_element_provider, detect_elements, rect_to_qrectf
+from .VectorExport import write_svg, write_pdf, is_vector_path, is_vector_painter
+
+# 依赖 OpenCV/NumPy 的图像处理函数按需加载，托盘启动时不导入这些重量级模块
+_lazy_members = {
+    'merge_images': '.PicMatcher',
+    'save_merge_result': '.PicMatcher',
+    'get_rgb_image': '.PicMatcher',
+    'MatchError': '.PicMatcher',
+    'OffsetStrategy': '.PicMatcher',
+    'register_strategy': '.PicMatcher',
+    'get_strategy': '.PicMatcher',
+    'strategies': '.PicMatcher',
+    'Stitcher': '.PicMatcher',
+    'TiledCanvas': '.TiledCanvas',
+    'FrameGate': '.FrameGate',
+    'dedup_save': '.SaveDedup',
+    'qimage_to_gray': '.SaveDedup',
+    'bgr_to_gray': '.SaveDedup',
+    'qimage_to_rgb': '.SaveDedup',
+    'DesktopPixels': '.PixelStats',
+    'RegionStats': '.PixelStats',
+    'contrast_ratio': '.PixelStats',
+    'rgb_to_hex': '.PixelStats',
+    'Redactor': '.Redaction',
+    'TextRecognizer': '.TextRecognition',
+    'OcrEngine': '.TextRecognition',
+    'OcrError': '.TextRecognition',
+    'register_ocr_engine': '.TextRecognition',
+    'get_ocr_engine': '.TextRecognition',
+}
+
+
+def __getattr__(name):
+    """首次访问时才导入对应模块，并缓存到包命名空间中"""
+    if name in _lazy_members:
+        module = importlib.import_module(_lazy_members[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -44,11 +44,24 @@ class Settings:
             'check_automatic_update': 'True',
             'is_startup': 'False',
             'picture_quality': '100',
+            'is_smart_select': 'True',
+            'stitch_strategy': 'phase',
         }
         self.config['SaveSettings'] = {
             'is_silent_save': 'False',
             'default_path_edit': str(self.home_pictures),
             'save_name_edit': 'hydra_{Y}{m}{d}_{H}{M}{S}.png',
+            'is_dedup_save': 'False',
+        }
+        self.config['HistorySettings'] = {
+            'is_save_history': 'True',
+            'history_path': str(self.home / '.hydra-screenshot' / 'history'),
+            'max_size_mb': '512',
+            'cache_count': '8',
+        }
+        self.config['PinSettings'] = {
+            'max_memory_mb': '256',
+            'idle_minutes': '10',
         }
         self.config['AnnotationSettings'] = {
             'thin_width': '2',
@@ -62,6 +75,17 @@ class Settings:
             'copy': 'ctrl+c',
             'save': 'ctrl+s',
             'undo': 'ctrl+z',
+            'redo': 'ctrl+y',
+            'pick_color': 'p',
+        }
+        self.config['OcrSettings'] = {
+            'engine': 'tesseract',
+            'lang': 'chi_sim+eng',
+            'workers': '0',
+        }
+        self.config['DebugSettings'] = {
+            'is_profile': 'False',
+            'trace_path': str(self.home / '.hydra-screenshot' / 'traces'),
         }
         self.config['IconPaths'] = {
             'rectangle_icon': './src/rectangle.png',
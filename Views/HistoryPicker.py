@@ -0,0 +1,96 @@
+import logging
+import time
+from threading import Thread
+
+from PyQt5.QtCore import Qt, QSize, QAbstractListModel, QModelIndex, QPoint, pyqtSignal
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+
+from .BaseWindow import BaseWidget
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryModel(QAbstractListModel):
+    """截图历史列表模型，缩略图只在条目可见时才从图集中读取"""
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.entries = []
+        self._pixmaps = {}  # captureId -> QPixmap，已显示过的缩略图（位置会被新的缩略图复用，不能以位置为键）
+
+    def reload(self):
+        self.beginResetModel()
+        self.entries = self.history.atlas.entries()
+        self._pixmaps.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return time.strftime('%m-%d %H:%M', time.localtime(entry.timestamp))
+        elif role == Qt.ItemDataRole.DecorationRole:
+            if entry.captureId not in self._pixmaps:
+                self._pixmaps[entry.captureId] = QPixmap.fromImage(self.history.atlas.thumbnail(entry))
+            return self._pixmaps[entry.captureId]
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return f'{entry.width} × {entry.height}  {entry.screen}'
+        elif role == Qt.ItemDataRole.UserRole:
+            return entry.captureId
+        return None
+
+
+class HistoryPicker(BaseWidget):
+    """截图历史选择器，双击缩略图将对应截图重新贴图置顶"""
+    pin_signal = pyqtSignal(QPixmap, QPoint)
+    loaded_signal = pyqtSignal(str, object, object)  # 工作线程读取完截图（captureId, QImage, CaptureRecord）
+
+    def __init__(self, history):
+        super().__init__("截图历史")
+        self.history = history
+        self._loading = set()  # 正在后台读取的 captureId，连续双击时不重复读取
+        self.loaded_signal.connect(self.onLoaded)
+        self.model = HistoryModel(history, self)
+        self.list_view = QListView(self)
+        self.list_view.setViewMode(QListView.ViewMode.IconMode)
+        self.list_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.list_view.setUniformItemSizes(True)  # 所有条目大小一致，无需逐个计算布局
+        self.list_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.list_view.setIconSize(QSize(history.atlas.cell_size, history.atlas.cell_size))
+        self.list_view.setGridSize(QSize(history.atlas.cell_size + 24, history.atlas.cell_size + 32))
+        self.list_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.list_view.setModel(self.model)
+        self.list_view.doubleClicked.connect(self.pin)
+        self.base_layout.addWidget(self.list_view)
+        self.resize(760, 560)
+
+    def show(self):
+        self.model.reload()
+        super().show()
+
+    def pin(self, index):
+        """贴图需要完整的截图（贴图窗口按内容共享原图），解压和拼接图块在工作线程中进行，不阻塞界面"""
+        captureId = index.data(Qt.ItemDataRole.UserRole)
+        if self.history.record(captureId) is None or captureId in self._loading:
+            return
+        self._loading.add(captureId)
+        Thread(target=self.loadCapture, args=(captureId,), daemon=True).start()
+
+    def loadCapture(self, captureId):
+        try:
+            image, record = self.history.load(captureId)
+        except Exception as e:  # 例如图块文件已被删除
+            logger.warning('读取历史截图失败：%s', e)
+            image = record = None
+        self.loaded_signal.emit(captureId, image, record)
+
+    def onLoaded(self, captureId, image, record):
+        self._loading.discard(captureId)
+        if image is not None:
+            self.pin_signal.emit(QPixmap.fromImage(image), record.rectF().topLeft().toPoint())
@@ -1,18 +1,21 @@
+import logging
 from datetime import datetime
 from pathlib import Path
 from threading import Thread
 
 import numpy as np
 from PIL import ImageGrab
-from PyQt5.QtCore import Qt, QRectF, QObject, pyqtSignal, QPoint
+from PyQt5.QtCore import Qt, QRectF, QObject, pyqtSignal, QPoint, QTimer
 from PyQt5.QtGui import QPainter, QColor, QRegion, QImage, QPixmap, QFont
 from PyQt5.QtWidgets import QWidget, QApplication, QFileDialog
 from pynput import mouse
 
-from Functions import merge_images, save_merge_result, get_rgb_image
+from Functions import Stitcher, MatchError, FrameGate, save_merge_result, get_rgb_image, dedup_save, bgr_to_gray
 from Settings import Settings
 from .LongToolBar import LongToolBar
 
+logger = logging.getLogger(__name__)
+
 
 class MouseListener(QObject):
     """ 鼠标滚动监听器 """
@@ -38,6 +41,8 @@ class MouseListener(QObject):
 
 
 class LongScreenshot(QWidget):
+    save_report_signal = pyqtSignal(str)  # 保存结果提示（如跳过重复截图节省的空间）
+    ocr_signal = pyqtSignal(object)  # 工作线程识别完文字（OcrResult，失败时为错误信息）
     fileType_img = '图片文件 (*.jpg *.jpeg *.gif *.png *.bmp)'
     dir_lastAccess = Path.cwd()  # 最后访问目录
 
@@ -51,12 +56,21 @@ class LongScreenshot(QWidget):
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setAutoFillBackground(False)
         self.center_rectf = center_rectf  # 截屏区域
-        self.images = []
+        self.images = []  # 当前的拼接结果（BGR）
+        # 默认使用相位相关法估计偏移，可以上下左右滚动；每帧只与上一帧比较，结果写在稀疏分块画布上
+        self.stitcher = Stitcher(self.settings.get('GeneralSettings', 'stitch_strategy', fallback='phase'))
+        self.gate = FrameGate()  # 跳过页面未移动的帧，暂缓仍在滚动动画中的帧
+        self.settleTimer = QTimer(self)  # 有暂缓的帧时，稍后再截取一次，确认画面已稳定
+        self.settleTimer.setSingleShot(True)
+        self.settleTimer.setInterval(60)
+        self.settleTimer.timeout.connect(self.captureFrame)
+        self.recognizer = None  # 文字识别流水线，长截图变长后再次识别时，未变化的文字行直接取缓存
         self.ml = MouseListener()
         self.ml_thread = Thread(target=self.ml.start)
         self.ml_thread.start()
         # 将信号连接到槽函数
         self.ml.scroll_signal.connect(self.wheelScroll)
+        self.ocr_signal.connect(self.onTextRecognized)
         self.toolbar = LongToolBar(self)
         self.getLongScreenshot()
 
@@ -123,21 +137,43 @@ class LongScreenshot(QWidget):
 
     def wheelScroll(self, x, y, dx, dy):
         if self.center_rectf.contains(x, y):
-            if dy < 0:
-                self.getLongScreenshot()
-                self.update()
+            if dy < 0 or dx:  # 向下或左右滚动
+                self.captureFrame()
 
     def grabCenter(self):
         temp = ImageGrab.grab(bbox=self.center_rectf.getCoords())
-        self.images.append(np.array(temp))
+        return np.array(temp)[..., ::-1]  # PIL 截图为 RGB，拼接结果统一为 BGR
+
+    def captureFrame(self, force=False):
+        """
+        截取一帧并拼接：与上一次拼接的帧相同（页面未移动）时跳过；
+        画面仍在变化时暂缓，稍后再截取一次，两次一致后再拼接
+        force: 不再暂缓，用于保存、复制前截取最后一帧
+        """
+        frame = self.grabCenter()
+        verdict = self.gate.check(frame, force)
+        if verdict == FrameGate.DEFER:
+            self.settleTimer.start()
+            return
+        self.settleTimer.stop()
+        if verdict == FrameGate.ACCEPT:
+            try:
+                self.stitcher.add(frame)
+            except MatchError as e:
+                logger.warning('长截图第 %d 帧拼接失败，已跳过：%s', self.stitcher.frames, e)
+            self.images = [self.stitcher.result()]
+            self.update()
 
     def getLongScreenshot(self):
-        self.grabCenter()
-        self.images[-1] = merge_images(self.images)
-        if len(self.images) == 2:
-            self.images.pop(0)
+        self.captureFrame(force=True)
         return self.images[-1]
 
+    def hideEvent(self, event):
+        self.settleTimer.stop()
+        logger.info('长截图共截取 %d 帧，拼接 %d 帧，省去 %d 次偏移量估计', sum(self.gate.counts.values()),
+                    self.gate.counts[FrameGate.ACCEPT], self.gate.saved())
+        super().hideEvent(event)
+
     def save2Clipboard(self):
         """将截图区域复制到剪贴板"""
         image = self.getLongScreenshot()
@@ -149,6 +185,35 @@ class LongScreenshot(QWidget):
         qimage = QImage(image_rgb.data, width, height, width * channel, QImage.Format_RGB888)
         QApplication.clipboard().setPixmap(QPixmap.fromImage(qimage))
 
+    def recognizeText(self):
+        """识别长截图中的文字，在后台线程中完成后复制到剪贴板"""
+        from Functions import TextRecognizer
+        if self.recognizer is None:
+            try:
+                self.recognizer = TextRecognizer.fromSettings(self.settings)
+            except Exception as e:
+                self.save_report_signal.emit(f'文字识别失败：{e}')
+                return
+        gray = np.clip(bgr_to_gray(self.getLongScreenshot()) + 0.5, 0, 255).astype(np.uint8)
+        Thread(target=self.runTextRecognition, args=(self.recognizer, gray), daemon=True).start()
+
+    def runTextRecognition(self, recognizer, gray):
+        try:
+            result = recognizer.recognize(gray)
+        except Exception as e:
+            self.ocr_signal.emit(f'文字识别失败：{e}')
+            return
+        self.ocr_signal.emit(result)
+
+    def onTextRecognized(self, result):
+        if isinstance(result, str):
+            self.save_report_signal.emit(result)
+        elif result.text:
+            QApplication.clipboard().setText(result.text)
+            self.save_report_signal.emit(f'已识别 {len(result.lines)} 行文字并复制到剪贴板')
+        else:
+            self.save_report_signal.emit('未识别到文字')
+
     def save2Local(self):
         """保存截图到本地"""
         self.settings = Settings()
@@ -171,7 +236,14 @@ class LongScreenshot(QWidget):
             selectedFilePath = Path(filePath)
             selectedFilePath = self.handle_existing_filepath(selectedFilePath)
             # 保存图像
-            save_merge_result(str(selectedFilePath), image)
+            if self.settings.get('SaveSettings', 'is_dedup_save', fallback='False') == 'True':
+                selectedFilePath, linked, savedBytes = dedup_save(
+                    selectedFilePath, image[..., 2::-1], lambda path: save_merge_result(path, image))
+                if linked is not None:
+                    self.save_report_signal.emit(f'{selectedFilePath.name} 与已有截图 {linked.name} 相同，'
+                                                 f'已保存为硬链接，节省 {savedBytes / 1024:.1f} KB')
+            else:
+                save_merge_result(str(selectedFilePath), image)
 
     def get_default_filename(self):
         """根据不同条件生成默认文件名"""
@@ -2,6 +2,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QToolBar, QAction
 
+from Functions import glyph_icon
 from Settings import Settings
 
 
@@ -23,11 +24,14 @@ class LongToolBar(QToolBar):
         self.save_action = QAction(QIcon(self.settings.get('IconPaths', 'save_icon')), '保存', self)
         self.close_action = QAction(QIcon(self.settings.get('IconPaths', 'cancel_icon')), '关闭', self)
         self.copy_action = QAction(QIcon(self.settings.get('IconPaths', 'ok_icon')), '复制', self)
+        self.ocr_action = QAction(glyph_icon('文'), '识别文字', self)
 
         self.save_action.triggered.connect(lambda: self.before_save('local'))
         self.close_action.triggered.connect(self.exit)
         self.copy_action.triggered.connect(lambda: self.before_save('clipboard'))
+        self.ocr_action.triggered.connect(lambda: self.before_save('text'))
 
+        self.addAction(self.ocr_action)
         self.addAction(self.save_action)
         self.addAction(self.close_action)
         self.addAction(self.copy_action)
@@ -41,6 +45,8 @@ class LongToolBar(QToolBar):
             self.screenshot_area.save2Local()
         elif target == 'clipboard':
             self.screenshot_area.save2Clipboard()
+        elif target == 'text':
+            self.screenshot_area.recognizeText()
         self.exit()
 
     def enterEvent(self, event):
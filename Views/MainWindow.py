@@ -1,29 +1,37 @@
 import sys
+import time
+from threading import Thread
 
 import keyboard
-from PyQt5.QtCore import Qt, pyqtSignal, QObject, QRect, QPoint, QSize
-from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QClipboard
-from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QWidget, QGraphicsDropShadowEffect
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QRect, QPoint, QSize, QTimer
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QClipboard, QImage
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QWidget
 
+from Functions import SharedPixmap, shadow_border, paint_nine_slice
 from Settings import Settings
 from .ScreenArea import ScreenShotWidget
 from .SettingView import SettingWindow
 from .About import AboutView
+from .HistoryPicker import HistoryPicker
+from .PinManager import PinManager
 
 
 class StickyNoteWidget(QWidget):
     update_top_info = pyqtSignal(QPoint, float)
+    refined_signal = pyqtSignal(int, QImage)  # 工作线程完成高质量缩放（缩放级别, 结果）
+    refine_delay = 150  # 滚轮停止多久后开始高质量缩放（毫秒）
+    shadow_margin = 4  # 阴影边框宽度
+    shadow_color = QColor(179, 95, 39)
 
-    def __init__(self, pixmap: QPixmap, coordinate: QPoint, scale_factor: float, parent=None):
+    def __init__(self, shared: SharedPixmap, coordinate: QPoint, scale_factor: float, parent=None):
         super().__init__(parent)
         self.settings = Settings()
         self.setWindowTitle('贴图置顶')
         self.setWindowIcon(QIcon(self.settings.get('SoftwareConfig', 'exe_icon')))
         self.setWindowFlags(Qt.ToolTip | Qt.WindowStaysOnTopHint | Qt.CustomizeWindowHint | Qt.FramelessWindowHint)
         self.setAttribute(Qt.WA_TranslucentBackground, True)
-        self.pixmap = pixmap
+        self.shared = shared  # 与其他贴图共享的原图及缩放缓存
         self.coordinate = coordinate
-        self.original_pixmap = pixmap
         self.scale_factor = scale_factor
         self.copy_action = QAction(QIcon(self.settings.get('IconPaths', 'copy_icon')), "复制", None)
         self.destroy_action = QAction(QIcon(self.settings.get('IconPaths', 'close_icon')), "关闭", None)
@@ -31,15 +39,22 @@ class StickyNoteWidget(QWidget):
         self.destroy_action.triggered.connect(self.hide)
         self.drag_position = None
         # 调整控件大小，保证它和 pixmap 大小一致
-        self.width_ratio = pixmap.width() / pixmap.height()
+        self.width_ratio = shared.width / shared.height
         self.setGeometry(self.coordinate.x(), self.coordinate.y(),
-                         int(pixmap.width() * scale_factor) + 8, int(pixmap.height() * scale_factor) + 8)
-        # 创建阴影效果
-        self.shadow = QGraphicsDropShadowEffect(self)
-        self.shadow.setOffset(0, 0)  # 调整阴影偏移量
-        self.shadow.setBlurRadius(6)  # 调整阴影半径
-        self.shadow.setColor(QColor(179, 95, 39))  # 调整阴影颜色
-        self.setGraphicsEffect(self.shadow)
+                         int(shared.width * scale_factor) + 8, int(shared.height * scale_factor) + 8)
+        # 预先绘制的阴影边框，绘制时按九宫格拉伸
+        self.shadow = shadow_border(self.shadow_margin, self.shadow_color)
+        # 两阶段缩放：滚动过程中用已缓存的缩放级别快速预览，停止滚动后在工作线程中高质量缩放
+        self.is_zooming = False
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(self.refine_delay)
+        self.refine_timer.timeout.connect(self.startRefine)
+        self.refined_signal.connect(self.onRefined)
+
+    @property
+    def pixmap(self):
+        return self.shared.pixmap
 
     def wheelEvent(self, event):
         angle_delta = event.angleDelta().y()
@@ -49,14 +64,38 @@ class StickyNoteWidget(QWidget):
         # 向下滚动，缩小控件和图片
         elif angle_delta < -1:
             self.scale_factor *= 0.9
-        # 根据缩放因子重新设置控件大小和图片
-        new_width = int(self.original_pixmap.width() * self.scale_factor)
-        new_height = int(self.original_pixmap.height() * self.scale_factor)
+        # 根据缩放因子重新设置控件大小，图片在绘制时从缓存的缩放级别中获取
+        new_width = int(self.shared.width * self.scale_factor)
+        new_height = int(self.shared.height * self.scale_factor)
         self.setFixedSize(new_width + 8, new_height + 8)
-        self.pixmap = self.original_pixmap.scaled(new_width, new_height, Qt.AspectRatioMode.KeepAspectRatio)
+        self.is_zooming = True
+        self.refine_timer.start()  # 每次滚动都重新计时（防抖）
         self.update()
         self.update_top_info.emit(self.coordinate, self.scale_factor)
 
+    def showEvent(self, event):
+        self.refine_timer.start()
+        super().showEvent(event)
+
+    def startRefine(self):
+        """滚动停止后，若当前缩放级别尚未缓存，则在工作线程中进行高质量缩放"""
+        self.is_zooming = False
+        if self.shared.hasRendition(self.scale_factor):
+            self.update()
+            return
+        level = self.shared.level(self.scale_factor)
+        Thread(target=self.refine, args=(self.shared.image(), level), daemon=True).start()
+
+    def refine(self, image: QImage, level: int):
+        """在工作线程中执行，QImage 可以安全地在非 GUI 线程中缩放"""
+        scaled = image.scaled(*self.shared.levelSize(level), Qt.AspectRatioMode.KeepAspectRatio,
+                              Qt.TransformationMode.SmoothTransformation)
+        self.refined_signal.emit(level, scaled)
+
+    def onRefined(self, level: int, image: QImage):
+        self.shared.addRendition(level, QPixmap.fromImage(image))
+        self.update()
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.drag_position = event.globalPos() - self.pos()
@@ -72,19 +111,24 @@ class StickyNoteWidget(QWidget):
             self.update_top_info.emit(self.coordinate, self.scale_factor)
             self.drag_position = None
 
-    def setPixmap(self, pixmap: QPixmap, coordinate: QPoint):
-        self.pixmap = pixmap
-        self.original_pixmap = pixmap
-        self.width_ratio = pixmap.width() / pixmap.height()
-        self.setGeometry(coordinate.x(), coordinate.y(), pixmap.width() + 8, pixmap.height() + 8)
+    def setPixmap(self, shared: SharedPixmap, coordinate: QPoint):
+        self.shared = shared
+        self.width_ratio = shared.width / shared.height
+        self.setGeometry(coordinate.x(), coordinate.y(), shared.width + 8, shared.height + 8)
         self.scale_factor = 1.0
         self.update()
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         pixmap_rect = QRect(QPoint(4, 4), QSize(self.width() - 8, int((self.width() - 8) / self.width_ratio)))
-        painter.drawPixmap(pixmap_rect, self.pixmap)
+        paint_nine_slice(painter, pixmap_rect, self.shadow, self.shadow_margin)
+        if self.is_zooming or not self.shared.hasRendition(self.scale_factor):
+            # 预览：已缓存的最近一级直接快速缩放绘制，不做任何耗时的重采样
+            painter.drawPixmap(pixmap_rect, self.shared.cachedRendition(self.scale_factor))
+        else:
+            # 精细：当前级别与目标大小相差不超过一级，平滑缩放绘制即可得到高质量结果
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawPixmap(pixmap_rect, self.shared.rendition(self.scale_factor))
 
     def contextMenuEvent(self, event):
         menu = QMenu(self)
@@ -94,7 +138,7 @@ class StickyNoteWidget(QWidget):
 
     def copyPixmap2Clipboard(self):
         clipboard = QApplication.clipboard()
-        clipboard.setPixmap(self.pixmap, mode=QClipboard.Clipboard)
+        clipboard.setPixmap(self.shared.pixmap, mode=QClipboard.Clipboard)
 
 
 class TrayProgram(QObject):
@@ -110,8 +154,8 @@ class TrayProgram(QObject):
         self.tray_icon.setIcon(QIcon(self.settings.get('SoftwareConfig', 'exe_icon')))
         self.screenShotWg = ScreenShotWidget()
         self.screenShotWg.send_pixmap_signal.connect(self.show_top)
+        self.screenShotWg.save_report_signal.connect(self.show_message)
         self.startScreenshotSignal.connect(self.screenShotWg.start)
-        self.pixmap = None
         self.coordinate = None
         self.scale_factor = 1.0
         # 实现一个无边框且置顶的弹出窗口menu
@@ -120,23 +164,33 @@ class TrayProgram(QObject):
         self.menu.setAttribute(Qt.WA_TranslucentBackground)  # 设置半透明背景
         self.settings_action = QAction("软件设置")
         self.show_top_action = QAction("显示贴图")
+        self.history_menu = QMenu("历史截图")
+        self.history_picker_action = QAction("截图历史")
         self.about_action = QAction("关于")
         self.exit_action = QAction("退出")
         self.settings_action.triggered.connect(self.show_settings)
-        self.show_top_action.triggered.connect(lambda: self.show_top(self.pixmap, self.coordinate))
+        self.show_top_action.triggered.connect(lambda: self.pin_manager.showLast())
+        self.history_picker_action.triggered.connect(self.show_history_picker)
         self.about_action.triggered.connect(self.show_about)
         self.exit_action.triggered.connect(self.exit_program)
         self.menu.addAction(self.settings_action)
         self.menu.addAction(self.show_top_action)
+        self.menu.addMenu(self.history_menu)
+        self.menu.addAction(self.history_picker_action)
+        self.history_menu.aboutToShow.connect(self.refresh_history_menu)
         self.menu.addSeparator()
         self.menu.addAction(self.about_action)
         self.menu.addAction(self.exit_action)
         self.tray_icon.setContextMenu(self.menu)
         self.set_menu_style()  # 设置菜单样式
         self.settings_window = SettingWindow(settings=self.settings)
+        self.pin_manager = PinManager(StickyNoteWidget, self.settings, parent=self.settings_window)
+        self.pin_manager.pin_created.connect(lambda widget: widget.update_top_info.connect(self.update_current_top))
         screenshot_key = self.settings.get('ShortKeySettings', 'screenshot')
         keyboard.add_hotkey(screenshot_key, self.startScreenshotSignal.emit)
         self.about_window = AboutView()
+        self.history_picker = HistoryPicker(self.screenShotWg.history)
+        self.history_picker.pin_signal.connect(self.show_top)
 
     def set_menu_style(self):
         qss = """
@@ -169,24 +223,43 @@ class TrayProgram(QObject):
         """
 
         self.menu.setStyleSheet(qss)
+        self.history_menu.setStyleSheet(qss)
+
+    def show_message(self, message: str):
+        self.tray_icon.showMessage('水螅截图', message, QSystemTrayIcon.MessageIcon.Information, 3000)
 
     def show_settings(self):
         self.settings_window.show()
 
+    def show_history_picker(self):
+        self.history_picker.show()
+
     def show_about(self):
         self.about_window.show()
 
     def exit_program(self):
         keyboard.remove_all_hotkeys()
+        self.screenShotWg.history.flush()  # 保存最近访问时间
         sys.exit()
 
     def show_top(self, pixmap: QPixmap, coordinate: QPoint):
         if pixmap and coordinate:
-            self.pixmap = pixmap
             self.coordinate = coordinate
-            sticky_note_widget = StickyNoteWidget(pixmap, coordinate, self.scale_factor, parent=self.settings_window)
-            sticky_note_widget.update_top_info.connect(self.update_current_top)
-            sticky_note_widget.show()
+            self.pin_manager.pin(pixmap, coordinate, self.scale_factor)
+
+    def refresh_history_menu(self):
+        """列出最近的截图，点击后重新打开继续标注"""
+        self.history_menu.clear()
+        history = self.screenShotWg.history
+        records = history.records()[:history.cacheCount]
+        if not records:
+            empty_action = self.history_menu.addAction("暂无截图")
+            empty_action.setEnabled(False)
+        for record in records:
+            text = f"{time.strftime('%m-%d %H:%M:%S', time.localtime(record.timestamp))}  " \
+                   f"{record.width} × {record.height}"
+            action = self.history_menu.addAction(text)
+            action.triggered.connect(lambda checked, capture_id=record.id: self.screenShotWg.reopenCapture(capture_id))
 
     def update_current_top(self, coordinate: QPoint, scale_factor: float):
         self.coordinate = coordinate
@@ -0,0 +1,148 @@
+import time
+from threading import Thread
+
+from PyQt5.QtCore import QObject, QEvent, QTimer, QPoint, pyqtSignal
+from PyQt5.QtGui import QPixmap
+
+from Functions import PixmapStore, SharedPixmap, encode_png, pixmap_key
+
+
+class PinManager(QObject):
+    """
+    管理所有贴图窗口：同一张图片（按内容判断）复用已有的窗口，并按内存预算回收资源。
+    隐藏的贴图会在后台压缩为内存中的 PNG 并释放原图，除最近操作过的一个（可从托盘重新显示）外，
+    隐藏的贴图窗口随后销毁并归还共享的原图；长时间未操作的贴图丢弃缩放缓存并压缩释放，
+    解码后的图像超出预算时再按最久未操作的顺序压缩释放。释放后的贴图在重新显示或绘制时自动解码恢复。
+    参数：
+    - widget_class: 贴图窗口类，构造参数为 (shared, coordinate, scale_factor, parent)
+    - settings: 配置
+    - parent: 贴图窗口的父控件
+    """
+    pin_created = pyqtSignal(object)  # 新建了贴图窗口
+    compressed_signal = pyqtSignal(object, bytes)  # 工作线程压缩完成（SharedPixmap, PNG 数据）
+    trim_interval = 30 * 1000  # 定期检查的间隔（毫秒）
+
+    def __init__(self, widget_class, settings, parent=None):
+        super().__init__()
+        self.widget_class = widget_class
+        self.parent = parent
+        self.store = PixmapStore()
+        self.budget = int(settings.get('PinSettings', 'max_memory_mb', fallback='256')) * 1024 * 1024
+        self.idle_seconds = float(settings.get('PinSettings', 'idle_minutes', fallback='10')) * 60
+        self.pins = []
+        self.last_active = {}  # 贴图窗口 -> 最近一次操作的时间
+        self.last_pin = None
+        self._compressing = set()  # 正在压缩的 SharedPixmap 的 key
+        self._offloading = set()  # 压缩完成后即使仍在显示也要释放的 SharedPixmap 的 key
+        self.compressed_signal.connect(self.onCompressed)
+        self.trim_timer = QTimer(self)
+        self.trim_timer.setInterval(self.trim_interval)
+        self.trim_timer.timeout.connect(self.trim)
+        self.trim_timer.start()
+
+    def pin(self, pixmap: QPixmap, coordinate: QPoint, scale_factor: float):
+        """显示贴图：已有同一张图片的窗口时直接复用，否则新建"""
+        key = pixmap_key(pixmap)
+        widget = self.find(key)
+        if widget is None:
+            shared = self.store.acquire(pixmap, key)
+            widget = self.widget_class(shared, coordinate, scale_factor, parent=self.parent)
+            widget.installEventFilter(self)
+            self.pins.append(widget)
+            self.pin_created.emit(widget)
+        elif not widget.isVisible():
+            widget.move(coordinate)
+            widget.coordinate = coordinate
+        self.reveal(widget)
+        return widget
+
+    def find(self, key):
+        """按图片内容的哈希查找贴图窗口"""
+        for widget in self.pins:
+            if widget.shared.key == key:
+                return widget
+        return None
+
+    def showLast(self):
+        """重新显示最近操作过的贴图"""
+        if self.last_pin is not None:
+            self.reveal(self.last_pin)
+
+    def reveal(self, widget):
+        self.touch(widget)
+        widget.show()
+        widget.raise_()
+
+    def touch(self, widget):
+        self.last_active[widget] = time.monotonic()
+        self._offloading.discard(widget.shared.key)
+        if self.last_pin is not widget:
+            self.last_pin = widget
+            self.prune()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Type.Wheel, QEvent.Type.MouseButtonPress, QEvent.Type.Enter):
+            self.touch(obj)
+        elif event.type() == QEvent.Type.Hide:
+            self.compress(obj.shared)
+        return False
+
+    def prune(self):
+        """销毁隐藏的贴图窗口（最近操作过的除外，它还可以从托盘重新显示），并归还共享的原图"""
+        for widget in [pin for pin in self.pins if pin is not self.last_pin and not pin.isVisible()]:
+            self.pins.remove(widget)
+            self.last_active.pop(widget, None)
+            widget.removeEventFilter(self)
+            self.store.release(widget.shared)
+            widget.deleteLater()
+
+    def isVisible(self, shared: SharedPixmap):
+        return any(widget.isVisible() for widget in self.pins if widget.shared is shared)
+
+    def compress(self, shared: SharedPixmap, offload=False):
+        """
+        在工作线程中压缩原图，完成后若仍不需要显示则释放
+        offload: 即使仍在显示也释放（长时间未操作或超出内存预算），下次绘制时再解码
+        """
+        if offload:
+            self._offloading.add(shared.key)
+        if shared.isCompressed():
+            self.release(shared)
+            return
+        if shared.key in self._compressing:
+            return
+        self._compressing.add(shared.key)
+        image = shared.pixmap.toImage()
+        Thread(target=lambda: self.compressed_signal.emit(shared, encode_png(image)), daemon=True).start()
+
+    def onCompressed(self, shared: SharedPixmap, png: bytes):
+        self._compressing.discard(shared.key)
+        shared.setCompressed(png)
+        self.release(shared)
+
+    def release(self, shared: SharedPixmap):
+        if shared.key in self._offloading or not self.isVisible(shared):
+            self._offloading.discard(shared.key)
+            shared.offload()
+
+    def trim(self):
+        """
+        销毁隐藏的贴图窗口；长时间未操作的贴图丢弃缩放缓存并压缩释放；
+        解码后的图像超出内存预算时按最久未操作的顺序压缩释放，刚操作过的可见贴图除外，以免反复解码
+        """
+        now = time.monotonic()
+        self.prune()
+        for widget in self.pins:
+            if widget.shared.isResident() and now - self.last_active.get(widget, now) > self.idle_seconds:
+                widget.shared.clearRenditions()
+                self.compress(widget.shared, offload=True)
+        excess = self.store.residentBytes() - self.budget
+        pins = sorted(self.pins, key=lambda pin: (pin.isVisible(), self.last_active.get(pin, now)))
+        for widget in pins:
+            if excess <= 0:
+                break
+            recent = now - self.last_active.get(widget, now) < self.trim_interval / 1000
+            if widget.shared.isResident() and not (widget.isVisible() and recent) and \
+                    widget.shared.key not in self._offloading:
+                excess -= widget.shared.byteSize()  # 压缩在后台完成，这里先按预计释放的大小计算
+                self.compress(widget.shared, offload=True)
@@ -1,15 +1,27 @@
+import logging
 import math
 import os
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 
-from PyQt5.QtCore import QRectF, QRect, QSizeF, QPoint, QMarginsF, QObject, QMimeData, pyqtSignal
-from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QCursor, QRgba64, QTextOption, QPainterPath, QKeySequence
+from threading import Thread
+
+from PyQt5.QtCore import QRectF, QRect, QPoint, QMarginsF, QObject, QMimeData, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QCursor, QTextOption, QPainterPath, QKeySequence, \
+    QStaticText, QTransform, QPolygonF
 from PyQt5.QtWidgets import QWidget, QApplication, QFileDialog
 
-from Functions import TextInputWidget, Circle
+from Functions import TextInputWidget, Circle, VirtualDesktop, CaptureHistory, AnnotationDocument, \
+    EditHistory, AddCommand, ReplaceCommand, RemoveCommand, action_bounds, FrameProfiler, SelectionGeometry, \
+    HANDLE_CURSORS, detect_elements, rect_to_qrectf, write_svg, write_pdf, \
+    is_vector_path, is_vector_painter, encode_png
 from .ToolBar import *
 
+logger = logging.getLogger(__name__)
+
+REDACTION_KINDS = ('mosaic', 'blur', 'fill')  # 打码类编辑行为，任何导出的截图像素中都必须已经应用
+
 
 class ScreenArea(QObject):
     """屏幕区域（提供各种算法的核心类），划分为9个子区域：
@@ -19,29 +31,85 @@ class ScreenArea(QObject):
     其中Center根据start、end两个QPointF确定
     """
 
-    def __init__(self, screenshot_area):
+    def __init__(self, screenshot_area, desktop=None):
         super().__init__()
         self.screenshot_area = screenshot_area
         self._pt_start = QPointF()  # 划定截图区域时鼠标左键按下的位置（topLeft）
         self._pt_end = QPointF()  # 划定截图区域时鼠标左键松开的位置（bottomRight）
+        self._geometry = SelectionGeometry()  # 截图区域的控制点和区域判定
         self._rt_toolbar = QRectF()  # 工具条的矩形
         self._actions = []  # 在截图区域上的所有编辑行为（矩形、椭圆、涂鸦、文本输入等）
+        self._editHistory = EditHistory(self._actions)  # 编辑行为的撤销/重做历史
+        self._takenText = None  # 正在重新编辑的文本 (在 _actions 中的位置, 原编辑行为)
+        self._annotationLayers = {}  # 屏幕序号 -> [图层, 需要重绘的区域]，缓存已保存的编辑行为，只重绘发生变化的区域
+        self._boundsCache = {}  # id(编辑行为) -> (编辑行为, 影响范围)
         self._pt_startEdit = QPointF()  # 在截图区域上绘制矩形、椭圆时鼠标左键按下的位置（topLeft）
         self._pt_endEdit = QPointF()  # 在截图区域上绘制矩形、椭圆时鼠标左键松开的位置（bottomRight）
         self._pointfs = []  # 涂鸦经过的所有点
         self._painter = QPainter()  # 独立于ScreenShotWidget之外的画家类
         self._textOption = QTextOption(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
         self._textOption.setWrapMode(QTextOption.WrapMode.WrapAnywhere)  # 文本在矩形内自动换行
-        self.captureScreen()
+        self._staticTexts = OrderedDict()  # (文本, 字体, 宽度, 颜色) -> 排版好的 QStaticText
+        self._exportPng = None  # 矢量导出时内嵌的截图 (区域, PNG 数据)，修改编辑行为后再次导出无需重新编码
+        self._pixels = None  # 截图的像素访问和区域颜色统计（DesktopPixels），首次使用时创建
+        self._redactor = None  # 打码效果（Redactor），与 _pixels 对应同一张截图
+        if desktop is None:
+            self.captureScreen()
+        else:  # 使用已有的虚拟桌面（如无界面渲染时由图片构造）
+            self.setDesktop(desktop)
 
     def captureScreen(self):
-        """抓取整个屏幕的截图"""
-        # screen = QGuiApplication.primaryScreen()
-        self._screenPixmap = QApplication.primaryScreen().grabWindow(0)
-        self._pixelRatio = self._screenPixmap.devicePixelRatio()  # 设备像素比
-        self._rt_screen = self.screenLogicalRectF()
+        """抓取所有显示器的截图，每个屏幕保留各自的截图和设备像素比"""
+        self.setDesktop(VirtualDesktop.capture())
+
+    def setDesktop(self, desktop):
+        """设置截图所用的虚拟桌面"""
+        self._desktop = desktop
+        self._pixelRatio = self._desktop.pixelRatio()  # 设备像素比（多屏时取最大值）
+        self._exportPng = None
+        self._pixels = None
+        self.invalidateAnnotations()
         self.remakeNightArea()
 
+    def desktop(self):
+        return self._desktop
+
+    def pixels(self):
+        """截图的像素访问（DesktopPixels），每个屏幕的截图只转换一次"""
+        if self._pixels is None:
+            from Functions import DesktopPixels  # 依赖 NumPy，按需导入
+            self._pixels = DesktopPixels(self._desktop)
+        return self._pixels
+
+    def desktopImages(self):
+        """各屏幕截图的 QImage（不做格式转换），可交给工作线程创建 DesktopPixels"""
+        return [buffer.pixmap.toImage() for buffer in self._desktop.buffers]
+
+    def adoptPixels(self, pixels):
+        """采用工作线程中创建好的像素访问，截图已经改变或已有时忽略"""
+        if self._pixels is None and pixels.desktop is self._desktop:
+            self._pixels = pixels
+
+    def invalidatePixels(self):
+        """截图内容被修改（如覆盖了历史截图）后调用"""
+        self._pixels = None
+
+    def redactor(self):
+        """打码效果的计算和缓存（Redactor），截图改变后自动重新创建"""
+        pixels = self.pixels()
+        if self._redactor is None or self._redactor.pixels is not pixels:
+            from Functions import Redactor  # 依赖 NumPy，按需导入
+            self._redactor = Redactor(pixels)
+        return self._redactor
+
+    def pixelColor(self, pointf):
+        """指定位置的像素颜色 (R, G, B)"""
+        return self.pixels().pixel(pointf.x(), pointf.y())
+
+    def regionStats(self, rectf):
+        """指定区域的颜色统计（RegionStats），按区域缓存"""
+        return self.pixels().regionStats(rectf)
+
     def normalizeRectF(self, topLeftPoint, bottomRightPoint):
         """根据起止点生成宽高非负数的QRectF，通常用于bottomRightPoint比topLeftPoint更左更上的情况
         入参可以是QPoint或QPointF"""
@@ -60,46 +128,84 @@ class ScreenArea(QObject):
 
     def physicalRectF(self, rectf):
         """计算划定的截图区域的（缩放倍率1.0的）原始矩形（会变大）
-        rectf：划定的截图区域的矩形。可为QRect或QRectF"""
-        return QRectF(rectf.x() * self._pixelRatio, rectf.y() * self._pixelRatio,
-                      rectf.width() * self._pixelRatio, rectf.height() * self._pixelRatio)
+        rectf：划定的截图区域的矩形。可为QRect或QRectF
+        多屏时使用该区域涉及到的屏幕中最大的设备像素比"""
+        pixelRatio = self._desktop.pixelRatioFor(rectf)
+        return QRectF(rectf.x() * pixelRatio, rectf.y() * pixelRatio,
+                      rectf.width() * pixelRatio, rectf.height() * pixelRatio)
 
     def logicalRectF(self, physicalRectF):
-        """根据原始矩形计算缩放后的矩形（会变小）
-        physicalRectF：缩放倍率1.0的原始矩形。可为QRect或QRectF"""
-        return QRectF(physicalRectF.x() / self._pixelRatio, physicalRectF.y() / self._pixelRatio,
-                      physicalRectF.width() / self._pixelRatio, physicalRectF.height() / self._pixelRatio)
+        """根据原始矩形计算缩放后的矩形（会变小），是 physicalRectF 的逆运算
+        physicalRectF：缩放倍率1.0的原始矩形。可为QRect或QRectF
+        多屏时使用该区域涉及到的屏幕中最大的设备像素比"""
+        pixelRatio = self._desktop.pixelRatioForPhysical(physicalRectF)
+        return QRectF(physicalRectF.x() / pixelRatio, physicalRectF.y() / pixelRatio,
+                      physicalRectF.width() / pixelRatio, physicalRectF.height() / pixelRatio)
 
     def physicalPixmap(self, rectf, editAction=False):
         """根据指定区域获取其原始大小的（缩放倍率1.0的）QPixmap
         rectf：指定区域。可为QRect或QRectF
-        editAction:是否带上编辑结果"""
-        if editAction:
-            canvasPixmap = self.screenPhysicalPixmapCopy()
-            self._painter.begin(canvasPixmap)
-            self.paintEachEditAction(self._painter, textBorder=False)
+        editAction:是否带上编辑结果。不带编辑结果时打码仍然会应用，被遮挡的原始像素不会出现在任何导出的图像中
+        只合成该区域涉及到的屏幕，编辑结果也只绘制在该区域上"""
+        rectf = QRectF(rectf)
+        pixmap = self._desktop.grab(rectf)
+        actions = self.getEditActions() if editAction else self.redactionActions()
+        if actions:
+            self._painter.begin(pixmap)
+            self._painter.translate(-rectf.topLeft())
+            self.paintEachEditAction(self._painter, textBorder=False, actions=actions)
             self._painter.end()
-            return canvasPixmap.copy(self.physicalRectF(rectf).toRect())
-        else:
-            return self._screenPixmap.copy(self.physicalRectF(rectf).toRect())
+        return pixmap
+
+    def redactionActions(self):
+        return [action for action in self.getEditActions() if action[0] in REDACTION_KINDS]
+
+    def exportVector(self, path, rectf=None):
+        """
+        把指定区域（默认截图区域）导出为 SVG 或 PDF：截图作为一张内嵌图片，编辑行为作为矢量图形
+        打码直接应用在内嵌的截图上，而不是作为图形覆盖在原始截图之上
+        """
+        rectf = QRectF(rectf) if rectf is not None else self._rt_center + QMarginsF(-1, -1, 1, 1)
+        redactions = self.redactionActions()
+        annotations = [action for action in self.getEditActions() if action[0] not in REDACTION_KINDS]
+
+        def paint(painter):
+            painter.translate(-rectf.topLeft())
+            self.paintEachEditAction(painter, textBorder=False, actions=annotations)
+
+        if Path(path).suffix.lower() == '.pdf':
+            write_pdf(path, rectf.size(), self.physicalPixmap(rectf), paint)
+            return
+        key = ((rectf.x(), rectf.y(), rectf.width(), rectf.height()), redactions)
+        if self._exportPng is None or self._exportPng[0] != key:
+            self._exportPng = (key, encode_png(self.physicalPixmap(rectf).toImage()))
+        write_svg(path, rectf.size(), self._exportPng[1], paint)
+
+    def paintScreen(self, painter, rectf):
+        """在painter上绘制指定区域内的屏幕截图"""
+        self._desktop.paint(painter, rectf)
+
+    def screenGlobalRect(self):
+        """虚拟桌面的全局逻辑矩形"""
+        return self._desktop.globalGeometry()
 
     def screenPhysicalRectF(self):
-        return QRectF(self._screenPixmap.rect())
+        return self.physicalRectF(self._desktop.rectF())
 
     def screenLogicalRectF(self):
-        return QRectF(QPointF(0, 0), self.screenLogicalSizeF())  # 即当前屏幕显示的大小
+        return self._desktop.rectF()  # 即所有屏幕组成的虚拟桌面的大小
 
     def screenPhysicalSizeF(self):
-        return QSizeF(self._screenPixmap.size())
+        return self.screenPhysicalRectF().size()
 
     def screenLogicalSizeF(self):
-        return QSizeF(self._screenPixmap.width() / self._pixelRatio, self._screenPixmap.height() / self._pixelRatio)
+        return self._desktop.sizeF()
 
     def screenPhysicalPixmapCopy(self):
-        return self._screenPixmap.copy()
+        return self._desktop.grab(self._desktop.rectF())
 
     def screenLogicalPixmapCopy(self):
-        return self._screenPixmap.scaled(self.screenLogicalSizeF().toSize())
+        return self.screenPhysicalPixmapCopy().scaled(self.screenLogicalSizeF().toSize())
 
     def centerPhysicalRectF(self):
         return self.physicalRectF(self._rt_center)
@@ -113,17 +219,9 @@ class ScreenArea(QObject):
         editAction:是否带上编辑结果"""
         return self.physicalPixmap(self._rt_center + QMarginsF(-1, -1, 1, 1), editAction=editAction)
 
-    def centerTopMid(self):
-        return self._pt_centerTopMid
-
-    def centerBottomMid(self):
-        return self._pt_centerBottomMid
-
-    def centerLeftMid(self):
-        return self._pt_centerLeftMid
-
-    def centerRightMid(self):
-        return self._pt_centerRightMid
+    def handlePoints(self):
+        """截图区域四角和四条边中点共 8 个调整大小的控制点"""
+        return self._geometry.handlePoints()
 
     def setStartPoint(self, pointf, remake=False):
         self._pt_start = pointf
@@ -141,41 +239,9 @@ class ScreenArea(QObject):
         self.remakeNightArea()
 
     def remakeNightArea(self):
-        """重新划分九宫格区域。根据中央截图区域计算出来的其他8个区域、截图区域四个边框中点坐标等都是logical的"""
+        """重新划分九宫格区域。中央截图区域以外的区域和控制点都由 SelectionGeometry 按四条边的坐标直接判定，都是logical的"""
         self._rt_center = self.normalizeRectF(self._pt_start, self._pt_end)
-        # 中央区域上下左右边框的中点，用于调整大小
-        self._pt_centerTopMid = (self._rt_center.topLeft() + self._rt_center.topRight()) / 2
-        self._pt_centerBottomMid = (self._rt_center.bottomLeft() + self._rt_center.bottomRight()) / 2
-        self._pt_centerLeftMid = (self._rt_center.topLeft() + self._rt_center.bottomLeft()) / 2
-        self._pt_centerRightMid = (self._rt_center.topRight() + self._rt_center.bottomRight()) / 2
-        # 以截图区域左上、上中、右上、左中、右中、左下、下中、右下为中心的正方形区域，用于调整大小
-        self._square_topLeft = self.squareAreaByCenter(self._rt_center.topLeft())
-        self._square_topRight = self.squareAreaByCenter(self._rt_center.topRight())
-        self._square_bottomLeft = self.squareAreaByCenter(self._rt_center.bottomLeft())
-        self._square_bottomRight = self.squareAreaByCenter(self._rt_center.bottomRight())
-        self._square_topMid = self.squareAreaByCenter(self._pt_centerTopMid)
-        self._square_bottomMid = self.squareAreaByCenter(self._pt_centerBottomMid)
-        self._square_leftMid = self.squareAreaByCenter(self._pt_centerLeftMid)
-        self._square_rightMid = self.squareAreaByCenter(self._pt_centerRightMid)
-        # 除中央截图区域外的8个区域
-        self._rt_topLeft = QRectF(self._rt_screen.topLeft(), self._rt_center.topLeft())
-        self._rt_top = QRectF(QPointF(self._rt_center.topLeft().x(), 0), self._rt_center.topRight())
-        self._rt_topRight = QRectF(QPointF(self._rt_center.topRight().x(), 0),
-                                   QPointF(self._rt_screen.width(), self._rt_center.topRight().y()))
-        self._rt_left = QRectF(QPointF(0, self._rt_center.topLeft().y()), self._rt_center.bottomLeft())
-        self._rt_right = QRectF(self._rt_center.topRight(),
-                                QPointF(self._rt_screen.width(), self._rt_center.bottomRight().y()))
-        self._rt_bottomLeft = QRectF(QPointF(0, self._rt_center.bottomLeft().y()),
-                                     QPointF(self._rt_center.bottomLeft().x(), self._rt_screen.height()))
-        self._rt_bottom = QRectF(self._rt_center.bottomLeft(),
-                                 QPointF(self._rt_center.bottomRight().x(), self._rt_screen.height()))
-        self._rt_bottomRight = QRectF(self._rt_center.bottomRight(), self._rt_screen.bottomRight())
-
-    def squareAreaByCenter(self, pointf):
-        """以QPointF为中心的正方形QRectF"""
-        rectf = QRectF(0, 0, 15, 15)
-        rectf.moveCenter(pointf)
-        return rectf
+        self._geometry.setRect(self._rt_center)
 
     def aroundAreaWithoutIntersection(self):
         """中央区域周边的4个方向的区域（无交集）
@@ -223,61 +289,24 @@ class ScreenArea(QObject):
         self._mousePos = self.getMousePosBy(pointf)
 
     def getMousePosBy(self, pointf):
-        if self._square_topLeft.contains(pointf):
-            return 'TL'
-        elif self._square_topMid.contains(pointf):
-            return 'T'
-        elif self._square_topRight.contains(pointf):
-            return 'TR'
-        elif self._square_leftMid.contains(pointf):
-            return 'L'
-        elif self._rt_center.contains(pointf):
-            return 'CENTER'
-        elif self._square_rightMid.contains(pointf):
-            return 'R'
-        elif self._square_bottomLeft.contains(pointf):
-            return 'BL'
-        elif self._square_bottomMid.contains(pointf):
-            return 'B'
-        elif self._square_bottomRight.contains(pointf):
-            return 'BR'
-        else:
-            return 'ERROR'
+        return self._geometry.regionAt(pointf) or 'ERROR'
 
     def adjustCenterAreaBy(self, pointf):
         """根据开始调整截图区域大小时鼠标左键在哪个区（不可能是中央区域），判断调整大小的意图方向，判定新的开始、结束位置"""
-        startPointF = self._rt_center.topLeft()
-        endPointF = self._rt_center.bottomRight()
-        if self._mousePos == 'TL':
-            startPointF = pointf
-        elif self._mousePos == 'T':
-            startPointF = QPointF(startPointF.x(), pointf.y())
-        elif self._mousePos == 'TR':
-            startPointF = QPointF(startPointF.x(), pointf.y())
-            endPointF = QPointF(pointf.x(), endPointF.y())
-        elif self._mousePos == 'L':
-            startPointF = QPointF(pointf.x(), startPointF.y())
-        elif self._mousePos == 'R':
-            endPointF = QPointF(pointf.x(), endPointF.y())
-        elif self._mousePos == 'BL':
-            startPointF = QPointF(pointf.x(), startPointF.y())
-            endPointF = QPointF(endPointF.x(), pointf.y())
-        elif self._mousePos == 'B':
-            endPointF = QPointF(endPointF.x(), pointf.y())
-        elif self._mousePos == 'BR':
-            endPointF = pointf
-        else:  # 'ERROR'
+        newRectF = self._geometry.adjustedRect(self._mousePos, pointf)
+        if newRectF is None:  # 'ERROR'
             return
-        newRectF = self.normalizeRectF(startPointF, endPointF)
         self.setCenterArea(newRectF.topLeft(), newRectF.bottomRight())
 
     def getMouseShapeBy(self, pointf):
         """根据鼠标位置返回对应的鼠标样式"""
-        if self._rt_center.contains(pointf):
+        region = self._geometry.regionAt(pointf)
+        if region == 'CENTER':
             if (self.screenshot_area.isDrawRectangle
                     or self.screenshot_area.isDrawEllipse
                     or self.screenshot_area.isDrawArrow
-                    or self.screenshot_area.isDrawNumber):
+                    or self.screenshot_area.isDrawNumber
+                    or self.screenshot_area.isDrawRedaction):
                 return Qt.CursorShape.ArrowCursor
             elif self.screenshot_area.isDrawGraffiti:
                 return Qt.CursorShape.PointingHandCursor  # 超链接上的手势
@@ -286,19 +315,10 @@ class ScreenArea(QObject):
             else:
                 return Qt.CursorShape.SizeAllCursor  # 十字有箭头
                 # return Qt.CursorShape.OpenHandCursor  # 打开的手，表示可拖拽
-        elif self._square_topLeft.contains(pointf) or self._square_bottomRight.contains(pointf):
-            return Qt.CursorShape.SizeFDiagCursor  # ↖↘
-        elif self._square_topMid.contains(pointf) or self._square_bottomMid.contains(pointf):
-            return Qt.CursorShape.SizeVerCursor  # ↑↓
-        elif self._square_topRight.contains(pointf) or self._square_bottomLeft.contains(pointf):
-            return Qt.CursorShape.SizeBDiagCursor  # ↙↗
-        elif self._square_leftMid.contains(pointf) or self._square_rightMid.contains(pointf):
-            return Qt.CursorShape.SizeHorCursor  # ←→
-        else:
-            return Qt.CursorShape.CrossCursor  # 十字无箭头
+        return HANDLE_CURSORS.get(region, Qt.CursorShape.CrossCursor)  # 控制点上为调整大小的样式，其余为十字无箭头
 
     def isMousePosInCenterRectF(self, pointf):
-        return self._rt_center.contains(pointf)
+        return self._geometry.contains(pointf.x(), pointf.y())
 
     def paintMagnifyingGlassPixmap(self, pos, glassSize):
         """绘制放大镜内的图像(含纵横十字线)
@@ -319,10 +339,62 @@ class ScreenArea(QObject):
         self._painter.end()
         return glassPixmap
 
-    def paintEachEditAction(self, painter, textBorder=True):
+    def actionBounds(self, action):
+        cached = self._boundsCache.get(id(action))
+        if cached is None or cached[0] is not action:
+            cached = self._boundsCache[id(action)] = (action, action_bounds(action))
+        return cached[1]
+
+    def invalidateAnnotations(self, rectf=None):
+        """标记编辑行为图层中需要重绘的区域，rectf 为空时所有图层重建"""
+        if rectf is None:
+            self._annotationLayers.clear()
+            return
+        for entry in self._annotationLayers.values():
+            entry[1] = entry[1].united(rectf)
+
+    def annotationLayer(self, index):
+        """
+        第 index 个屏幕上所有已保存编辑行为（带文本边框）的缓存图层。
+        每个屏幕单独一层，大小与该屏幕一致并使用它自己的设备像素比，只在选区涉及到该屏幕时才创建
+        """
+        buffer = self._desktop.buffers[index]
+        entry = self._annotationLayers.get(index)
+        if entry is None:
+            layer = QPixmap((buffer.geometry.size() * buffer.pixelRatio).toSize())
+            layer.setDevicePixelRatio(buffer.pixelRatio)
+            layer.fill(Qt.GlobalColor.transparent)
+            entry = self._annotationLayers[index] = [layer, buffer.geometry]  # 新建的图层整个需要绘制
+        dirty = entry[1].intersected(buffer.geometry)
+        if not dirty.isEmpty():
+            self._painter.begin(entry[0])
+            self._painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+            self._painter.translate(-buffer.geometry.topLeft())
+            self._painter.setClipRect(dirty)
+            self._painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+            self._painter.fillRect(dirty, Qt.GlobalColor.transparent)
+            self._painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+            self.paintEachEditAction(self._painter, actions=[
+                action for action in self._actions if self.actionBounds(action).intersects(dirty)])
+            self._painter.end()
+        entry[1] = QRectF()
+        return entry[0]
+
+    def paintAnnotationLayer(self, painter, rectf):
+        """在 painter 上绘制编辑行为图层中 rectf 范围内的部分"""
+        if not self._actions:
+            return
+        rectf = QRectF(rectf)
+        for index, buffer in enumerate(self._desktop.buffers):
+            target = buffer.geometry.intersected(rectf)
+            if not target.isEmpty():
+                painter.drawPixmap(target, self.annotationLayer(index), QRectF(buffer.physicalRect(target)))
+
+    def paintEachEditAction(self, painter, textBorder=True, actions=None):
         """绘制所有已保存的编辑行为。编辑行为超出截图区域也无所谓，保存图像时只截取截图区域内
-        textBorder:是否绘制文本边框"""
-        for action in self.getEditActions():
+        textBorder:是否绘制文本边框
+        actions:只绘制这些编辑行为，默认全部"""
+        for action in (self.getEditActions() if actions is None else actions):
             if action[0] == 'rectangle':  # (type, color, lineWidth, startPoint, endPoint)
                 self.paintRectangle(painter, action[1], action[2], action[3], action[4])
             elif action[0] == 'ellipse':  # (type, color, lineWidth, startPoint, endPoint)
@@ -335,6 +407,8 @@ class ScreenArea(QObject):
                 self.paintNumber(painter, action[1])
             elif action[0] == 'text':  # (type, color, font, rectf, txt)
                 self.paintTextInput(painter, action[1], action[2], action[3], action[4], textBorder=textBorder)
+            elif action[0] in REDACTION_KINDS:  # (type, color, lineWidth, startPoint, endPoint)
+                self.paintRedaction(painter, action[0], action[1], action[2], action[3], action[4])
 
     def paintRectangle(self, painter, color, lineWidth, startPoint=None, endPoint=None):
         if not startPoint:
@@ -403,6 +477,8 @@ class ScreenArea(QObject):
             return
         elif total == 1:
             painter.drawPoint(pointfs[0])
+        elif is_vector_painter(painter):  # 导出 SVG/PDF 时整条涂鸦作为一条折线，文件小得多
+            painter.drawPolyline(QPolygonF(pointfs))
         else:
             previousPoint = pointfs[0]
             for i in range(1, total):
@@ -410,13 +486,42 @@ class ScreenArea(QObject):
                 painter.drawLine(previousPoint, nextPoint)
                 previousPoint = nextPoint
 
+    def paintRedaction(self, painter, mode, color, lineWidth, startPoint=None, endPoint=None):
+        """打码：mode 为 'mosaic'（马赛克）、'blur'（模糊）或 'fill'（纯色填充），效果由截图计算并按图块缓存"""
+        if not startPoint:
+            startPoint = self._pt_startEdit
+        if not endPoint:
+            endPoint = self._pt_endEdit
+        qrectf = self.normalizeRectF(startPoint, endPoint)
+        if qrectf.isValid():
+            self.redactor().paint(painter, mode, color, lineWidth, qrectf)
+
     def paintNumber(self, painter, number):
         number.paint(painter)
 
+    def staticText(self, color, font, width, txt):
+        """已保存文本的排版结果只计算一次，之后每帧及导出时直接复用"""
+        key = (txt, font.toString(), width, QColor(color).rgba())
+        staticText = self._staticTexts.get(key)
+        if staticText is None:
+            # PlainText 模式下 QStaticText 忽略 '\n'，换成行分隔符（QChar::LineSeparator）才能保留多行
+            staticText = QStaticText(txt.replace('\r\n', '\u2028').replace('\n', '\u2028'))
+            staticText.setTextFormat(Qt.TextFormat.PlainText)
+            staticText.setTextOption(self._textOption)
+            staticText.setTextWidth(width)
+            staticText.setPerformanceHint(QStaticText.PerformanceHint.AggressiveCaching)
+            staticText.prepare(QTransform(), font)
+            self._staticTexts[key] = staticText
+            while len(self._staticTexts) > 256:
+                self._staticTexts.popitem(last=False)
+        else:
+            self._staticTexts.move_to_end(key)
+        return staticText
+
     def paintTextInput(self, painter, color, font, rectf, txt, textBorder=True):
         painter.setPen(color)
         painter.setFont(font)
-        painter.drawText(rectf, txt, self._textOption)
+        painter.drawStaticText(rectf.topLeft(), self.staticText(color, font, rectf.width(), txt))
         if textBorder:
             painter.setPen(Qt.PenStyle.DotLine)  # 点线
             painter.setBrush(self.screenshot_area.color_transparent)
@@ -425,27 +530,73 @@ class ScreenArea(QObject):
     def getEditActions(self):
         return self._actions.copy()
 
+    def setEditActions(self, actions):
+        self._actions[:] = actions
+        self._editHistory.clear()
+        self._takenText = None
+        self.invalidateAnnotations()
+
+    def pushEditCommand(self, command):
+        """执行编辑命令并记录到撤销历史中，只重绘受影响的区域"""
+        self._editHistory.push(command)
+        self.invalidateAnnotations(command.bounds())
+        return command
+
     def takeTextInputActionAt(self, pointf):
-        """根据鼠标位置查找已保存的文本输入结果，找到后取出"""
+        """根据鼠标位置查找已保存的文本输入结果，找到后暂时取出，保存时记录为一次替换"""
         for i in range(len(self._actions)):
             action = self._actions[i]
             if action[0] == 'text' and action[3].contains(pointf):
-                return self._actions.pop(i)
+                self._takenText = (i, self._actions.pop(i))
+                self.invalidateAnnotations(self.actionBounds(action))
+                return action
         return None
 
-    def undoEditAction(self):
-        reply = False
+    def restoreTakenTextAction(self):
+        """放回正在重新编辑的文本，返回其原位置"""
+        if self._takenText is None:
+            return None
+        index, action = self._takenText
+        self._takenText = None
+        self._actions.insert(index, action)
+        self.invalidateAnnotations(self.actionBounds(action))
+        return index
+
+    def cancelTextInput(self):
+        """放弃正在输入的文字：正在重新编辑的旧文本放回原位，输入框清空并隐藏"""
+        self.restoreTakenTextAction()
+        textInput = self.screenshot_area.textInputWg
+        if not textInput.isHidden():
+            textInput.clear()
+            textInput.hide()
+            self.screenshot_area.isDrawing = False
 
-        if self._actions:
-            reply = self._actions.pop()
-            if not self._actions:  # 所有编辑行为都被撤销后退出编辑模式
-                self.screenshot_area.exitEditMode()
-        else:
+    def undoEditAction(self):
+        """撤销上次编辑，返回需要重绘的区域（无可撤销的编辑时为 None）。
+        先放弃正在输入的文字，否则撤销后再保存会把输入框中的文字作为新文本重复添加"""
+        self.cancelTextInput()
+        command = self._editHistory.undo()
+        if command is not None:
+            self.invalidateAnnotations(command.bounds())
+        if not self._actions:  # 所有编辑行为都被撤销后退出编辑模式
             self.screenshot_area.exitEditMode()
-        return reply
+        return None if command is None else command.bounds()
+
+    def redoEditAction(self):
+        """重做上次撤销的编辑，返回需要重绘的区域（无可重做的编辑时为 None）"""
+        self.cancelTextInput()
+        command = self._editHistory.redo()
+        if command is None:
+            return None
+        self.invalidateAnnotations(command.bounds())
+        return command.bounds()
 
     def clearEditActions(self):
         self._actions.clear()
+        self._editHistory.clear()
+        self._takenText = None
+        self._boundsCache.clear()
+        self.invalidateAnnotations()
 
     def setBeginEditPoint(self, pointf):
         """在截图区域上绘制矩形、椭圆时鼠标左键按下的位置（topLeft）"""
@@ -457,26 +608,34 @@ class ScreenArea(QObject):
         self._pt_endEdit = pointf
 
     def saveRectangleAction(self):
-        self._actions.append(('rectangle', self.screenshot_area.toolbar.current_color(),
-                              self.screenshot_area.toolbar.current_line_width(),
-                              self._pt_startEdit, self._pt_endEdit))
+        self.pushEditCommand(AddCommand(('rectangle', self.screenshot_area.toolbar.current_color(),
+                                         self.screenshot_area.toolbar.current_line_width(),
+                                         self._pt_startEdit, self._pt_endEdit)))
         self._pt_startEdit = QPointF()
         self._pt_endEdit = QPointF()
         self.screenshot_area.isDrawing = False
 
     def saveArrowAction(self):
-        self._actions.append(('arrow', self.screenshot_area.toolbar.current_color(),
-                              self.screenshot_area.toolbar.current_line_width(),
-                              self._pt_startEdit, self._pt_endEdit))
+        self.pushEditCommand(AddCommand(('arrow', self.screenshot_area.toolbar.current_color(),
+                                         self.screenshot_area.toolbar.current_line_width(),
+                                         self._pt_startEdit, self._pt_endEdit)))
         self._pt_startEdit = QPointF()
         self._pt_endEdit = QPointF()
         self.screenshot_area.isDrawing = False
 
     def saveEllipseAction(self):
-        self._actions.append(('ellipse',
-                              self.screenshot_area.toolbar.current_color(),
-                              self.screenshot_area.toolbar.current_line_width(),
-                              self._pt_startEdit, self._pt_endEdit))
+        self.pushEditCommand(AddCommand(('ellipse',
+                                         self.screenshot_area.toolbar.current_color(),
+                                         self.screenshot_area.toolbar.current_line_width(),
+                                         self._pt_startEdit, self._pt_endEdit)))
+        self._pt_startEdit = QPointF()
+        self._pt_endEdit = QPointF()
+        self.screenshot_area.isDrawing = False
+
+    def saveRedactionAction(self, mode):
+        self.pushEditCommand(AddCommand((mode, self.screenshot_area.toolbar.current_color(),
+                                         self.screenshot_area.toolbar.current_line_width(),
+                                         self._pt_startEdit, self._pt_endEdit)))
         self._pt_startEdit = QPointF()
         self._pt_endEdit = QPointF()
         self.screenshot_area.isDrawing = False
@@ -491,10 +650,10 @@ class ScreenArea(QObject):
 
     def saveGraffitiAction(self):
         if self._pointfs:
-            self._actions.append(('graffiti',
-                                  self.screenshot_area.toolbar.current_color(),
-                                  self.screenshot_area.toolbar.current_line_width(),
-                                  self._pointfs.copy()))
+            self.pushEditCommand(AddCommand(('graffiti',
+                                             self.screenshot_area.toolbar.current_color(),
+                                             self.screenshot_area.toolbar.current_line_width(),
+                                             self._pointfs.copy())))
             self._pointfs.clear()
             self.screenshot_area.isDrawing = False
 
@@ -503,26 +662,40 @@ class ScreenArea(QObject):
         self.screenshot_area.isDrawing = True
         self.screenshot_area.textInputWg.beginNewInput(pointf, self._pt_end)
 
+    def nextCircleNumber(self):
+        """下一个序号：当前截图中已有序号的最大值加一，撤销/重做后自动保持连续"""
+        return max((action[1].number for action in self._actions if action[0] == 'number'), default=0) + 1
+
     def saveNumberAction(self, number):
-        self._actions.append(('number', number))
+        self.pushEditCommand(AddCommand(('number', number)))
         self.screenshot_area.isDrawing = False
 
     def saveTextInputAction(self):
         txt = self.screenshot_area.textInputWg.toPlainText()
+        index = self.restoreTakenTextAction()  # 修改旧文本时记录为替换或删除，而不是新增
         if txt:
-            rectf = self.screenshot_area.textInputWg.max_rect  # 取最大矩形的topLeft
+            rectf = QRectF(self.screenshot_area.textInputWg.max_rect)  # 取最大矩形的topLeft
             rectf.setSize(QRectF(self.screenshot_area.textInputWg.rect()).size())  # 取实际矩形的宽高
-            self._actions.append(('text', self.screenshot_area.toolbar.current_color(),
-                                  self.screenshot_area.toolbar.current_font(), rectf, txt))
+            action = ('text', self.screenshot_area.toolbar.current_color(),
+                      self.screenshot_area.toolbar.current_font(), rectf, txt)
+            if index is None:
+                self.pushEditCommand(AddCommand(action))
+            else:
+                self.pushEditCommand(ReplaceCommand(index, self._actions[index], action))
             self.screenshot_area.textInputWg.clear()
+        elif index is not None:
+            self.pushEditCommand(RemoveCommand(index, self._actions[index]))
         self.screenshot_area.textInputWg.hide()  # 不管保存成功与否都取消编辑
         self.screenshot_area.isDrawing = False
 
 
 class ScreenShotWidget(QWidget):
     send_pixmap_signal = pyqtSignal(QPixmap, QPoint)
+    save_report_signal = pyqtSignal(str)  # 保存结果提示（如跳过重复截图节省的空间）
+    elements_signal = pyqtSignal(int, object, object)  # 工作线程检测完界面元素（截图序号, RectIndex, DesktopPixels）
+    ocr_signal = pyqtSignal(object)  # 工作线程识别完文字（OcrResult，失败时为错误信息）
     fileType_all = '所有文件 (*);;Excel文件 (*.xls *.xlsx);;图片文件 (*.jpg *.jpeg *.gif *.png *.bmp)'
-    fileType_img = '图片文件 (*.jpg *.jpeg *.gif *.png *.bmp)'
+    fileType_img = '图片文件 (*.jpg *.jpeg *.gif *.png *.bmp);;矢量图（可编辑标注） (*.svg *.pdf)'
     dir_lastAccess = os.getcwd()  # 最后访问目录
 
     def __init__(self):
@@ -537,14 +710,128 @@ class ScreenShotWidget(QWidget):
         self.screenArea = ScreenArea(self)
         self.toolbar = ScreenShotToolBar(self)
         self.textInputWg = TextInputWidget(self)
-        self.circles = []
         self.currentCircle = None
+        self.history = CaptureHistory.fromSettings(self.settings)
+        screen = QApplication.primaryScreen()
+        refreshRate = screen.refreshRate() if screen else 60.0
+        self.profiler = FrameProfiler.fromSettings(self.settings, refreshRate)
+        self.pendingMovePos = None  # 尚未处理的鼠标移动位置
+        self.moveTimer = QTimer(self)  # 每个刷新周期最多处理一次鼠标移动
+        self.moveTimer.setSingleShot(True)
+        self.moveTimer.setInterval(max(1, int(1000 / (refreshRate or 60.0))))
+        self.moveTimer.timeout.connect(self.onMoveTimer)
+        self.isSmartSelect = self.settings.get('GeneralSettings', 'is_smart_select', fallback='True') == 'True'
+        self.elementIndex = None  # 当前截图中检测到的界面元素矩形索引
+        self.elementGeneration = 0  # 每次截图递增，丢弃过期的检测结果
+        self.hoverElement = None  # 鼠标悬停处最内层的界面元素矩形
+        self.elements_signal.connect(self.onElementsDetected)
+        self.pickedColor = None  # 按取色键记下的颜色，放大镜中显示它与光标处颜色的对比度
+        self.recognizer = None  # 文字识别流水线，首次识别时创建，之后复用其进程池和结果缓存
+        self.reopened = None  # 重新打开的历史截图 (截图区域, 恢复的编辑行为)，未修改时保存不再记录一次
+        self.ocr_signal.connect(self.onTextRecognized)
 
     def start(self):
         self.screenArea.captureScreen()
-        self.setGeometry(self.screenArea.screenPhysicalRectF().toRect())
+        self.setGeometry(self.screenArea.screenGlobalRect())  # 覆盖所有显示器组成的虚拟桌面
+        self.clearScreenShotArea()
+        self.profiler.reset()
+        self.pickedColor = None
+        self.reopened = None
+        self.show()
+        self.detectElements()  # 先显示截图窗口，像素格式转换和检测都在工作线程中进行
+
+    def detectElements(self):
+        """智能选区：在后台线程中检测截图中的窗口和界面元素，完成后鼠标悬停即可高亮"""
+        self.elementGeneration += 1
+        self.elementIndex = None
+        self.hoverElement = None
+        if not self.isSmartSelect:
+            return
+        desktop = self.screenArea.desktop()
+        images = self.screenArea.desktopImages()  # QPixmap 只能在主线程中使用，这里只取出 QImage，不做转换
+        Thread(target=self.runElementDetection, args=(self.elementGeneration, desktop, images), daemon=True).start()
+
+    def runElementDetection(self, generation, desktop, images):
+        try:
+            from Functions import DesktopPixels  # 依赖 NumPy，在工作线程中导入
+            pixels = DesktopPixels(desktop, images=images)
+            index = detect_elements(desktop, pixels.images)
+        except Exception as e:  # 例如未安装 OpenCV，此时不启用智能选区
+            logger.warning('界面元素检测失败：%s', e)
+            return
+        self.elements_signal.emit(generation, index, pixels)
+
+    def onElementsDetected(self, generation, index, pixels):
+        if generation != self.elementGeneration:  # 已经开始了新的截图
+            return
+        self.screenArea.adoptPixels(pixels)  # 与放大镜、打码共用已转换的截图
+        self.elementIndex = index
+        if self.isVisible():
+            self.updateHoverElement(self.mapFromGlobal(QCursor.pos()))
+
+    def updateHoverElement(self, pos):
+        """更新鼠标悬停处的界面元素，只在尚未划定截图区域时高亮"""
+        rect = None
+        if self.elementIndex is not None and not self.hasScreenShot and not self.isCapturing:
+            rect = self.elementIndex.innermost(pos.x(), pos.y())
+        hoverElement = rect_to_qrectf(rect) if rect is not None else None
+        if hoverElement != self.hoverElement:
+            self.hoverElement = hoverElement
+            self.update()
+
+    def reopenCapture(self, captureId):
+        """重新打开历史截图，恢复截图区域和编辑行为以便继续标注"""
+        image, record = self.history.load(captureId)
+        self.screenArea.captureScreen()
+        desktop = self.screenArea.desktop()
+        rectf = record.rectF().translated(-QPointF(desktop.origin))
+        desktop.paste(rectf, QPixmap.fromImage(image))  # 在原位置覆盖历史截图
+        self.screenArea.invalidatePixels()
+        self.setGeometry(self.screenArea.screenGlobalRect())
         self.clearScreenShotArea()
-        self.showFullScreen()
+        self.screenArea.setCenterArea(rectf.topLeft(), rectf.bottomRight())
+        self.screenArea.setEditActions(self.history.annotations(captureId).toActions(rectf.topLeft()))
+        self.reopened = (rectf, self.screenArea.getEditActions())
+        self.hasScreenShot = True
+        self.profiler.reset()
+        self.show()
+
+    def recordHistory(self):
+        """
+        把当前截图区域（只应用打码，不含其他编辑结果）及编辑行为保存到截图历史，压缩和写入在后台线程进行
+        只在复制、保存和钉图时调用，取消的截图不记录；重新打开的历史截图未修改时也不重复记录
+        打码遮挡的原始像素不会写入磁盘
+        """
+        if self.settings.get('HistorySettings', 'is_save_history', fallback='True') != 'True':
+            return
+        centerRectF = self.screenArea.centerLogicalRectF()
+        if not self.hasScreenShot or centerRectF.isEmpty():
+            return
+        if self.reopened is not None:
+            rectf, actions = self.reopened
+            current = self.screenArea.getEditActions()
+            if rectf == centerRectF and len(current) == len(actions) and \
+                    all(action is old for action, old in zip(current, actions)):  # 编辑行为修改后都是新的元组
+                return
+        image = self.screenArea.physicalPixmap(centerRectF).toImage()
+        if image.isNull():
+            return
+        annotations = AnnotationDocument(self.screenArea.getEditActions(), centerRectF, image.devicePixelRatio())
+        buffers = self.screenArea.desktop().buffersIntersecting(centerRectF)
+        screen = buffers[0].name if buffers else ''
+        globalRectF = centerRectF.translated(QPointF(self.screenArea.desktop().origin))
+        Thread(target=self.history.add, args=(image, globalRectF, annotations, screen), daemon=True).start()
+
+    def hideEvent(self, event):
+        if self.isDrawing and self.isDrawText:  # 若正在编辑文本未保存，先完成编辑
+            self.screenArea.saveTextInputAction()
+        self.moveTimer.stop()
+        self.pendingMovePos = None
+        self.elementGeneration += 1  # 丢弃尚未完成的界面元素检测
+        self.elementIndex = None
+        self.hoverElement = None
+        self.profiler.exportTrace()
+        super().hideEvent(event)
 
     def initPainterTool(self):
         self.painter = QPainter()
@@ -575,6 +862,7 @@ class ScreenShotWidget(QWidget):
         self.isDrawGraffiti = False  # 正在截图区域内进行涂鸦
         self.isDrawNumber = False  # 正在截图区域内绘制序号
         self.isDrawText = False  # 正在截图区域内画文字
+        self.isDrawRedaction = False  # 正在截图区域内打码，方式见 toolbar.current_redaction_mode()
         self.setCursor(Qt.CursorShape.CrossCursor)  # 设置鼠标样式 十字
 
     def initShortKeys(self):
@@ -582,26 +870,35 @@ class ScreenShotWidget(QWidget):
         self.copy_key = QKeySequence(self.settings.get('ShortKeySettings', 'copy'))
         self.save_key = QKeySequence(self.settings.get('ShortKeySettings', 'save'))
         self.undo_key = QKeySequence(self.settings.get('ShortKeySettings', 'undo'))
+        self.redo_key = QKeySequence(self.settings.get('ShortKeySettings', 'redo', fallback='ctrl+y'))
+        self.pick_key = QKeySequence(self.settings.get('ShortKeySettings', 'pick_color', fallback='p'))
 
     def paintEvent(self, event):
         centerRectF = self.screenArea.centerLogicalRectF()
         screenSizeF = self.screenArea.screenLogicalSizeF()
-        canvasPixmap = self.screenArea.screenPhysicalPixmapCopy()
-        # 在屏幕截图的副本上绘制已选定的截图区域
-        self.painter.begin(canvasPixmap)
-        if self.hasScreenShot:
-            self.paintCenterArea(centerRectF)  # 绘制中央截图区域
-            self.paintMaskLayer(screenSizeF, fullScreen=False)  # 绘制截图区域的周边区域遮罩层
-        else:
-            self.paintMaskLayer(screenSizeF)
-        self.paintMagnifyingGlass(screenSizeF)  # 在鼠标光标右下角显示放大镜
-        self.paintToolbar(centerRectF, screenSizeF)  # 在截图区域右下角显示工具条
-        self.paintEditActions()  # 在截图区域绘制编辑行为结果
-        self.painter.end()
-        # 把画好的绘制结果显示到窗口上
+        profiler = self.profiler
+        profiler.beginFrame()
         self.painter.begin(self)
-        self.painter.drawPixmap(0, 0, canvasPixmap)  # 从坐标(0, 0)开始绘制
-        self.painter.end()
+        # 只绘制需要重绘的区域所涉及的屏幕截图，再在其上绘制已选定的截图区域
+        with profiler.phase('copy'):
+            self.screenArea.paintScreen(self.painter, QRectF(event.rect()))
+        with profiler.phase('mask'):
+            if self.hasScreenShot:
+                self.paintCenterArea(centerRectF)  # 绘制中央截图区域
+                self.paintMaskLayer(screenSizeF, fullScreen=False)  # 绘制截图区域的周边区域遮罩层
+            else:
+                self.paintMaskLayer(screenSizeF)
+                self.paintHoverElement()  # 智能选区：高亮鼠标悬停处的界面元素
+        with profiler.phase('magnifier'):
+            self.paintMagnifyingGlass(screenSizeF)  # 在鼠标光标右下角显示放大镜
+        with profiler.phase('toolbar'):
+            self.paintToolbar(centerRectF, screenSizeF)  # 在截图区域右下角显示工具条
+        with profiler.phase('edits'):
+            self.paintEditActions(QRectF(event.rect()))  # 在截图区域绘制编辑行为结果
+        profiler.paintHud(self.painter, QPointF(10, 10))  # 启用帧耗时分析时显示统计浮层
+        with profiler.phase('blit'):
+            self.painter.end()
+        profiler.endFrame()
 
     def paintCenterArea(self, centerRectF):
         """绘制已选定的截图区域"""
@@ -611,11 +908,7 @@ class ScreenShotWidget(QWidget):
         self.painter.drawRect(centerRectF)
         # 2.绘制矩形线框4个端点和4条边框的中间点
         if centerRectF.width() >= 100 and centerRectF.height() >= 100:
-            points = [  # 点坐标
-                centerRectF.topLeft(), centerRectF.topRight(), centerRectF.bottomLeft(), centerRectF.bottomRight(),
-                self.screenArea.centerLeftMid(), self.screenArea.centerRightMid(),
-                self.screenArea.centerTopMid(), self.screenArea.centerBottomMid()
-            ]
+            points = self.screenArea.handlePoints()  # 点坐标
             blueDotRadius = QPointF(3, 3)  # 椭圆蓝点
             self.painter.setBrush(self.color_lightBlue)
             for point in points:
@@ -632,6 +925,14 @@ class ScreenShotWidget(QWidget):
         # 4.在屏幕左上角预览截图结果
         # self.painter.drawPixmap(0, 0, self.screenArea.centerPhysicalPixmap())  # 从坐标(0, 0)开始绘制
 
+    def paintHoverElement(self):
+        if self.hoverElement is None or self.isCapturing:
+            return
+        self.screenArea.paintScreen(self.painter, self.hoverElement)  # 去掉该区域上的遮罩
+        self.painter.setPen(self.pen_border_line)
+        self.painter.setBrush(Qt.BrushStyle.NoBrush)
+        self.painter.drawRect(self.hoverElement)
+
     def paintMaskLayer(self, screenSizeF, fullScreen=True):
         if fullScreen:  # 全屏遮罩层
             maskPixmap = QPixmap(screenSizeF.toSize())
@@ -648,12 +949,30 @@ class ScreenShotWidget(QWidget):
         在没有截图区域模式、正在截取区域或调整截取区域大小时，在鼠标光标右下角显示放大镜
         glassSize: 放大镜正方形边长
         offset: 放大镜端点距离鼠标光标位置的最近距离
-        labelHeight: pos 和 rgb 两行文字的高度
+        labelHeight: 坐标、RGB、HEX 三行文字的标签高度，显示对比度和区域颜色统计时相应增高
         """
         if self.hasScreenShot and (not self.isCapturing) and (not self.isAdjusting):
             return
-        # 获取光标位置
-        pos = QCursor.pos()
+        from Functions import contrast_ratio, rgb_to_hex  # 依赖 NumPy，按需导入
+        # 获取光标位置（相对于虚拟桌面）
+        globalPos = QCursor.pos()
+        pos = self.mapFromGlobal(globalPos)
+        # 直接从截图内存中读取光标处像素的 RGB 值
+        self.color_rgb8 = self.screenArea.pixelColor(pos) or (0, 0, 0)
+        self.color_hex = rgb_to_hex(self.color_rgb8)
+        self.cur_pos = (globalPos.x(), globalPos.y())
+        lines = [f'坐标：({", ".join(str(i) for i in self.cur_pos)})',
+                 f'RGB：{", ".join(str(i) for i in self.color_rgb8)}',
+                 f'HEX：{self.color_hex}']
+        if self.pickedColor is not None:
+            lines.append(f'对比度：{contrast_ratio(self.pickedColor, self.color_rgb8):.2f}:1'
+                         f'（取色 {rgb_to_hex(self.pickedColor)}）')
+        stats = self.regionStats()
+        if stats is not None:
+            lines.append(f'区域均值：{stats.meanHex()} 中位：{rgb_to_hex(stats.median)}')
+        lineHeight = 20  # 每多一行文字或一行主色/直方图，标签增高 lineHeight
+        statsHeight = lineHeight if stats is not None else 0
+        labelHeight += lineHeight * (len(lines) - 3) + statsHeight
         # 绘制放大镜内部的 QPixmap，包含纵横十字线
         glassPixmap = self.screenArea.paintMagnifyingGlassPixmap(pos, glassSize)
         # 限制放大镜显示在屏幕范围内
@@ -671,11 +990,6 @@ class ScreenShotWidget(QWidget):
         # 绘制放大镜
         self.painter.drawPixmap(glassRect.topLeft(), glassPixmap)
 
-        # 获取放大镜内中心像素的 RGB 值
-        rgb_obj = QRgba64.fromArgb32(glassPixmap.toImage().pixel(glassPixmap.rect().center()))
-        self.color_rgb8 = (rgb_obj.red8(), rgb_obj.green8(), rgb_obj.blue8())
-        self.color_hex = "#{:02X}{:02X}{:02X}".format(*self.color_rgb8)
-        self.cur_pos = (pos.x(), pos.y())
         # 绘制放大镜底部标签
         labelRectF = QRectF(glassRect.bottomLeft().x(), glassRect.bottomLeft().y() - 10, glassSize, labelHeight)
         self.painter.setPen(QPen(Qt.NoPen))
@@ -683,13 +997,41 @@ class ScreenShotWidget(QWidget):
         self.painter.drawRoundedRect(labelRectF, 12, 12)  # 使用圆角矩形
         self.painter.setPen(QColor(255, 255, 255))
         self.painter.setFont(self.font_normal)
-        self.painter.drawText(
-            labelRectF.adjusted(12, 6, -5, -5),
-            Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
-            f'坐标：({", ".join(str(i) for i in self.cur_pos)})\n'
-            f'RGB：{", ".join(str(i) for i in self.color_rgb8)}\n'
-            f'HEX：{self.color_hex}'
-        )
+        textRectF = labelRectF.adjusted(12, 6, -5, -5 - statsHeight)
+        self.painter.drawText(textRectF, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, '\n'.join(lines))
+        if stats is not None:
+            statsRectF = QRectF(textRectF.left(), textRectF.bottom(), textRectF.width(), statsHeight - 4)
+            self.paintRegionStats(stats, statsRectF)
+
+    def regionStats(self):
+        """放大镜中显示颜色统计的区域：正在划定或调整的截图区域，否则为鼠标悬停处的界面元素"""
+        if self.hasScreenShot:
+            rectf = self.screenArea.centerLogicalRectF()
+        else:
+            rectf = self.hoverElement
+        if rectf is None or rectf.width() < 1 or rectf.height() < 1:
+            return None
+        return self.screenArea.regionStats(rectf)
+
+    def paintRegionStats(self, stats, rectf):
+        """在放大镜标签底部绘制区域的主色色块和亮度直方图"""
+        swatch = rectf.height()
+        x = rectf.left()
+        self.painter.setPen(self.pen_white)
+        for rgb, _ in stats.dominant:
+            self.painter.setBrush(QColor(*rgb))
+            self.painter.drawRect(QRectF(x, rectf.top(), swatch, swatch))
+            x += swatch + 4
+        histogram = stats.luminance.reshape(-1, 8).sum(axis=1)  # 合并为 32 个区间
+        histRectF = QRectF(x + 4, rectf.top(), rectf.right() - x - 4, swatch)
+        peak = max(int(histogram.max()), 1)
+        barWidth = histRectF.width() / len(histogram)
+        self.painter.setPen(QPen(Qt.NoPen))
+        self.painter.setBrush(QColor(255, 255, 255, 200))
+        for i, count in enumerate(histogram):
+            barHeight = swatch * int(count) / peak
+            self.painter.drawRect(QRectF(histRectF.left() + i * barWidth, histRectF.bottom() - barHeight,
+                                         barWidth, barHeight))
 
     def paintToolbar(self, centerRectF, screenSizeF):
         """在截图区域右下角显示工具条"""
@@ -716,8 +1058,9 @@ class ScreenShotWidget(QWidget):
         else:
             self.toolbar.hide()
 
-    def paintEditActions(self):
-        """在截图区域绘制编辑行为结果。编辑行为超出截图区域也无所谓，保存图像时只截取截图区域内"""
+    def paintEditActions(self, rectf):
+        """在截图区域绘制编辑行为结果。编辑行为超出截图区域也无所谓，保存图像时只截取截图区域内
+        rectf:需要重绘的区域"""
         # 1.绘制正在拖拽编辑中的矩形、椭圆、涂鸦
         if self.isDrawRectangle:
             self.screenArea.paintRectangle(self.painter, self.toolbar.current_color(),
@@ -728,8 +1071,11 @@ class ScreenShotWidget(QWidget):
             self.screenArea.paintEllipse(self.painter, self.toolbar.current_color(), self.toolbar.current_line_width())
         elif self.isDrawGraffiti:
             self.screenArea.paintGraffiti(self.painter, self.toolbar.current_color(), self.toolbar.current_line_width())
-        # 2.绘制所有已保存的编辑行为
-        self.screenArea.paintEachEditAction(self.painter)
+        elif self.isDrawRedaction:
+            self.screenArea.paintRedaction(self.painter, self.toolbar.current_redaction_mode(),
+                                           self.toolbar.current_color(), self.toolbar.current_line_width())
+        # 2.绘制所有已保存的编辑行为（来自缓存图层）
+        self.screenArea.paintAnnotationLayer(self.painter, rectf)
 
     def clearEditFlags(self):
         self.isDrawing = False
@@ -739,7 +1085,7 @@ class ScreenShotWidget(QWidget):
         self.isDrawGraffiti = False
         self.isDrawNumber = False
         self.isDrawText = False
-        Circle.destroyAll()
+        self.isDrawRedaction = False
 
     def exitEditMode(self):
         """退出编辑模式"""
@@ -759,10 +1105,11 @@ class ScreenShotWidget(QWidget):
         self.setCursor(Qt.CursorShape.CrossCursor)  # 设置鼠标样式 十字
 
     def mousePressEvent(self, event):
+        self.flushMouseMove()
         if event.button() == Qt.MouseButton.LeftButton:  # 左键触发
             pos = event.pos()
             if self.hasScreenShot:
-                if self.isDrawRectangle or self.isDrawEllipse or self.isDrawArrow:
+                if self.isDrawRectangle or self.isDrawEllipse or self.isDrawArrow or self.isDrawRedaction:
                     self.screenArea.setBeginEditPoint(pos)
                 elif self.isDrawGraffiti:  # 保存涂鸦经过的每一个点
                     self.screenArea.saveGraffitiPointF(pos, first=True)
@@ -770,7 +1117,8 @@ class ScreenShotWidget(QWidget):
                     self.currentCircle = Circle(event.pos(),
                                                 self.toolbar.current_color(),
                                                 self.toolbar.current_line_width(),
-                                                self.toolbar.current_line_width() * 5)
+                                                self.toolbar.current_line_width() * 5,
+                                                self.screenArea.nextCircleNumber())
                 elif self.isDrawText:
                     if self.isDrawing:
                         if QRectF(self.textInputWg.rect()).contains(pos):
@@ -799,6 +1147,7 @@ class ScreenShotWidget(QWidget):
                 self.hide()
 
     def mouseReleaseEvent(self, event):
+        self.flushMouseMove()
         if event.button() == Qt.MouseButton.LeftButton:
             if self.isDrawRectangle:
                 self.screenArea.saveRectangleAction()
@@ -810,6 +1159,14 @@ class ScreenShotWidget(QWidget):
                 self.screenArea.saveGraffitiAction()
             elif self.isDrawNumber:
                 self.screenArea.saveNumberAction(self.currentCircle)
+            elif self.isDrawRedaction:
+                self.screenArea.saveRedactionAction(self.toolbar.current_redaction_mode())
+            elif self.isCapturing and not self.hasScreenShot and self.hoverElement is not None:
+                # 没有拖动时单击即选中悬停处的界面元素
+                self.screenArea.setCenterArea(self.hoverElement.topLeft(), self.hoverElement.bottomRight())
+                self.hasScreenShot = True
+                self.hoverElement = None
+                self.update()
 
             self.isCapturing = False
             self.isMoving = False
@@ -817,12 +1174,35 @@ class ScreenShotWidget(QWidget):
             self.toolbar.show()
 
     def mouseMoveEvent(self, event):
+        """
+        移动事件按显示器刷新率合并处理：高回报率鼠标每秒上千次的移动事件中，一帧内只处理最后一个位置，
+        涂鸦仍然记录每一个点以保证笔迹精度
+        """
+        self.profiler.markEvent('mouseMove')
         pos = event.pos()
+        if self.isDrawing and self.isDrawGraffiti:
+            self.screenArea.saveGraffitiPointF(pos)
+        if self.moveTimer.isActive():  # 本帧已处理过移动事件，等定时器到期时再处理最新位置
+            self.pendingMovePos = pos
+        else:
+            self.handleMouseMove(pos)
+            self.moveTimer.start()
+
+    def onMoveTimer(self):
+        if self.pendingMovePos is not None:
+            self.handleMouseMove(self.pendingMovePos)
+            self.moveTimer.start()
+
+    def flushMouseMove(self):
+        """立即处理尚未处理的移动事件，在按下、松开鼠标前调用，保证状态与最后的鼠标位置一致"""
+        if self.pendingMovePos is not None:
+            self.handleMouseMove(self.pendingMovePos)
+
+    def handleMouseMove(self, pos):
+        self.pendingMovePos = None
         if self.isDrawing:
-            if self.isDrawRectangle or self.isDrawEllipse or self.isDrawArrow:
+            if self.isDrawRectangle or self.isDrawEllipse or self.isDrawArrow or self.isDrawRedaction:
                 self.screenArea.setEndEditPoint(pos)
-            elif self.isDrawGraffiti:
-                self.screenArea.saveGraffitiPointF(pos)
         elif self.isCapturing:
             self.hasScreenShot = True
             self.screenArea.setEndPoint(pos, remake=True)
@@ -830,11 +1210,18 @@ class ScreenShotWidget(QWidget):
             self.screenArea.moveCenterAreaTo(pos)
         elif self.isAdjusting:
             self.screenArea.adjustCenterAreaBy(pos)
+        else:
+            self.updateHoverElement(pos)
         self.update()
         if self.hasScreenShot:
-            self.setCursor(self.screenArea.getMouseShapeBy(pos))
+            self.updateCursor(self.screenArea.getMouseShapeBy(pos))
         else:
-            self.setCursor(Qt.CursorShape.CrossCursor)  # 设置鼠标样式 十字
+            self.updateCursor(Qt.CursorShape.CrossCursor)  # 设置鼠标样式 十字
+
+    def updateCursor(self, shape):
+        """鼠标样式改变时才调用 setCursor"""
+        if self.cursor().shape() != shape:
+            self.setCursor(shape)
 
     def mouseDoubleClickEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -852,6 +1239,11 @@ class ScreenShotWidget(QWidget):
             self.save2Local()
         if QKeySequence.matches(self.undo_key, event.modifiers() | event.key()):
             self.toolbar.undo()
+        if QKeySequence.matches(self.redo_key, event.modifiers() | event.key()):
+            self.toolbar.redo()
+        if QKeySequence.matches(self.pick_key, event.modifiers() | event.key()):
+            self.pickedColor = self.screenArea.pixelColor(self.mapFromGlobal(QCursor.pos()))
+            self.update()
 
     def save2Clipboard(self):
         """将截图区域复制到剪贴板"""
@@ -859,10 +1251,17 @@ class ScreenShotWidget(QWidget):
         if self.hasScreenShot:
             mimData.setImageData(self.screenArea.centerPhysicalPixmap().toImage())
             QApplication.clipboard().setMimeData(mimData)
+            self.recordHistory()
         else:
-            mimData.setText(f'坐标：({", ".join(str(i) for i in self.cur_pos)})\n'
-                            f'RGB：{", ".join(str(i) for i in self.color_rgb8)}\n'
-                            f'HEX：{self.color_hex}')
+            text = (f'坐标：({", ".join(str(i) for i in self.cur_pos)})\n'
+                    f'RGB：{", ".join(str(i) for i in self.color_rgb8)}\n'
+                    f'HEX：{self.color_hex}')
+            stats = self.regionStats()
+            if stats is not None:
+                from Functions import rgb_to_hex
+                text += (f'\n区域均值：{stats.meanHex()}\n区域中位数：{rgb_to_hex(stats.median)}\n'
+                         f'主色：{", ".join(f"{rgb_to_hex(rgb)} ({share:.0%})" for rgb, share in stats.dominant)}')
+            mimData.setText(text)
             QApplication.clipboard().setMimeData(mimData)
         self.hide()
 
@@ -876,13 +1275,64 @@ class ScreenShotWidget(QWidget):
             filePath = str(fileFolder / fileName)
         else:
             filePath, fileFormat = self.sys_selectSaveFilePath(self, fileType=fileType)
-        if filePath:
+        if filePath and is_vector_path(filePath):  # 截图内嵌为图片，编辑行为保存为矢量图形
+            self.screenArea.exportVector(filePath)
+            self.recordHistory()
+            self.hide()
+        elif filePath:
             quality = int(self.settings.get('GeneralSettings', 'picture_quality'))
-            self.screenArea.centerPhysicalPixmap().save(filePath, quality=quality)
+            pixmap = self.screenArea.centerPhysicalPixmap()
+            if self.settings.get('SaveSettings', 'is_dedup_save', fallback='False') == 'True':
+                from Functions import dedup_save, qimage_to_rgb
+                filePath, linked, savedBytes = dedup_save(filePath, qimage_to_rgb(pixmap.toImage()),
+                                                          lambda path: pixmap.save(path, quality=quality))
+                if linked is not None:
+                    self.save_report_signal.emit(f'{filePath.name} 与已有截图 {linked.name} 相同，已保存为硬链接，'
+                                                 f'节省 {savedBytes / 1024:.1f} KB')
+            else:
+                pixmap.save(filePath, quality=quality)
+            self.recordHistory()
             self.hide()
 
+    def recognizeText(self):
+        """识别截图区域（不含编辑结果）中的文字，在后台线程中完成后复制到剪贴板"""
+        if not self.hasScreenShot:
+            return
+        image = self.screenArea.centerPhysicalPixmap(editAction=False).toImage()
+        self.hide()
+        if image.isNull():
+            return
+        from Functions import TextRecognizer, qimage_to_gray
+        if self.recognizer is None:
+            try:
+                self.recognizer = TextRecognizer.fromSettings(self.settings)
+            except Exception as e:  # 例如配置了未注册的识别引擎
+                self.save_report_signal.emit(f'文字识别失败：{e}')
+                return
+        Thread(target=self.runTextRecognition, args=(self.recognizer, qimage_to_gray(image)), daemon=True).start()
+
+    def runTextRecognition(self, recognizer, gray):
+        try:
+            result = recognizer.recognize(gray)
+        except Exception as e:  # 例如未安装 Tesseract
+            logger.warning('文字识别失败：%s', e)
+            self.ocr_signal.emit(f'文字识别失败：{e}')
+            return
+        self.ocr_signal.emit(result)
+
+    def onTextRecognized(self, result):
+        if isinstance(result, str):
+            self.save_report_signal.emit(result)
+        elif result.text:
+            QApplication.clipboard().setText(result.text)
+            self.save_report_signal.emit(f'已识别 {len(result.lines)} 行文字并复制到剪贴板')
+        else:
+            self.save_report_signal.emit('未识别到文字')
+
     def pinned_to_top(self):
-        self.send_pixmap_signal.emit(self.screenArea.centerPhysicalPixmap(), self.screenArea._pt_start)
+        topLeft = self.mapToGlobal(self.screenArea.centerLogicalRectF().topLeft().toPoint())
+        self.send_pixmap_signal.emit(self.screenArea.centerPhysicalPixmap(), topLeft)
+        self.recordHistory()
         self.hide()
 
     def sys_getCurTime(self, fmt='%Y-%m-%d %H:%M:%S'):
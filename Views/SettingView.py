@@ -143,7 +143,10 @@ class SettingWindow(BaseWidget):
         self.copy_key = ShortcutWidget()
         self.save_key = ShortcutWidget()
         self.undo_key = ShortcutWidget()
-        self.short_keys = [self.screenshot_key, self.cancel_key, self.copy_key, self.save_key, self.undo_key]
+        self.redo_key = ShortcutWidget()
+        self.pick_key = ShortcutWidget()
+        self.short_keys = [self.screenshot_key, self.cancel_key, self.copy_key, self.save_key, self.undo_key,
+                           self.redo_key, self.pick_key]
         self.dragging_threshold = 5  # 鼠标拖动的阈值
         self.setupUI()
         self.loadConfig()
@@ -177,6 +180,9 @@ class SettingWindow(BaseWidget):
         self.startup_checkbox = QCheckBox("开机自启动")
         self.startup_checkbox.setObjectName("startupCheckbox")
         general_layout.addWidget(self.startup_checkbox)
+        self.smart_select_checkbox = QCheckBox("智能选区（悬停时高亮窗口和界面元素，单击即可选中）")
+        self.smart_select_checkbox.setObjectName("smartSelectCheckbox")
+        general_layout.addWidget(self.smart_select_checkbox)
         self.quality_spinbox.setObjectName("qualitySpinbox")
         general_layout.addWidget(QLabel("截图保存质量："))
         general_layout.addWidget(self.quality_spinbox)
@@ -201,6 +207,8 @@ class SettingWindow(BaseWidget):
         self.select_name_layout.addWidget(QLabel("默认保存名字："))
         self.select_name_layout.addWidget(self.save_name_edit)
         save_layout.addLayout(self.select_name_layout)
+        self.dedup_save = QCheckBox("跳过重复截图（目录中已有相同的截图时保存为硬链接）")
+        save_layout.addWidget(self.dedup_save)
         self.tab_widget.addTab(self.save_widget, "保存选项")
 
     def setupAnnotation(self):
@@ -248,11 +256,19 @@ class SettingWindow(BaseWidget):
         undo_key_layout = QHBoxLayout()
         undo_key_layout.addWidget(QLabel("撤销截图"))
         undo_key_layout.addWidget(self.undo_key)
+        redo_key_layout = QHBoxLayout()
+        redo_key_layout.addWidget(QLabel("重做截图"))
+        redo_key_layout.addWidget(self.redo_key)
+        pick_key_layout = QHBoxLayout()
+        pick_key_layout.addWidget(QLabel("取色对比"))
+        pick_key_layout.addWidget(self.pick_key)
         shortcut_layout.addLayout(screenshot_key_layout)
         shortcut_layout.addLayout(cancel_key_layout)
         shortcut_layout.addLayout(copy_key_layout)
         shortcut_layout.addLayout(save_key_layout)
         shortcut_layout.addLayout(undo_key_layout)
+        shortcut_layout.addLayout(redo_key_layout)
+        shortcut_layout.addLayout(pick_key_layout)
         self.tab_widget.addTab(self.shortcut_widget, "热键设置")
 
     def initEvents(self):
@@ -287,9 +303,12 @@ class SettingWindow(BaseWidget):
         self.auto_update_checkbox.setChecked(self.settings.get('GeneralSettings', 'check_automatic_update') == 'True')
         self.startup_checkbox.setChecked(self.settings.get('GeneralSettings', 'is_startup') == 'True')
         self.quality_spinbox.setValue(int(self.settings.get('GeneralSettings', 'picture_quality')))
+        self.smart_select_checkbox.setChecked(
+            self.settings.get('GeneralSettings', 'is_smart_select', fallback='True') == 'True')
         self.silent_save.setChecked(self.settings.get('SaveSettings', 'is_silent_save') == 'True')
         self.default_path_edit.setText(self.settings.get('SaveSettings', 'default_path_edit'))
         self.save_name_edit.setText(self.settings.get('SaveSettings', 'save_name_edit'))
+        self.dedup_save.setChecked(self.settings.get('SaveSettings', 'is_dedup_save', fallback='False') == 'True')
         self.show_default_path()
         self.thin_width_edit.setText(self.settings.get('AnnotationSettings', 'thin_width'))
         self.medium_width_edit.setText(self.settings.get('AnnotationSettings', 'medium_width'))
@@ -306,6 +325,8 @@ class SettingWindow(BaseWidget):
         self.copy_key.setText(self.settings.get('ShortKeySettings', 'copy'))
         self.save_key.setText(self.settings.get('ShortKeySettings', 'save'))
         self.undo_key.setText(self.settings.get('ShortKeySettings', 'undo'))
+        self.redo_key.setText(self.settings.get('ShortKeySettings', 'redo', fallback='ctrl+y'))
+        self.pick_key.setText(self.settings.get('ShortKeySettings', 'pick_color', fallback='p'))
         for key in self.short_keys:
             key.selected = False
             key.updateStyle()
@@ -315,11 +336,14 @@ class SettingWindow(BaseWidget):
                           'True' if self.auto_update_checkbox.isChecked() else 'False')
         self.settings.set('GeneralSettings', 'is_startup', 'True' if self.startup_checkbox.isChecked() else 'False')
         self.settings.set('GeneralSettings', 'picture_quality', str(self.quality_spinbox.value()))
+        self.settings.set('GeneralSettings', 'is_smart_select',
+                          'True' if self.smart_select_checkbox.isChecked() else 'False')
         self.settings.set('SaveSettings', 'is_silent_save', 'True' if self.silent_save.isChecked() else 'False')
         self.settings.set('SaveSettings', 'default_path_edit',
                           self.default_path_edit.text() or str(self.settings.home_pictures))
         self.settings.set('SaveSettings', 'save_name_edit',
                           self.save_name_edit.text() or "hydra_{Y}{m}{d}_{h}{M}{S}.png")
+        self.settings.set('SaveSettings', 'is_dedup_save', 'True' if self.dedup_save.isChecked() else 'False')
         self.settings.set('AnnotationSettings', 'thin_width', self.thin_width_edit.text() or '1')
         self.settings.set('AnnotationSettings', 'medium_width', self.medium_width_edit.text() or '3')
         self.settings.set('AnnotationSettings', 'thick_width', self.thick_width_edit.text() or '6')
@@ -329,6 +353,8 @@ class SettingWindow(BaseWidget):
         self.settings.set('ShortKeySettings', 'copy', self.copy_key.text())
         self.settings.set('ShortKeySettings', 'save', self.save_key.text())
         self.settings.set('ShortKeySettings', 'undo', self.undo_key.text())
+        self.settings.set('ShortKeySettings', 'redo', self.redo_key.text())
+        self.settings.set('ShortKeySettings', 'pick_color', self.pick_key.text())
         self.settings.save_settings()
         self.title_bar.title_label.setText('软件设置-保存成功,请重启应用')
 
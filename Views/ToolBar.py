@@ -1,10 +1,9 @@
 from PyQt5.QtCore import Qt, QPointF
-from PyQt5.QtGui import QPixmap, QIcon, QColor
+from PyQt5.QtGui import QPixmap, QIcon, QColor, QTransform
 from PyQt5.QtWidgets import QToolBar, QAction
 
-from Functions import LineWidthAction, FontAction, ColorAction
+from Functions import LineWidthAction, FontAction, ColorAction, RedactionAction, glyph_icon
 from Settings import Settings
-from .LongScreenshot import LongScreenshot
 
 
 class ScreenShotToolBar(QToolBar):
@@ -36,6 +35,13 @@ class ScreenShotToolBar(QToolBar):
         self.medium_line = LineWidthAction('中', self, self.normal_line_width)
         self.thick_line = LineWidthAction('粗', self, self.big_line_width)
 
+        # 打码工具在颜色选择器之前创建，选择颜色时同步刷新纯色填充的图标
+        self.mosaic_action = RedactionAction('马赛克', self, 'mosaic')
+        self.blur_action = RedactionAction('模糊', self, 'blur')
+        self.fill_action = RedactionAction('纯色遮挡', self, 'fill')
+        self.redaction_actions = [self.mosaic_action, self.blur_action, self.fill_action]
+        self.__current_redaction_mode = 'mosaic'
+
         self.font_action = FontAction(QIcon(self.settings.get('IconPaths', 'font_setting_icon')), '字体', self)
         self.default_color = QColor()
         self.default_color.setNamedColor(self.settings.get('AnnotationSettings', 'default_color'))
@@ -48,8 +54,12 @@ class ScreenShotToolBar(QToolBar):
         self.number_action = QAction(QIcon(self.settings.get('IconPaths', 'number_icon')), '序号', self)
         self.text_input_action = QAction(QIcon(self.settings.get('IconPaths', 'text_icon')), '文本', self)
         self.undo_action = QAction(QIcon(self.settings.get('IconPaths', 'undo_icon')), '撤销', self)
+        # 重做图标由撤销图标水平翻转得到
+        redo_pixmap = QPixmap(self.settings.get('IconPaths', 'undo_icon')).transformed(QTransform().scale(-1, 1))
+        self.redo_action = QAction(QIcon(redo_pixmap), '重做', self)
         self.tongs_action = QAction(QIcon(self.settings.get('IconPaths', 'tongs_icon')), '取消编辑', self)
         self.long_action = QAction(QIcon(self.settings.get('IconPaths', 'long_icon')), '长截图', self)
+        self.ocr_action = QAction(glyph_icon('文'), '识别文字', self)
         self.save_action = QAction(QIcon(self.settings.get('IconPaths', 'save_icon')), '保存', self)
         self.to_top_action = QAction(QIcon(self.settings.get('IconPaths', 'to_top_icon')), '贴图置顶', self)
         self.close_action = QAction(QIcon(self.settings.get('IconPaths', 'cancel_icon')), '关闭', self)
@@ -61,9 +71,13 @@ class ScreenShotToolBar(QToolBar):
         self.graffiti_action.triggered.connect(self.before_draw_graffiti)
         self.number_action.triggered.connect(self.before_draw_number)
         self.text_input_action.triggered.connect(self.before_draw_text)
+        for redaction_action in self.redaction_actions:
+            redaction_action.triggered.connect(lambda _, mode=redaction_action.mode: self.before_draw_redaction(mode))
         self.undo_action.triggered.connect(self.undo)
+        self.redo_action.triggered.connect(self.redo)
         self.tongs_action.triggered.connect(self.cancel_edit)
         self.long_action.triggered.connect(self.long_screenshot)
+        self.ocr_action.triggered.connect(self.recognize_text)
         self.save_action.triggered.connect(lambda: self.before_save('local'))
         self.to_top_action.triggered.connect(self.to_top)
         self.close_action.triggered.connect(self.exit)
@@ -81,11 +95,15 @@ class ScreenShotToolBar(QToolBar):
         self.addAction(self.graffiti_action)
         self.addAction(self.number_action)
         self.addAction(self.text_input_action)
+        for redaction_action in self.redaction_actions:
+            self.addAction(redaction_action)
         self.separator2 = self.addSeparator()
         self.addAction(self.undo_action)
+        self.addAction(self.redo_action)
         self.addAction(self.tongs_action)
         self.separator3 = self.addSeparator()
         self.addAction(self.long_action)
+        self.addAction(self.ocr_action)
         self.addAction(self.save_action)
         self.addAction(self.to_top_action)
         self.addAction(self.close_action)
@@ -111,6 +129,9 @@ class ScreenShotToolBar(QToolBar):
     def current_color(self):
         return self.color_action.curColor
 
+    def current_redaction_mode(self):
+        return self.__current_redaction_mode
+
     def icon_pixmap_copy(self):
         return self.icon_pixmap.copy()
 
@@ -155,6 +176,12 @@ class ScreenShotToolBar(QToolBar):
         else:
             self.widgetForAction(self.text_input_action).setStyleSheet(self.normal_style)
 
+        for redaction_action in self.redaction_actions:
+            if self.screenshot_area.isDrawRedaction and redaction_action.mode == self.current_redaction_mode():
+                self.widgetForAction(redaction_action).setStyleSheet(self.selected_style)
+            else:
+                self.widgetForAction(redaction_action).setStyleSheet(self.normal_style)
+
     def set_line_width_action_visible(self, flag):
         self.thin_line.setVisible(flag)
         self.medium_line.setVisible(flag)
@@ -208,10 +235,27 @@ class ScreenShotToolBar(QToolBar):
         self.font_action.setVisible(True)
         self.separator1.setVisible(True)
 
+    def before_draw_redaction(self, mode):
+        """马赛克和模糊用画笔粗细控制颗粒大小，纯色遮挡使用当前颜色"""
+        self.screenshot_area.clearEditFlags()
+        self.screenshot_area.isDrawRedaction = True
+        self.__current_redaction_mode = mode
+        self.set_line_width_action_visible(mode != 'fill')
+        self.color_action.setVisible(mode == 'fill')
+        self.font_action.setVisible(False)
+        self.separator1.setVisible(True)
+
     def undo(self):
-        """撤销上次编辑行为"""
-        if self.screenshot_area.screenArea.undoEditAction():
-            self.screenshot_area.update()
+        """撤销上次编辑行为，只重绘受影响的区域"""
+        rectf = self.screenshot_area.screenArea.undoEditAction()
+        if rectf is not None:
+            self.screenshot_area.update(rectf.toAlignedRect())
+
+    def redo(self):
+        """重做上次撤销的编辑行为"""
+        rectf = self.screenshot_area.screenArea.redoEditAction()
+        if rectf is not None:
+            self.screenshot_area.update(rectf.toAlignedRect())
 
     def cancel_edit(self):
         self.screenshot_area.clearEditFlags()
@@ -221,12 +265,20 @@ class ScreenShotToolBar(QToolBar):
         self.separator1.setVisible(False)
 
     def long_screenshot(self):
+        # 长截图依赖 OpenCV/NumPy/PIL/pynput，首次使用时才加载
+        from .LongScreenshot import LongScreenshot
         self.screenshot_area.clearEditFlags()
         center_rectf = self.screenshot_area.screenArea.centerLogicalRectF()
+        center_rectf = center_rectf.translated(QPointF(self.screenshot_area.screenArea.desktop().origin))  # 转为全局坐标
         self.exit()
         self.long_screenshot = LongScreenshot(center_rectf)
+        self.long_screenshot.save_report_signal.connect(self.screenshot_area.save_report_signal)
         self.long_screenshot.show()
 
+    def recognize_text(self):
+        self.screenshot_area.clearEditFlags()
+        self.screenshot_area.recognizeText()
+
     def before_save(self, target):
         # 若正在编辑文本未保存，先完成编辑
         if self.screenshot_area.isDrawing and self.screenshot_area.isDrawText:
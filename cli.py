@@ -0,0 +1,199 @@
+"""
+水螅截图命令行模式：不显示任何窗口，复用截图窗口的标注渲染和长截图拼接，用于批量生成带标注的截图。
+
+  python cli.py render a.png b.png --spec-dir specs --out-dir out --jobs 8
+  python cli.py capture --spec spec.json --rect 0,0,800,600 --out shot.png
+  python cli.py stitch frames_dir --out-dir out --strategy row_profile
+
+标注文件为标注文档（见 Functions/AnnotationDocument.py）的 JSON 或二进制（.hyan）形式，也可以只是编辑行为列表，
+坐标相对截图区域 rect 左上角（逻辑像素）；未指定 rect 时为整张图片。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+_app = None  # 每个进程一个无界面的 QGuiApplication
+
+
+def init_worker(platform='offscreen'):
+    """进程池的初始化函数：在子进程中创建无界面的 QGuiApplication，之后的任务都可以使用 QPixmap/QPainter"""
+    global _app
+    if platform:
+        os.environ['QT_QPA_PLATFORM'] = platform
+    from PyQt5.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication(['hydra-cli'])
+
+
+def load_spec(path):
+    """读取标注文件，返回 AnnotationDocument，没有标注文件时返回空文档"""
+    from Functions import AnnotationDocument
+    return AnnotationDocument.load(path) if path else AnnotationDocument()
+
+
+class HeadlessHost:
+    """代替截图窗口为 ScreenArea 提供绘制所需的属性"""
+    from PyQt5.QtCore import Qt
+    color_transparent = Qt.GlobalColor.transparent
+
+
+def render_desktop(desktop, document, output, quality=-1, rect=None):
+    """在虚拟桌面上渲染标注文档并保存，返回输出图片的像素大小（矢量格式为逻辑大小）。rect 为空时使用文档的截图区域，都为空时为整个桌面"""
+    from Functions import is_vector_path
+    from Views.ScreenArea import ScreenArea
+    area = ScreenArea(HeadlessHost(), desktop)
+    rectf = rect if rect is not None else document.rect
+    if rectf.isEmpty():
+        rectf = area.screenLogicalRectF()
+    area.setEditActions(document.toActions(rectf.topLeft()))
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    if is_vector_path(output):  # SVG/PDF：编辑行为保存为矢量图形
+        area.exportVector(output, rectf)
+        return round(rectf.width()), round(rectf.height())
+    pixmap = area.physicalPixmap(rectf, editAction=True)
+    if not pixmap.save(str(output), quality=quality):
+        raise OSError(f'无法保存图片：{output}')
+    return pixmap.width(), pixmap.height()
+
+
+def render_job(job):
+    """渲染一张图片（在进程池中执行）：job 为 (输入图片, 标注文件, 输出图片, 设备像素比, 图片质量)"""
+    source, specPath, output, pixelRatio, quality = job
+    from PyQt5.QtGui import QPixmap
+    from Functions import VirtualDesktop
+    start = time.perf_counter()
+    pixmap = QPixmap(str(source))
+    if pixmap.isNull():
+        raise OSError(f'无法读取图片：{source}')
+    pixmap.setDevicePixelRatio(pixelRatio)
+    size = render_desktop(VirtualDesktop.fromPixmap(pixmap), load_spec(specPath), output, quality)
+    return {'input': str(source), 'output': str(output), 'size': size, 'ms': (time.perf_counter() - start) * 1000}
+
+
+def stitch_job(job):
+    """拼接一组长截图帧（在进程池中执行）：job 为 (帧图片列表, 输出图片, 策略名称)"""
+    frames, output, strategy = job
+    import cv2
+    import numpy as np
+    from Functions import merge_images, save_merge_result
+    start = time.perf_counter()
+    images = [cv2.cvtColor(cv2.imdecode(np.fromfile(str(frame), np.uint8), cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
+              for frame in frames]
+    skipped = []
+    result = merge_images(images, strategy=strategy, on_error=lambda index, error: skipped.append(str(frames[index])))
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    save_merge_result(str(output), result)
+    return {'input': [str(frame) for frame in frames], 'output': str(output), 'size': [result.shape[1], result.shape[0]],
+            'skipped': skipped, 'ms': (time.perf_counter() - start) * 1000}
+
+
+def run_jobs(func, jobs, workers):
+    """并行执行任务，逐个输出 JSON 行结果，返回失败的任务数"""
+    failures = 0
+
+    def report(result):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    if workers <= 1 or len(jobs) <= 1:
+        init_worker()
+        for job in jobs:
+            try:
+                report(func(job))
+            except Exception as e:
+                failures += 1
+                report({'job': [str(item) for item in job], 'error': str(e)})
+        return failures
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        futures = {executor.submit(func, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                report(future.result())
+            except Exception as e:
+                failures += 1
+                report({'job': [str(item) for item in futures[future]], 'error': str(e)})
+    return failures
+
+
+def image_files(paths):
+    suffixes = {'.png', '.jpg', '.jpeg', '.bmp', '.gif'}
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files += sorted(file for file in path.iterdir() if file.suffix.lower() in suffixes)
+        else:
+            files.append(path)
+    return files
+
+
+def command_render(args):
+    jobs = []
+    for source in image_files(args.inputs):
+        spec = args.spec
+        if args.spec_dir:
+            spec = Path(args.spec_dir) / f'{source.stem}.json'
+            spec = spec if spec.exists() else args.spec
+        output = Path(args.out_dir) / f'{source.stem}.{args.format}'
+        jobs.append((source, spec, output, args.pixel_ratio, args.quality))
+    return run_jobs(render_job, jobs, args.jobs)
+
+
+def command_capture(args):
+    """抓取当前所有屏幕（需要真实的显示环境）并渲染标注"""
+    init_worker(platform=None)
+    from PyQt5.QtCore import QPointF, QRectF
+    from Functions import VirtualDesktop
+    desktop = VirtualDesktop.capture()
+    rect = None
+    if args.rect:  # --rect 为全局坐标，转换为虚拟桌面内的坐标
+        rect = QRectF(*(float(value) for value in args.rect.split(','))).translated(-QPointF(desktop.origin))
+    size = render_desktop(desktop, load_spec(args.spec), args.out, args.quality, rect)
+    print(json.dumps({'output': args.out, 'size': size}, ensure_ascii=False))
+    return 0
+
+
+def command_stitch(args):
+    jobs = []
+    for directory in map(Path, args.inputs):
+        frames = image_files([directory])
+        if frames:
+            jobs.append((frames, Path(args.out_dir) / f'{directory.name}.{args.format}', args.strategy))
+    return run_jobs(stitch_job, jobs, args.jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python cli.py', description='水螅截图命令行模式')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    render = subparsers.add_parser('render', help='在已有图片上渲染标注')
+    render.add_argument('inputs', nargs='+', help='输入图片或目录')
+    render.add_argument('--spec', help='所有图片共用的标注文件')
+    render.add_argument('--spec-dir', help='按图片文件名查找标注文件（<文件名>.json）的目录')
+    render.add_argument('--out-dir', required=True, help='输出目录')
+    render.add_argument('--format', default='png', help='输出格式（png、jpg 等，svg/pdf 为矢量格式），默认 png')
+    render.add_argument('--pixel-ratio', type=float, default=1.0, help='输入图片的设备像素比，标注坐标按逻辑像素计算')
+    render.add_argument('--quality', type=int, default=-1, help='图片质量（0-100），默认由格式决定')
+    render.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='并行进程数')
+
+    capture = subparsers.add_parser('capture', help='截取屏幕并渲染标注')
+    capture.add_argument('--spec', help='标注文件')
+    capture.add_argument('--rect', help='截图区域（全局逻辑坐标）x,y,w,h，默认为标注文件中的 rect 或整个桌面')
+    capture.add_argument('--out', required=True, help='输出图片')
+    capture.add_argument('--quality', type=int, default=-1, help='图片质量（0-100）')
+
+    stitch = subparsers.add_parser('stitch', help='把目录中按文件名排序的帧拼接为长截图')
+    stitch.add_argument('inputs', nargs='+', help='帧图片所在的目录，每个目录输出一张长截图')
+    stitch.add_argument('--out-dir', required=True, help='输出目录')
+    stitch.add_argument('--format', default='png', help='输出格式，默认 png')
+    stitch.add_argument('--strategy', help='偏移量估计策略：template（默认）、row_profile 或 phase（可左右滚动）')
+    stitch.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='并行进程数')
+
+    args = parser.parse_args(argv)
+    commands = {'render': command_render, 'capture': command_capture, 'stitch': command_stitch}
+    return 1 if commands[args.command](args) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,9 @@
 from Views import TrayProgram
 import ctypes
+import multiprocessing
 
 ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("starter")
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # 打包后文字识别的进程池子进程从这里进入，不能再启动托盘程序
     tray_program = TrayProgram()
     tray_program.run()
@@ -23,7 +23,19 @@ a = Analysis(
     pathex=['E:\\Users\\QinYu6\\Documents\\PythonProject\\hydraSCR'],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # 以下模块依赖 OpenCV/NumPy，只在首次使用时通过 Functions 包的 __getattr__ 或注册表按名称导入，
+    # 静态分析找不到它们，必须显式列出
+    hiddenimports=[
+        'Functions.PicMatcher',
+        'Functions.TiledCanvas',
+        'Functions.FrameGate',
+        'Functions.SaveDedup',
+        'Functions.PixelStats',
+        'Functions.Redaction',
+        'Functions.TextRecognition',
+        'Functions.ElementDetector',
+        'Views.LongScreenshot',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
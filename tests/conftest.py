@@ -0,0 +1,48 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qt_app():
+    """无界面的 QApplication，渲染截图和标注需要"""
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(['hydra-tests'])
+
+
+@pytest.fixture
+def screenshot(qt_app, tmp_path, monkeypatch):
+    """截图窗口，配置文件写在临时目录中"""
+    monkeypatch.chdir(tmp_path)
+    from Views.ScreenArea import ScreenShotWidget
+    widget = ScreenShotWidget()
+    yield widget
+    widget.deleteLater()
+
+
+@pytest.fixture
+def two_screen_desktop(qt_app):
+    """两个屏幕的虚拟桌面：左侧 200x100 红色（设备像素比 1），右侧逻辑 200x100 蓝色（设备像素比 2）"""
+    from PyQt5.QtCore import QRectF
+    from PyQt5.QtGui import QColor, QPixmap
+    from Functions import ScreenBuffer, VirtualDesktop
+    left = QPixmap(200, 100)
+    left.fill(QColor(255, 0, 0))
+    right = QPixmap(400, 200)
+    right.fill(QColor(0, 0, 255))
+    right.setDevicePixelRatio(2)
+    return VirtualDesktop([ScreenBuffer(QRectF(0, 0, 200, 100), left),
+                           ScreenBuffer(QRectF(200, 0, 200, 100), right)])
+
+
+@pytest.fixture
+def two_screens(two_screen_desktop):
+    """使用两个屏幕的虚拟桌面、无界面的截图区域"""
+    from cli import HeadlessHost
+    from Views.ScreenArea import ScreenArea
+    return ScreenArea(HeadlessHost(), two_screen_desktop)
@@ -0,0 +1,52 @@
+"""标注文档：二进制形式（.hyan）保存后读取得到相同的编辑行为，并且比 JSON 形式小得多"""
+import pytest
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QColor, QFont
+
+from Functions import AnnotationDocument, AnnotationFormatError
+from Functions.CircleNumber import Circle
+
+
+def every_kind():
+    red, blue = QColor(255, 0, 0), QColor(0, 0, 255, 128)
+    font = QFont('Arial', 14)
+    graffiti = [QPointF(100 + i * 0.5, 80 + (i % 7) * 1.25) for i in range(400)]
+    return [('rectangle', red, 2, QPointF(110, 90), QPointF(160.5, 130)),
+            ('ellipse', blue, 3, QPointF(120, 95), QPointF(140, 99.75)),
+            ('arrow', red, 2, QPointF(200, 150), QPointF(105, 85)),
+            ('graffiti', red, 4, graffiti),
+            ('number', Circle(QPointF(130, 110), blue, 2, 12.5, 3)),
+            ('text', red, font, QRectF(150, 100, 80, 40), '第一行\nsecond'),
+            ('mosaic', red, 1, QPointF(100, 80), QPointF(120, 100)),
+            ('blur', red, 1, QPointF(100, 80), QPointF(120, 100)),
+            ('fill', blue, 1, QPointF(180, 140), QPointF(190, 150))]
+
+
+def test_binary_round_trip(qt_app, tmp_path):
+    document = AnnotationDocument(every_kind(), QRectF(100, 80, 200, 150), 1.5)
+    path = tmp_path / 'capture.hyan'
+    document.save(path)
+    assert path.read_bytes().startswith(b'HYAN')
+    loaded = AnnotationDocument.load(path)
+    assert (loaded.rect, loaded.pixelRatio) == (document.rect, 1.5)
+    assert loaded.diff(document) == ([], [])
+    assert loaded.toDict() == document.toDict()
+    assert [list(action[3]) for action in loaded.actions if action[0] == 'graffiti'] == [every_kind()[3][3]]
+    assert loaded.actions[4][1].number == 3 and loaded.actions[5][4] == '第一行\nsecond'
+    assert len(path.read_bytes()) * 4 < len(document.toJson())  # 涂鸦的点只保存差值
+
+
+def test_moved_document_keeps_relative_positions(qt_app):
+    document = AnnotationDocument.fromBytes(AnnotationDocument(every_kind(), QRectF(100, 80, 200, 150)).toBytes())
+    moved = document.toActions(QPointF(0, 0))
+    assert (moved[0][3], moved[0][4]) == (QPointF(10, 10), QPointF(60.5, 50))
+    assert moved[4][1].startPoint == QPointF(30, 30)
+
+
+def test_rejects_other_data(qt_app):
+    with pytest.raises(AnnotationFormatError):
+        AnnotationDocument.fromBytes(b'PNG\x00')
+    data = bytearray(AnnotationDocument(every_kind()[:1], QRectF(0, 0, 10, 10)).toBytes())
+    data[4] = 99  # 更高的版本号
+    with pytest.raises(AnnotationFormatError):
+        AnnotationDocument.fromBytes(bytes(data))
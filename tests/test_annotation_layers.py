@@ -0,0 +1,54 @@
+"""编辑行为图层按屏幕分配；撤销/重做前放弃正在输入的文字，重新编辑文本时新增的编辑行为能正确撤销"""
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QColor, QFont, QImage, QPainter
+
+
+def test_layers_follow_each_screen(two_screens):
+    area = two_screens
+    area.setEditActions([('fill', QColor(0, 0, 0), 4, QPointF(10, 10), QPointF(30, 30))])
+    image = QImage(200, 100, QImage.Format.Format_ARGB32)
+    image.fill(QColor(255, 255, 255))
+    painter = QPainter(image)
+    area.paintAnnotationLayer(painter, QRectF(0, 0, 200, 100))
+    painter.end()
+    assert list(area._annotationLayers) == [0]  # 只涉及左侧屏幕时不分配右侧屏幕的图层
+    layer = area._annotationLayers[0][0]
+    assert (layer.width(), layer.height(), layer.devicePixelRatio()) == (200, 100, 1)
+    assert QColor(image.pixel(20, 20)).getRgb()[:3] == (0, 0, 0)
+    area.setEditActions(area.getEditActions() + [('fill', QColor(0, 0, 0), 4, QPointF(250, 10), QPointF(270, 30))])
+    painter = QPainter(image)
+    area.paintAnnotationLayer(painter, QRectF(0, 0, 400, 100))
+    painter.end()
+    layer = area._annotationLayers[1][0]
+    assert (layer.width(), layer.height(), layer.devicePixelRatio()) == (400, 200, 2)
+
+
+def test_undo_while_editing_text_does_not_duplicate(screenshot):
+    area = screenshot.screenArea
+    text = ('text', QColor(255, 0, 0), QFont(), QRectF(10, 10, 100, 30), 'hello')
+    rectangle = ('rectangle', QColor(255, 0, 0), 2, QPointF(50, 50), QPointF(80, 80))
+    area.setEditActions([text])
+    from Functions import AddCommand
+    area.pushEditCommand(AddCommand(rectangle))
+    screenshot.textInputWg.loadTextInputBy(area.takeTextInputActionAt(QPointF(20, 20)))
+    assert not screenshot.textInputWg.isHidden()
+    screenshot.toolbar.undo()
+    assert screenshot.textInputWg.isHidden() and not screenshot.isDrawing
+    area.saveTextInputAction()  # 之后再保存（如点击输入框之外）不会重复添加文本
+    assert [action[0] for action in area.getEditActions()] == ['text']
+
+
+
+def test_add_while_text_is_taken_then_undo(screenshot):
+    area = screenshot.screenArea
+    text = ('text', QColor(255, 0, 0), QFont(), QRectF(10, 10, 100, 30), 'hello')
+    rectangle = ('rectangle', QColor(255, 0, 0), 2, QPointF(50, 50), QPointF(80, 80))
+    ellipse = ('ellipse', QColor(255, 0, 0), 2, QPointF(150, 50), QPointF(180, 80))
+    area.setEditActions([rectangle, text])
+    screenshot.textInputWg.loadTextInputBy(area.takeTextInputActionAt(QPointF(20, 20)))
+    from Functions import AddCommand
+    area.pushEditCommand(AddCommand(ellipse))  # 文本被取出时切换工具画了一个椭圆
+    screenshot.toolbar.undo()
+    assert [action[0] for action in area.getEditActions()] == ['rectangle', 'text']
+    screenshot.toolbar.redo()
+    assert [action[0] for action in area.getEditActions()] == ['rectangle', 'text', 'ellipse']
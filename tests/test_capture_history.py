@@ -0,0 +1,60 @@
+"""截图历史：图块网格与桌面对齐，读取不写索引，淘汰按累计大小进行"""
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QColor, QImage, QPainter
+
+from Functions import CaptureHistory
+
+
+def desktop():
+    image = QImage(640, 480, QImage.Format.Format_ARGB32)
+    image.fill(QColor(240, 240, 240))
+    painter = QPainter(image)
+    for i in range(0, 640, 7):  # 每个方格颜色不同，避免图块内容偶然相同
+        for j in range(0, 480, 5):
+            painter.fillRect(i, j, 7, 5, QColor((i * 37 + j) % 256, (i * 11 + j * 3) % 256, (i * 53 + j * 7) % 256))
+    painter.end()
+    return image
+
+
+def test_shifted_selection_shares_tiles(qt_app, tmp_path):
+    history = CaptureHistory(tmp_path)
+    screen = desktop()
+    history.add(screen.copy(0, 0, 512, 384), QRectF(0, 0, 512, 384))
+    before, known = history.storedBytes(), set(history._chunks)
+    captureId = history.add(screen.copy(37, 21, 400, 300), QRectF(37, 21, 400, 300))
+    record = history.record(captureId)
+    assert record.tileOrigin == [37, 21]
+    tiles = zip(history._tileRects(400, 300, record.tileOrigin), record.chunks)
+    interior = [digest for (x, y, w, h), digest in tiles if w == h == history.tile_size]
+    assert len(interior) == 2
+    assert set(interior) <= known  # 完整的图块与第一张截图共享
+    assert history.storedBytes() - before < before
+    image, _ = history.load(captureId)
+    assert image == screen.copy(37, 21, 400, 300).convertToFormat(history.image_format)
+
+
+def test_load_does_not_rewrite_index(qt_app, tmp_path, monkeypatch):
+    history = CaptureHistory(tmp_path)
+    captureId = history.add(desktop().copy(0, 0, 100, 100), QRectF(0, 0, 100, 100))
+    saves = []
+    save = history._saveIndex
+    monkeypatch.setattr(history, '_saveIndex', lambda: saves.append(1) or save())
+    history.load(captureId)
+    history.load(captureId)
+    assert saves == []
+    history.flush()
+    history.flush()
+    assert saves == [1]
+    assert CaptureHistory(tmp_path).record(captureId).lastAccess == history.record(captureId).lastAccess
+
+
+def test_evict_tracks_running_total(qt_app, tmp_path):
+    history = CaptureHistory(tmp_path)
+    screen = desktop()
+    for x in range(0, 640, 128):
+        history.add(screen.copy(x, 0, 128, 128), QRectF(x, 0, 128, 128))
+    assert history.storedBytes() == sum(size for _, size in history._chunks.values())
+    history.maxBytes = history.storedBytes() // 2
+    history.evict()
+    assert history.storedBytes() <= history.maxBytes
+    assert history.storedBytes() == sum(size for _, size in history._chunks.values())
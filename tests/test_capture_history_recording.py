@@ -0,0 +1,49 @@
+"""截图历史只在复制、保存和钉图时记录：取消的截图和未修改的重新打开的截图不记录"""
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QColor, QPixmap
+
+from Functions import CaptureHistory, ScreenBuffer, VirtualDesktop
+
+
+def white_desktop():
+    pixmap = QPixmap(200, 100)
+    pixmap.fill(QColor(255, 255, 255))
+    return VirtualDesktop([ScreenBuffer(QRectF(0, 0, 200, 100), pixmap)])
+
+
+class ImmediateThread:
+    """在调用线程中直接执行，保存后截图历史立即可见"""
+
+    def __init__(self, target, args=(), daemon=None):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+
+def select(screenshot, topLeft, bottomRight):
+    screenshot.start()
+    screenshot.screenArea.setCenterArea(topLeft, bottomRight)
+    screenshot.hasScreenShot = True
+
+
+def test_only_copied_captures_are_recorded(screenshot, tmp_path, monkeypatch):
+    monkeypatch.setattr(VirtualDesktop, 'capture', staticmethod(white_desktop))  # 无界面时抓不到屏幕
+    monkeypatch.setattr('Views.ScreenArea.Thread', ImmediateThread)
+    screenshot.history = history = CaptureHistory(tmp_path / 'history')
+    select(screenshot, QPointF(10, 10), QPointF(60, 40))
+    screenshot.hide()  # 按 Esc 取消
+    assert history.records() == []
+    select(screenshot, QPointF(10, 10), QPointF(60, 40))
+    screenshot.save2Clipboard()
+    records = history.records()
+    assert len(records) == 1
+    screenshot.reopenCapture(records[0].id)
+    screenshot.hide()
+    screenshot.reopenCapture(records[0].id)
+    screenshot.save2Clipboard()  # 未修改时再次复制不重复记录
+    assert len(history.records()) == 1
+    screenshot.reopenCapture(records[0].id)
+    screenshot.screenArea.setEditActions([('fill', QColor(0, 0, 0), 4, QPointF(20, 20), QPointF(30, 30))])
+    screenshot.save2Clipboard()
+    assert len(history.records()) == 2
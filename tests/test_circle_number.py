@@ -0,0 +1,29 @@
+"""序号标记：序号由当前截图的编辑行为决定，撤销后保持连续；相同外观的序号只绘制一次"""
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QColor
+
+from Functions.CircleNumber import Circle, circle_glyph
+
+
+def add_number(area, x):
+    area.saveNumberAction(Circle(QPointF(x, 50), QColor(255, 0, 0), 2, 12, area.nextCircleNumber()))
+
+
+def test_numbers_stay_consecutive_under_undo(screenshot):
+    area = screenshot.screenArea
+    add_number(area, 20)
+    add_number(area, 60)
+    assert [action[1].number for action in area.getEditActions()] == [1, 2]
+    area.undoEditAction()
+    add_number(area, 100)
+    assert [action[1].number for action in area.getEditActions()] == [1, 2]
+    area.clearEditActions()  # 新的截图从 1 开始
+    assert area.nextCircleNumber() == 1
+
+
+def test_glyphs_are_rendered_once(qt_app):
+    red = QColor(255, 0, 0)
+    glyph = circle_glyph(red, 2, 12, 3)
+    assert circle_glyph(QColor(255, 0, 0), 2, 12, 3) is glyph
+    assert circle_glyph(red, 2, 12, 4) is not glyph
+    assert circle_glyph(red, 2, 12, 3, pixelRatio=2.0).width() == 2 * glyph.width()
@@ -0,0 +1,55 @@
+"""帧耗时分析：按阶段计时，统计事件到绘制的延迟和掉帧，导出 Chrome Trace；未启用时不记录任何数据"""
+import json
+
+from Functions import FrameProfiler
+
+
+class Clock:
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, ms):
+        self.ns += int(ms * 1e6)
+
+
+def frame(profiler, clock, phases):
+    profiler.beginFrame()
+    for name, ms in phases:
+        with profiler.phase(name):
+            clock.advance(ms)
+    profiler.endFrame()
+
+
+def test_phases_latency_and_dropped_frames(tmp_path, monkeypatch):
+    clock = Clock()
+    profiler = FrameProfiler(enabled=True, refreshRate=100.0)  # 每帧预算 10 毫秒
+    monkeypatch.setattr(profiler, '_now', clock)
+    profiler.reset()
+    profiler.markEvent('mouseMove')
+    clock.advance(5)
+    frame(profiler, clock, [('copy', 4), ('mask', 2)])
+    profiler.markEvent('mouseMove')
+    clock.advance(20)
+    frame(profiler, clock, [('copy', 6), ('magnifier', 1)])
+    summary = profiler.summary()
+    assert summary['phases'] == {'copy': 5.0, 'mask': 1.0, 'magnifier': 0.5}
+    assert summary['latency'] == (11 + 27) / 2
+    assert profiler.frameCount == 2 and profiler.droppedFrames == 1 + 2
+    path = profiler.exportTrace(tmp_path / 'trace.json')
+    events = json.loads(path.read_text(encoding='utf8'))['traceEvents']
+    assert [event['name'] for event in events if event.get('cat') == 'paint'] == ['copy', 'mask', 'copy', 'magnifier']
+    assert [event['dur'] for event in events if event.get('cat') == 'latency'] == [11000, 27000]
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    profiler = FrameProfiler(enabled=False, traceDir=tmp_path)
+    profiler.markEvent('mouseMove')
+    profiler.beginFrame()
+    with profiler.phase('copy'):
+        pass
+    profiler.endFrame()
+    assert profiler.frameCount == 0 and profiler.traceEvents() == []
+    assert profiler.exportTrace() is None and list(tmp_path.iterdir()) == []
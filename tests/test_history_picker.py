@@ -0,0 +1,36 @@
+"""截图历史选择器：双击贴图时在工作线程中读取截图，不阻塞界面"""
+import threading
+import time
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtWidgets import QApplication
+
+from Functions import CaptureHistory
+
+
+def test_pin_decodes_off_the_gui_thread(qt_app, tmp_path):
+    from Views.HistoryPicker import HistoryPicker
+    history = CaptureHistory(tmp_path, cacheCount=0)  # 不使用内存缓存，贴图时必须解码
+    image = QImage(120, 80, QImage.Format.Format_ARGB32)
+    image.fill(QColor(0, 128, 255))
+    history.add(image, QRectF(30, 40, 120, 80))
+    decodeThreads, pins = [], []
+    decode = history._decode
+    history._decode = lambda record: decodeThreads.append(threading.current_thread()) or decode(record)
+    picker = HistoryPicker(history)
+    picker.model.reload()
+    picker.pin_signal.connect(lambda pixmap, pos: pins.append((pixmap, pos)))
+    index = picker.model.index(0)
+    picker.pin(index)
+    picker.pin(index)  # 读取完成前再次双击不重复读取
+    deadline = time.monotonic() + 10
+    while not pins and time.monotonic() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.01)
+    assert len(decodeThreads) == 1 and decodeThreads[0] is not threading.main_thread()
+    assert len(pins) == 1
+    pixmap, pos = pins[0]
+    assert (pixmap.width(), pixmap.height(), pos.x(), pos.y()) == (120, 80, 30, 40)
+    assert QColor(pixmap.toImage().pixel(10, 10)).getRgb()[:3] == (0, 128, 255)
+    picker.deleteLater()
@@ -0,0 +1,32 @@
+"""托盘启动时的导入开销：导入 Views 不能带入 OpenCV/NumPy/Pillow/pynput，并且要在时间预算内完成"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET = 1.0  # 秒，取多次运行中最快的一次，留出 CI 机器的波动余量
+HEAVY_MODULES = ('cv2', 'numpy', 'PIL', 'pynput')
+
+PROBE = f'''
+import json, sys, time
+start = time.perf_counter()
+import Views
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'loaded': [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+'''
+
+
+def import_views(cwd):
+    """在干净的解释器中导入 Views"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE='1')
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=cwd, env=env, capture_output=True, text=True,
+                            timeout=60, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_views_import_is_light(tmp_path):
+    runs = [import_views(tmp_path) for _ in range(3)]  # 第一次运行可能受磁盘缓存影响
+    assert runs[0]['loaded'] == []
+    assert min(run['elapsed'] for run in runs) < IMPORT_BUDGET
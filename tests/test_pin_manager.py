@@ -0,0 +1,86 @@
+"""贴图管理：按内容复用窗口，隐藏的贴图销毁并归还原图，内存预算只计算可以释放的解码图像"""
+import time
+
+import pytest
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QColor, QPixmap
+from PyQt5.QtWidgets import QApplication, QWidget
+
+
+class FakeSettings:
+    def __init__(self, **values):
+        self.values = values
+
+    def get(self, section, option, fallback=None):
+        return self.values.get(option, fallback)
+
+
+class PinWidget(QWidget):
+    def __init__(self, shared, coordinate, scale_factor, parent=None):
+        super().__init__(parent)
+        self.shared = shared
+        self.coordinate = coordinate
+        self.scale_factor = scale_factor
+        self.resize(shared.width, shared.height)
+
+
+def solid(color, size=64):
+    pixmap = QPixmap(size, size)
+    pixmap.fill(QColor(color))
+    return pixmap
+
+
+def wait_compressed(manager, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while manager._compressing and time.monotonic() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.01)
+    assert not manager._compressing
+
+
+@pytest.fixture
+def manager(qt_app):
+    from Views.PinManager import PinManager
+    manager = PinManager(PinWidget, FakeSettings())
+    manager.trim_timer.stop()
+    yield manager
+    for widget in manager.pins:
+        widget.hide()
+        widget.deleteLater()
+
+
+def test_same_content_reuses_widget(manager):
+    first = manager.pin(solid('red'), QPoint(0, 0), 1.0)
+    second = manager.pin(solid('red'), QPoint(10, 10), 1.0)  # 新的 QPixmap 对象，cacheKey 不同
+    assert first is second
+    assert len(manager.store.items()) == 1
+
+
+def test_hidden_pins_are_pruned_and_released(manager):
+    first = manager.pin(solid('red'), QPoint(0, 0), 1.0)
+    first.hide()
+    wait_compressed(manager)
+    assert manager.pins == [first]  # 最近操作的贴图仍可从托盘重新显示
+    manager.pin(solid('blue'), QPoint(0, 0), 1.0)
+    assert first not in manager.pins
+    assert first.shared.key not in {shared.key for shared in manager.store.items()}
+
+
+def test_budget_excludes_compressed_bytes(manager):
+    widget = manager.pin(solid('red'), QPoint(0, 0), 1.0)
+    widget.shared.setCompressed(b'x' * 1000)
+    assert widget.shared.byteSize() == 64 * 64 * widget.shared.pixmap.depth() // 8
+    assert manager.store.compressedBytes() == 1000
+    manager.budget = widget.shared.byteSize()
+    manager.release(widget.shared)
+    assert widget.shared.isResident()  # 可见且未超出预算时不释放
+
+
+def test_idle_pins_are_compressed_and_offloaded(manager):
+    widget = manager.pin(solid('red'), QPoint(0, 0), 1.0)
+    manager.last_active[widget] -= manager.idle_seconds + 1
+    manager.trim()
+    wait_compressed(manager)
+    assert widget.isVisible()
+    assert widget.shared.isCompressed() and not widget.shared.isResident()
+    assert QColor(widget.shared.pixmap.toImage().pixel(5, 5)).getRgb()[:3] == (255, 0, 0)
@@ -0,0 +1,41 @@
+"""贴图缩放：滚动时只用已缓存的级别预览，停止滚动后在工作线程中高质量缩放"""
+import threading
+import time
+
+from PyQt5.QtCore import QPoint, QPointF, Qt
+from PyQt5.QtGui import QColor, QPixmap, QWheelEvent
+from PyQt5.QtWidgets import QApplication
+
+from Functions import PixmapStore
+
+
+def wheel(widget, delta):
+    event = QWheelEvent(QPointF(10, 10), QPointF(10, 10), QPoint(0, 0), QPoint(0, delta),
+                        Qt.MouseButton.NoButton, Qt.KeyboardModifier.NoModifier, Qt.ScrollPhase.NoScrollPhase, False)
+    widget.wheelEvent(event)
+
+
+def test_zoom_previews_then_refines_off_the_gui_thread(qt_app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from Views.MainWindow import StickyNoteWidget
+    pixmap = QPixmap(800, 600)
+    pixmap.fill(QColor(0, 128, 255))
+    shared = PixmapStore().acquire(pixmap)
+    widget = StickyNoteWidget(shared, QPoint(0, 0), 1.0)
+    threads = []
+    refine = widget.refine
+    monkeypatch.setattr(widget, 'refine', lambda image, level: threads.append(threading.current_thread())
+                        or refine(image, level))
+    for _ in range(5):
+        wheel(widget, -120)
+    assert widget.is_zooming and widget.refine_timer.isActive()
+    assert not shared._renditions  # 滚动过程中不做任何缩放
+    deadline = time.monotonic() + 10
+    while not shared.hasRendition(widget.scale_factor) and time.monotonic() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.01)
+    assert not widget.is_zooming
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    level = shared.level(widget.scale_factor)
+    assert shared.cachedRendition(widget.scale_factor).width() == shared.levelSize(level)[0]
+    widget.deleteLater()
@@ -0,0 +1,30 @@
+"""像素分析：直接读取截图内存，跨屏区域按各屏幕的物理像素统计，区域统计按矩形缓存"""
+import pytest
+from PyQt5.QtCore import QRectF
+
+np = pytest.importorskip('numpy')
+
+
+def test_pixels_and_cross_screen_region(two_screen_desktop):
+    from Functions import DesktopPixels
+    pixels = DesktopPixels(two_screen_desktop)
+    assert not pixels.view(0).flags.owndata  # 引用截图内存，不复制
+    assert pixels.view(1).shape == (200, 400, 4)
+    assert pixels.pixel(10, 10) == (255, 0, 0)
+    assert pixels.pixel(399.5, 99.5) == (0, 0, 255)
+    assert pixels.pixel(400, 10) is None
+    stats = pixels.regionStats(QRectF(150, 0, 100, 100))
+    assert stats.count == 50 * 100 + 100 * 200  # 右侧屏幕的设备像素比为 2
+    assert stats.dominant == [((0, 0, 255), 0.8), ((255, 0, 0), 0.2)]
+    assert stats.mean == pytest.approx((51.0, 0.0, 204.0))
+    assert stats.median == (0, 0, 255)
+    assert stats.histogram[2, 255] == 20000 and stats.histogram.sum() == 3 * stats.count
+    assert pixels.regionStats(QRectF(150.2, 0, 99.6, 100)) is stats  # 取整后为同一矩形，直接返回缓存
+
+
+def test_contrast_ratio():
+    from Functions import contrast_ratio, rgb_to_hex
+    assert contrast_ratio((0, 0, 0), (255, 255, 255)) == pytest.approx(21)
+    assert contrast_ratio((119, 119, 119), (255, 255, 255)) == pytest.approx(4.48, abs=0.01)
+    assert contrast_ratio((10, 20, 30), (10, 20, 30)) == 1
+    assert rgb_to_hex((255, 128.4, 0)) == '#FF8000'
@@ -0,0 +1,38 @@
+"""贴图原图共享存储：相同内容只保存一份，缩放结果按量化的级别缓存，阴影边框只绘制一次"""
+from PyQt5.QtGui import QColor, QPixmap
+
+from Functions import PixmapStore, shadow_border
+
+
+def solid(color, size=256):
+    pixmap = QPixmap(size, size)
+    pixmap.fill(QColor(color))
+    return pixmap
+
+
+def test_same_content_is_shared_and_ref_counted(qt_app):
+    store = PixmapStore()
+    first, second = store.acquire(solid('red')), store.acquire(solid('red'))
+    assert first is second and first.refCount == 2
+    assert store.acquire(solid('blue')) is not first
+    store.release(first)
+    assert store.find(first.key) is first
+    store.release(second)
+    assert store.find(first.key) is None
+
+
+def test_nearby_scales_share_one_rendition(qt_app):
+    shared = PixmapStore().acquire(solid('red'))
+    half = shared.rendition(0.45)
+    assert shared.rendition(0.48) is half  # 同一缩放级别复用缓存，不再重新缩放
+    assert half.width() == 128  # 取不小于目标大小的最近一级，绘制时只需再略微缩小
+    assert shared.rendition(1.5) is shared.pixmap  # 放大时直接使用原图
+    for scale in (0.4, 0.3, 0.2, 0.1, 0.05):
+        shared.rendition(scale)
+    assert len(shared._renditions) == shared.max_renditions
+
+
+def test_shadow_border_is_cached(qt_app):
+    border = shadow_border(4, QColor(179, 95, 39))
+    assert (border.width(), border.height()) == (10, 10)
+    assert shadow_border(4, QColor(179, 95, 39)) is border
@@ -0,0 +1,51 @@
+"""打码图块缓存：马赛克为金字塔查表，拖动打码区域只计算新覆盖到的图块"""
+import pytest
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QColor, QImage, QPainter, QPixmap
+
+np = pytest.importorskip('numpy')
+
+
+def gradient_desktop():
+    from Functions import VirtualDesktop
+    image = QImage(512, 256, QImage.Format.Format_RGB32)
+    for x in range(512):
+        for y in range(0, 256, 8):
+            image.setPixel(x, y, QColor(x % 256, y, (x * y) % 256).rgb())
+    return VirtualDesktop.fromPixmap(QPixmap.fromImage(image))
+
+
+def paint(redactor, mode, rectf):
+    image = QImage(512, 256, QImage.Format.Format_RGB32)
+    painter = QPainter(image)
+    redactor.paint(painter, mode, QColor(0, 0, 0), 1, rectf)
+    painter.end()
+    return image
+
+
+@pytest.mark.parametrize('mode', ['mosaic', 'blur'])
+def test_moving_region_reuses_tiles(qt_app, mode):
+    from Functions import DesktopPixels, Redactor
+    redactor = Redactor(DesktopPixels(gradient_desktop()))
+    paint(redactor, mode, QRectF(10, 10, 100, 100))
+    assert len(redactor._tiles) == 1  # 区域在第一个 128x128 图块内
+    first = redactor.tile(mode, 0, redactor.levelFor(1, 1.0), 0, 0)
+    paint(redactor, mode, QRectF(20, 20, 100, 100))  # 拖动后仍在同一图块内，不重新计算
+    assert len(redactor._tiles) == 1 and redactor.tile(mode, 0, redactor.levelFor(1, 1.0), 0, 0) is first
+    paint(redactor, mode, QRectF(100, 10, 100, 100))  # 调整到跨越两个图块，只计算新覆盖的一个
+    assert len(redactor._tiles) == 2
+
+
+def test_mosaic_is_a_pyramid_lookup(qt_app):
+    from Functions import DesktopPixels, Redactor
+    pixels = DesktopPixels(gradient_desktop())
+    redactor = Redactor(pixels)
+    level = redactor.levelFor(1, 1.0)
+    block = 1 << level
+    tile = redactor.tile('mosaic', 0, level, 1, 0)
+    small = redactor.level(0, level)
+    for x, y in ((0, 0), (block + 1, 2 * block + 3), (127, 127)):
+        expected = small[y >> level, (128 + x) >> level]
+        assert QColor(tile.pixel(x, y)).getRgb()[:3] == tuple(int(value) for value in expected[::-1])
+    view = pixels.view(0)[:block, 128:128 + block, :3].astype(np.float64)
+    assert np.abs(small[0, 128 >> level] - view.reshape(-1, 3).mean(axis=0)).max() <= 1  # 块内像素的均值
@@ -0,0 +1,60 @@
+"""打码必须应用在导出的截图像素上：矢量导出内嵌的图片和截图历史中都不能留下被遮挡的原始像素"""
+import base64
+import re
+
+import pytest
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QColor, QImage, QPixmap
+
+
+def red_area(actions):
+    from cli import HeadlessHost
+    from Functions import VirtualDesktop
+    from Views.ScreenArea import ScreenArea
+    pixmap = QPixmap(200, 100)
+    pixmap.fill(QColor(255, 0, 0))
+    area = ScreenArea(HeadlessHost(), VirtualDesktop.fromPixmap(pixmap))
+    area.setEditActions(actions)
+    return area
+
+
+def fill_action(color=QColor(0, 0, 0)):
+    return ('fill', color, 4, QPointF(20, 20), QPointF(120, 80))
+
+
+def embedded_image(svgPath):
+    data = re.search(r'data:image/png;base64,([A-Za-z0-9+/=]+)', svgPath.read_text(encoding='utf8')).group(1)
+    return QImage.fromData(base64.b64decode(data), 'PNG')
+
+
+def test_svg_embeds_redacted_pixels(qt_app, tmp_path):
+    area = red_area([fill_action()])
+    area.exportVector(tmp_path / 'out.svg', QRectF(0, 0, 200, 100))
+    image = embedded_image(tmp_path / 'out.svg')
+    assert QColor(image.pixel(50, 50)).getRgb()[:3] == (0, 0, 0)
+    assert QColor(image.pixel(5, 5)).getRgb()[:3] == (255, 0, 0)  # 打码区域外不变
+
+
+def test_svg_cache_follows_redactions(qt_app, tmp_path):
+    area = red_area([])
+    area.exportVector(tmp_path / 'plain.svg', QRectF(0, 0, 200, 100))
+    assert QColor(embedded_image(tmp_path / 'plain.svg').pixel(50, 50)).getRgb()[:3] == (255, 0, 0)
+    area.setEditActions([fill_action(QColor(0, 0, 255))])  # 区域不变，只增加了打码，不能复用缓存的图片
+    area.exportVector(tmp_path / 'redacted.svg', QRectF(0, 0, 200, 100))
+    assert QColor(embedded_image(tmp_path / 'redacted.svg').pixel(50, 50)).getRgb()[:3] == (0, 0, 255)
+
+
+@pytest.mark.parametrize('mode', ['mosaic', 'blur'])
+def test_unedited_pixmap_applies_redaction(qt_app, mode):
+    """不带编辑结果的截图（截图历史、文字识别使用）也要应用打码"""
+    pytest.importorskip('numpy')
+    from Functions import VirtualDesktop
+    image = QImage(200, 100, QImage.Format.Format_RGB32)
+    for x in range(200):  # 黑白棋盘格，打码后不再逐像素交替
+        for y in range(100):
+            image.setPixel(x, y, 0xff000000 if (x + y) % 2 else 0xffffffff)
+    area = red_area([(mode, QColor(0, 0, 0), 4, QPointF(20, 20), QPointF(120, 80))])
+    area.setDesktop(VirtualDesktop.fromPixmap(QPixmap.fromImage(image)))
+    redacted = area.physicalPixmap(QRectF(0, 0, 200, 100)).toImage()
+    assert [redacted.pixel(x, 50) for x in range(50, 54)] != [image.pixel(x, 50) for x in range(50, 54)]
+    assert redacted.pixel(5, 5) == image.pixel(5, 5)
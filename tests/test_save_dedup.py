@@ -0,0 +1,77 @@
+"""保存去重：只有像素完全相同、格式一致且目标文件不存在时才建立硬链接"""
+import numpy as np
+from PyQt5.QtGui import QImage
+
+from Functions.SaveDedup import FolderDedupIndex, dedup_save, pixel_digest, qimage_to_rgb
+
+
+def capture(text_row=None):
+    rgb = np.full((120, 200, 3), 255, np.uint8)
+    rgb[20:40, 20:180] = (30, 60, 90)
+    if text_row is not None:  # 一小段文字变化，感知哈希几乎不变
+        rgb[text_row, 50:54] = 0
+    return rgb
+
+
+def writer(rgb):
+    def write(path):
+        height, width = rgb.shape[:2]
+        QImage(rgb.tobytes(), width, height, width * 3, QImage.Format.Format_RGB888).save(path)
+    return write
+
+
+def test_identical_capture_becomes_link(qt_app, tmp_path):
+    rgb = capture()
+    first, linked, _ = dedup_save(tmp_path / 'a.png', rgb, writer(rgb))
+    assert linked is None
+    second, linked, savedBytes = dedup_save(tmp_path / 'b.png', rgb, writer(rgb))
+    assert linked == first and savedBytes == first.stat().st_size
+    assert second.stat().st_ino == first.stat().st_ino
+
+
+def test_small_text_change_is_written(qt_app, tmp_path):
+    rgb, edited = capture(), capture(text_row=80)
+    dedup_save(tmp_path / 'a.png', rgb, writer(rgb))
+    path, linked, _ = dedup_save(tmp_path / 'b.png', edited, writer(edited))
+    assert linked is None
+    assert (qimage_to_rgb(QImage(str(path))) == edited).all()
+
+
+def test_other_format_is_written(qt_app, tmp_path):
+    rgb = capture()
+    dedup_save(tmp_path / 'a.png', rgb, writer(rgb))
+    path, linked, _ = dedup_save(tmp_path / 'a.bmp', rgb, writer(rgb))
+    assert linked is None
+    assert QImage(str(path)).format() != QImage.Format.Format_Invalid
+    assert path.read_bytes()[:2] == b'BM'
+
+
+def test_overwrite_keeps_new_capture(qt_app, tmp_path):
+    old, new = capture(), capture(text_row=80)
+    dedup_save(tmp_path / 'a.png', new, writer(new))
+    dedup_save(tmp_path / 'b.png', old, writer(old))
+    path, linked, _ = dedup_save(tmp_path / 'b.png', new, writer(new))  # 用户确认覆盖 b.png
+    assert linked is None
+    assert (qimage_to_rgb(QImage(str(path))) == new).all()
+
+
+def test_overwritten_file_is_not_linked(qt_app, tmp_path):
+    old, new = capture(), capture(text_row=80)
+    dedup_save(tmp_path / 'a.png', old, writer(old))
+    writer(new)(str(tmp_path / 'a.png'))  # 在其他程序中修改了 a.png
+    path, linked, _ = dedup_save(tmp_path / 'b.png', old, writer(old))
+    assert linked is None
+    assert (qimage_to_rgb(QImage(str(path))) == old).all()
+
+
+def test_deleted_files_are_dropped_when_matched(qt_app, tmp_path):
+    rgb, other = capture(), capture(text_row=80)
+    dedup_save(tmp_path / 'a.png', rgb, writer(rgb))
+    dedup_save(tmp_path / 'b.png', other, writer(other))
+    (tmp_path / 'a.png').unlink()
+    (tmp_path / 'b.png').unlink()
+    path, linked, _ = dedup_save(tmp_path / 'c.png', rgb, writer(rgb))
+    assert linked is None
+    index = FolderDedupIndex(tmp_path)
+    assert [item[0] for item in index.entries[pixel_digest(rgb)]] == ['c.png']
+    assert [item[0] for item in index.entries[pixel_digest(other)]] == ['b.png']  # 未命中的记录不检查
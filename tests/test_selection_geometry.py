@@ -0,0 +1,37 @@
+"""截图区域几何：控制点和区域判定由四条边的坐标直接算出，拖动控制点得到规范化的新区域"""
+import pytest
+from PyQt5.QtCore import QPointF, QRectF
+
+from Functions import SelectionGeometry
+
+
+@pytest.fixture
+def geometry():
+    geometry = SelectionGeometry(handleSize=10)
+    geometry.setRect(QRectF(100, 100, 200, 100))
+    return geometry
+
+
+@pytest.mark.parametrize('x, y, region', [
+    (150, 150, 'CENTER'), (100, 100, 'CENTER'),
+    (96, 96, 'TL'), (200, 96, 'T'), (304, 96, 'TR'), (96, 150, 'L'), (304, 150, 'R'),
+    (96, 204, 'BL'), (200, 204, 'B'), (304, 204, 'BR'),
+    (150, 96, None), (94, 94, None), (500, 500, None),
+])
+def test_region_at(geometry, x, y, region):
+    assert geometry.regionAt(QPointF(x, y)) == region
+
+
+def test_small_selection_prefers_top_left(qt_app):
+    geometry = SelectionGeometry(handleSize=10)
+    geometry.setRect(QRectF(100, 100, 6, 6))  # 控制点互相重叠
+    assert geometry.regionAt(QPointF(98, 98)) == 'TL'
+    assert geometry.regionAt(QPointF(109, 109)) == 'BR'
+
+
+def test_adjusted_rect_is_normalized(geometry):
+    assert geometry.adjustedRect('R', QPointF(350, 0)) == QRectF(100, 100, 250, 100)
+    assert geometry.adjustedRect('T', QPointF(0, 250)) == QRectF(100, 200, 200, 50)  # 拖过下边后上下交换
+    assert geometry.adjustedRect('BL', QPointF(50, 120)) == QRectF(50, 100, 250, 20)
+    assert geometry.adjustedRect('CENTER', QPointF(0, 0)) is None
+    assert len(geometry.handlePoints()) == 8 and QPointF(200, 200) in geometry.handlePoints()
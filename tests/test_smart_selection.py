@@ -0,0 +1,39 @@
+"""智能选区：截图的像素格式转换和界面元素检测都在工作线程中进行，屏幕与界面元素的矩形都不含右下边"""
+import time
+
+from PyQt5.QtWidgets import QApplication
+
+from Functions import ElementProvider, detect_elements, register_element_provider
+
+
+def test_element_detection_converts_pixels_off_the_gui_thread(screenshot):
+    area = screenshot.screenArea
+    area.captureScreen()
+    screenshot.isSmartSelect = True
+    screenshot.detectElements()
+    assert area._pixels is None  # 主线程中没有转换截图
+    deadline = time.monotonic() + 10
+    while screenshot.elementIndex is None and time.monotonic() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.01)
+    assert screenshot.elementIndex is not None
+    assert area._pixels is not None and area._pixels.desktop is area.desktop()  # 放大镜复用工作线程的转换结果
+
+
+class FixedProvider(ElementProvider):
+    """返回固定的物理像素矩形：一个全屏轮廓和一个按钮"""
+    name = 'fixed'
+
+    def detect(self, image):
+        return [(0, 0, image.width(), image.height()), (40, 40, 100, 60)]
+
+
+def test_screen_and_element_rects_share_one_convention(two_screen_desktop):
+    register_element_provider('fixed', FixedProvider())
+    images = [buffer.pixmap.toImage() for buffer in two_screen_desktop.buffers]
+    index = detect_elements(two_screen_desktop, images, providers=('fixed',))
+    assert len(index) == 4  # 全屏轮廓与屏幕本身去重
+    assert index.innermost(199.5, 50) == (0, 0, 200, 100)
+    assert index.innermost(200, 50) == (200, 0, 400, 100)  # 两个屏幕的交界处只属于右侧屏幕
+    assert index.innermost(220, 20) == (220, 20, 270, 50)
+    assert index.innermost(270, 20) == (200, 0, 400, 100)
@@ -0,0 +1,41 @@
+"""文字识别：引擎是否可用只检查一次"""
+import numpy as np
+import pytest
+
+from Functions.TextRecognition import OcrError, StubOcrEngine, TextRecognizer
+
+
+class CountingEngine(StubOcrEngine):
+    name = 'counting'
+
+    def __init__(self, result=True):
+        self.result = result
+        self.checks = 0
+
+    def available(self):
+        self.checks += 1
+        return self.result
+
+
+def page(seed):
+    gray = np.full((60, 200), 255, np.uint8)
+    gray[10:20, 10:10 + seed * 10] = 0
+    gray[35:45, 20:150] = 0
+    return gray
+
+
+def test_availability_is_checked_once():
+    engine = CountingEngine()
+    recognizer = TextRecognizer(engine, workers=1)
+    for seed in range(1, 4):
+        assert recognizer.recognize(page(seed)).recognized
+    assert engine.checks == 1
+
+
+def test_unavailable_engine_raises_without_rechecking():
+    engine = CountingEngine(result=False)
+    recognizer = TextRecognizer(engine, workers=1)
+    for seed in range(1, 3):
+        with pytest.raises(OcrError):
+            recognizer.recognize(page(seed))
+    assert engine.checks == 1
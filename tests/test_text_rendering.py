@@ -0,0 +1,27 @@
+"""文本标注的排版：多行文本在截图、导出中都按行显示"""
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QColor, QFont, QPixmap
+
+
+def ink_rows(text):
+    from cli import HeadlessHost
+    from Functions import VirtualDesktop
+    from Views.ScreenArea import ScreenArea
+    pixmap = QPixmap(300, 200)
+    pixmap.fill(QColor(255, 255, 255))
+    area = ScreenArea(HeadlessHost(), VirtualDesktop.fromPixmap(pixmap))
+    font = QFont()
+    font.setPixelSize(16)
+    area.setEditActions([('text', QColor(255, 0, 0), font, QRectF(10, 10, 200, 150), text)])
+    image = area.physicalPixmap(QRectF(0, 0, 300, 200), editAction=True).toImage()
+    rows = [y for y in range(image.height())
+            if any(QColor(image.pixel(x, y)).red() > 128 > QColor(image.pixel(x, y)).green()
+                   for x in range(12, 208))]
+    return min(rows), max(rows)
+
+
+def test_multiline_text_keeps_line_breaks(qt_app):
+    top, bottom = ink_rows('first')
+    twoTop, twoBottom = ink_rows('first\nsecond')
+    assert twoTop == top
+    assert twoBottom - twoTop > 1.6 * (bottom - top)  # 第二行在第一行下方
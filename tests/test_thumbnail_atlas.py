@@ -0,0 +1,43 @@
+"""缩略图图集：删除后空出的格子被复用，索引末尾不完整的记录在加载时截断"""
+import uuid
+
+from PyQt5.QtGui import QColor, QImage
+
+from Functions.ThumbnailAtlas import ThumbnailAtlas
+
+
+def solid(color):
+    image = QImage(200, 100, QImage.Format.Format_ARGB32)
+    image.fill(QColor(color))
+    return image
+
+
+def test_removed_cells_are_reused(qt_app, tmp_path):
+    atlas = ThumbnailAtlas(tmp_path)
+    ids = [uuid.uuid4().hex for _ in range(3)]
+    for i, captureId in enumerate(ids):
+        atlas.add(captureId, solid('red'), i)
+    sizes = atlas.atlas_path.stat().st_size, atlas.index_path.stat().st_size
+    for i in range(10):  # 像截图历史一样，添加一张后淘汰最旧的一张
+        captureId = uuid.uuid4().hex
+        atlas.add(captureId, solid('blue'), 3 + i)
+        atlas.remove(ids.pop(0))
+        ids.append(captureId)
+    assert (atlas.atlas_path.stat().st_size, atlas.index_path.stat().st_size) <= \
+        (sizes[0] + atlas.cell_bytes, sizes[1] + atlas.record_struct.size)
+    entries = ThumbnailAtlas(tmp_path).entries()
+    assert [entry.captureId for entry in entries] == ids[::-1]
+    assert QColor(atlas.thumbnail(entries[0]).pixel(10, 10)).getRgb()[:3] == (0, 0, 255)
+
+
+def test_partial_record_is_truncated(qt_app, tmp_path):
+    atlas = ThumbnailAtlas(tmp_path)
+    first = uuid.uuid4().hex
+    atlas.add(first, solid('red'), 0)
+    with open(atlas.index_path, 'ab') as f:
+        f.write(b'\1' * (atlas.record_struct.size // 2))  # 写入记录时异常退出
+    reopened = ThumbnailAtlas(tmp_path)
+    assert atlas.index_path.stat().st_size == atlas.record_struct.size
+    second = uuid.uuid4().hex
+    reopened.add(second, solid('green'), 1)
+    assert [entry.captureId for entry in ThumbnailAtlas(tmp_path).entries()] == [second, first]
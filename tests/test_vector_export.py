@@ -0,0 +1,44 @@
+"""矢量导出：截图只内嵌一次，编辑行为写成矢量图形；只修改编辑行为后重新导出不再重新编码截图"""
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QColor, QFont, QPixmap
+
+
+def area_with(actions):
+    from cli import HeadlessHost
+    from Functions import VirtualDesktop
+    from Views.ScreenArea import ScreenArea
+    pixmap = QPixmap(300, 200)
+    pixmap.fill(QColor(255, 255, 255))
+    area = ScreenArea(HeadlessHost(), VirtualDesktop.fromPixmap(pixmap))
+    area.setEditActions(actions)
+    return area
+
+
+def annotations(count):
+    red = QColor(255, 0, 0)
+    return [('rectangle', red, 2, QPointF(10 + i % 50, 10 + i % 30), QPointF(100 + i % 50, 80))
+            for i in range(count)] + [('text', red, QFont('Arial', 12), QRectF(20, 120, 100, 30), 'note')]
+
+
+def test_svg_keeps_annotations_as_vectors(qt_app, tmp_path, monkeypatch):
+    import Views.ScreenArea
+    encodes = []
+    encode = Views.ScreenArea.encode_png
+    monkeypatch.setattr(Views.ScreenArea, 'encode_png', lambda image: encodes.append(1) or encode(image))
+    area = area_with(annotations(3))
+    area.exportVector(tmp_path / 'first.svg', QRectF(0, 0, 300, 200))
+    area.setEditActions(annotations(200))
+    area.exportVector(tmp_path / 'second.svg', QRectF(0, 0, 300, 200))
+    assert encodes == [1]  # 截图和打码都没有变化，复用已编码的 PNG
+    svg = (tmp_path / 'second.svg').read_text(encoding='utf8')
+    assert svg.count('<image') == 1
+    assert svg.count('<path') + svg.count('<rect') >= 200
+    assert '>note<' in svg  # 文字保持为文本
+
+
+def test_pdf_page_matches_capture(qt_app, tmp_path):
+    area = area_with(annotations(3))
+    area.exportVector(tmp_path / 'out.pdf', QRectF(0, 0, 300, 200))
+    data = (tmp_path / 'out.pdf').read_bytes()
+    assert data.startswith(b'%PDF')
+    assert b'/MediaBox [0 0 300.000000 200.000000]' in data  # 1 逻辑像素 = 1 点
@@ -0,0 +1,8 @@
+"""多屏坐标换算：逻辑矩形与原始矩形互为逆运算，各自使用该区域涉及到的屏幕的设备像素比"""
+from PyQt5.QtCore import QRectF
+
+
+def test_logical_rect_inverts_physical_rect(two_screens):
+    area = two_screens
+    for rectf in (QRectF(10, 10, 50, 50), QRectF(250, 10, 50, 50), QRectF(150, 10, 100, 50)):
+        assert area.logicalRectF(area.physicalRectF(rectf)) == rectf